@@ -0,0 +1,178 @@
+"""Bearer token authentication with in-memory caches.
+
+Verifying a request naively costs a ``jwt.decode`` plus a ``users`` query.
+:func:`current_user` avoids both on the hot path:
+
+- decoded claims are cached per token until the token's own ``exp``;
+- user rows are cached by email for ``AUTH_USER_CACHE_TTL_SECONDS``;
+- revoked token ids (``jti``) are stored in the ``revoked_tokens`` table and
+  mirrored in memory, reloaded at most every ``AUTH_REVOCATION_REFRESH_SECONDS``,
+  so a token revoked by one worker is rejected by all of them shortly after.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from .core import config
+from .db import models
+from .db.session import LazySession, get_async_db
+from .schemas.auth import UserOut
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Bounded LRU mapping whose entries each carry their own expiry time."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[V, float]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item[0]
+
+    def put(self, key: Hashable, value: V, expires_at: float):
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TokenVerifier:
+    """Decodes bearer tokens and resolves their user, caching both."""
+
+    def __init__(self):
+        self.claims: TTLCache[Dict[str, Any]] = TTLCache(config.AUTH_CLAIMS_CACHE_SIZE)
+        self.users: TTLCache[UserOut] = TTLCache(config.AUTH_USER_CACHE_SIZE)
+        # jti -> unix time at which the revoked token expires anyway
+        self._revoked: Dict[str, float] = {}
+        self._revocations_loaded_at = float("-inf")
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Claims of a valid token; raises ``JWTError`` for invalid or expired ones."""
+        claims = self.claims.get(token)
+        if claims is None:
+            claims = jwt.decode(token, config.JWT_SECRET, algorithms=[config.ALGORITHM])
+            if "exp" in claims:
+                self.claims.put(token, claims, float(claims["exp"]))
+        return claims
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        jti = claims.get("jti")
+        return jti is not None and jti in self._revoked
+
+    async def refresh_revocations(self, db: LazySession, force: bool = False):
+        """Reload the revocation list from the database if the local copy is stale.
+
+        A failed reload is logged and the previous list stays in use.
+        """
+        now = time.time()
+        if not force and now - self._revocations_loaded_at < config.AUTH_REVOCATION_REFRESH_SECONDS:
+            return
+        try:
+            session = await db.get()
+            rows = (await session.execute(
+                select(models.RevokedToken.jti, models.RevokedToken.expires_at)
+                .where(models.RevokedToken.expires_at > datetime.utcnow())
+            )).all()
+        except SQLAlchemyError as e:
+            # Keep verifying against the last list; the next request tries again
+            logger.warning(f"Reloading revoked tokens failed; keeping the previous list: {e}")
+            return
+        self._revoked = {jti: _unix(expires_at) for jti, expires_at in rows}
+        self._revocations_loaded_at = now
+
+    async def revoke(self, db: LazySession, claims: Dict[str, Any]):
+        """Revoke a token everywhere: locally at once, in other workers on their next refresh."""
+        jti = claims.get("jti")
+        if jti is None:
+            return
+        expires_at = float(claims.get("exp", time.time() + config.ACCESS_TOKEN_EXPIRE_MINUTES * 60))
+        self._revoked[jti] = expires_at
+        session = await db.get()
+        # Expired revocations are useless; purge them while we are here
+        await session.execute(delete(models.RevokedToken).where(models.RevokedToken.expires_at <= datetime.utcnow()))
+        await session.merge(models.RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at)))
+        await session.commit()
+
+    async def user(self, db: LazySession, email: str) -> Optional[UserOut]:
+        user = self.users.get(email)
+        if user is None:
+            session = await db.get()
+            row = (await session.execute(select(models.User).where(models.User.email == email))).scalar_one_or_none()
+            if row is None:
+                return None
+            user = UserOut.model_validate(row)
+            self.users.put(email, user, time.time() + config.AUTH_USER_CACHE_TTL_SECONDS)
+        return user
+
+    def invalidate_user(self, email: str):
+        self.users.pop(email)
+
+
+def _unix(value: datetime) -> float:
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+token_verifier = TokenVerifier()
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def current_claims(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+                         db: LazySession = Depends(get_async_db)) -> Dict[str, Any]:
+    """Claims of the request's bearer token; 401 if it is missing, invalid or revoked."""
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        claims = token_verifier.decode(credentials.credentials)
+    except JWTError:
+        raise _unauthorized("Invalid or expired token")
+    await token_verifier.refresh_revocations(db)
+    if token_verifier.is_revoked(claims) or not claims.get("sub"):
+        raise _unauthorized("Invalid or expired token")
+    return claims
+
+
+async def current_user(claims: Dict[str, Any] = Depends(current_claims),
+                       db: LazySession = Depends(get_async_db)) -> UserOut:
+    """The authenticated user, usually served without touching the database."""
+    user = await token_verifier.user(db, claims["sub"])
+    if user is None:
+        raise _unauthorized("Unknown user")
+    return user
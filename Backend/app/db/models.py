@@ -1,5 +1,8 @@
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, Integer, String, Table, Text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
@@ -9,3 +12,105 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    # Rows can be purged once the token would have expired anyway
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# --- Research data ---------------------------------------------------------------------
+
+paper_authors = Table(
+    "paper_authors",
+    Base.metadata,
+    Column("paper_id", Integer, ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True),
+    Column("author_id", Integer, ForeignKey("authors.id", ondelete="CASCADE"), primary_key=True),
+    # Author order on the paper
+    Column("position", Integer, nullable=False, default=0),
+    # The primary key serves paper -> authors; this one serves author -> papers
+    Index("ix_paper_authors_author_id_paper_id", "author_id", "paper_id"),
+)
+
+
+class Author(Base):
+    __tablename__ = "authors"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+
+    papers = relationship("Paper", secondary=paper_authors, back_populates="authors", lazy="raise")
+
+
+class Paper(Base):
+    __tablename__ = "papers"
+
+    id = Column(Integer, primary_key=True)
+    # Upstream identifier ("arxiv_2401.01234"), or one derived from the DOI or title
+    external_id = Column(String, unique=True, index=True, nullable=False)
+    doi = Column(String, index=True)
+    title = Column(String, nullable=False)
+    abstract = Column(Text, nullable=False, default="")
+    year = Column(Integer, index=True)
+    journal = Column(String)
+    citations = Column(Integer, nullable=False, default=0)
+    url = Column(String)
+    keywords = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    authors = relationship(
+        "Author", secondary=paper_authors, back_populates="papers",
+        order_by=paper_authors.c.position, lazy="selectin",
+    )
+
+
+class Query(Base):
+    __tablename__ = "queries"
+
+    id = Column(Integer, primary_key=True)
+    # Lower-cased, whitespace-collapsed prompt; repeat queries are matched on it
+    normalized_prompt = Column(String, unique=True, index=True, nullable=False)
+    prompt = Column(String, nullable=False)
+    run_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_run_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class QueryResult(Base):
+    __tablename__ = "query_results"
+
+    query_id = Column(Integer, ForeignKey("queries.id", ondelete="CASCADE"), primary_key=True)
+    paper_id = Column(Integer, ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True, index=True)
+    rank = Column(Integer, nullable=False)
+    relevance_score = Column(Integer, nullable=False)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    # Random hex id
+    id = Column(String(32), primary_key=True)
+    # Submitting user, the only one who may read the job; None when research auth is off
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    kind = Column(String, nullable=False, index=True)
+    # queued, running, succeeded or failed (see app.jobs)
+    status = Column(String, nullable=False)
+    # Lower runs first
+    priority = Column(Integer, nullable=False, default=5)
+    params = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON)
+    error = Column(Text)
+    progress = Column(Float, nullable=False, default=0.0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Startup recovery scans pending jobs in priority order
+    __table_args__ = (Index("ix_jobs_status_priority_created_at", "status", "priority", "created_at"),)
@@ -0,0 +1,257 @@
+"""Background jobs for research artifacts that are too slow to build inside a request.
+
+Jobs are rows in the ``jobs`` table, so their state survives restarts and can be
+polled from any backend process. Each process runs ``JOB_WORKERS`` asyncio
+workers fed by an in-memory priority queue (lower ``priority`` first, then
+submission order). A worker claims a job with a conditional update, runs the
+handler registered for its kind, and stores the JSON result. Failed attempts
+are retried with exponential backoff up to ``JOB_MAX_ATTEMPTS``; handlers raise
+:class:`JobFailed` for errors that retrying cannot fix. Jobs left running by a
+process that died are requeued once they have not been updated for
+``JOB_TIMEOUT_SECONDS``.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update
+
+from . import metrics
+from .core import config
+from .db import models
+from .db.session import LazySession
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ProgressCallback = Callable[[float], Awaitable[None]]
+# Called with the job's params and a progress callback; returns the JSON result
+JobHandler = Callable[[Dict[str, Any], ProgressCallback], Awaitable[Any]]
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job without further attempts."""
+
+
+class JobQueue:
+    """Priority queue of persisted jobs with a pool of asyncio workers."""
+
+    def __init__(self, workers: Optional[int] = None, max_attempts: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, timeout: Optional[float] = None):
+        self.workers = max(1, workers or config.JOB_WORKERS)
+        self.max_attempts = max(1, max_attempts or config.JOB_MAX_ATTEMPTS)
+        self.retry_backoff = config.JOB_RETRY_BACKOFF_SECONDS if retry_backoff is None else retry_backoff
+        self.timeout = timeout or config.JOB_TIMEOUT_SECONDS
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._order = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the handler for jobs of ``kind``."""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    async def start(self):
+        """Requeue unfinished jobs from the table and start the workers."""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        await self._requeue_stale()
+        db = LazySession()
+        try:
+            session = await db.get()
+            pending = (await session.execute(
+                select(models.Job.id, models.Job.priority)
+                .where(models.Job.status == QUEUED)
+                .order_by(models.Job.priority, models.Job.created_at)
+            )).all()
+        finally:
+            await db.close()
+        for job_id, priority in pending:
+            self._enqueue(job_id, priority)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper(), name="job-reaper"))
+        logger.info(f"Started {self.workers} job workers; {len(pending)} pending jobs requeued")
+
+    async def _requeue_stale(self) -> List[Tuple[str, int]]:
+        """Queue again the running jobs not updated for longer than the job timeout.
+
+        A live worker finishes or times out its job within ``timeout`` and keeps
+        ``updated_at`` fresh while reporting progress, so a job that stayed
+        running longer belongs to a process that died. Jobs running in other
+        live processes are left alone.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout)
+        stale = (models.Job.status == RUNNING, models.Job.updated_at < cutoff)
+        db = LazySession()
+        try:
+            session = await db.get()
+            jobs = (await session.execute(select(models.Job.id, models.Job.priority).where(*stale))).all()
+            if not jobs:
+                return []
+            await session.execute(
+                update(models.Job)
+                .where(models.Job.id.in_([job_id for job_id, _ in jobs]), *stale)
+                .values(status=QUEUED, updated_at=datetime.utcnow())
+            )
+            await session.commit()
+        finally:
+            await db.close()
+        logger.warning(f"Requeued {len(jobs)} stale running jobs")
+        return jobs
+
+    async def _reaper(self):
+        """Periodically requeue jobs orphaned by processes that died while running them."""
+        while True:
+            await asyncio.sleep(self.timeout)
+            try:
+                for job_id, priority in await self._requeue_stale():
+                    self._enqueue(job_id, priority)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Requeueing stale jobs failed: {e}")
+
+    async def stop(self):
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+
+    def _enqueue(self, job_id: str, priority: int):
+        if self._queue is not None:
+            self._queue.put_nowait((priority, next(self._order), job_id))
+
+    async def submit(self, kind: str, params: Dict[str, Any], priority: int = 5,
+                     user_id: Optional[int] = None) -> models.Job:
+        """Persist a new job owned by ``user_id`` and queue it; raises ``ValueError`` for unknown kinds."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind {kind!r}; expected one of {self.kinds}")
+        now = datetime.utcnow()
+        job = models.Job(
+            id=uuid.uuid4().hex, user_id=user_id, kind=kind, status=QUEUED, priority=priority, params=params,
+            progress=0.0, attempts=0, max_attempts=self.max_attempts, created_at=now, updated_at=now,
+        )
+        db = LazySession()
+        try:
+            session = await db.get()
+            session.add(job)
+            await session.commit()
+        finally:
+            await db.close()
+        self._enqueue(job.id, priority)
+        return job
+
+    async def get(self, job_id: str) -> Optional[models.Job]:
+        db = LazySession()
+        try:
+            session = await db.get()
+            return await session.get(models.Job, job_id)
+        finally:
+            await db.close()
+
+    async def _update(self, job_id: str, **values: Any) -> int:
+        db = LazySession()
+        try:
+            session = await db.get()
+            result = await session.execute(
+                update(models.Job).where(models.Job.id == job_id).values(updated_at=datetime.utcnow(), **values)
+            )
+            await session.commit()
+            return result.rowcount
+        finally:
+            await db.close()
+
+    async def _claim(self, job_id: str) -> Optional[models.Job]:
+        """Mark a queued job running; None if another worker or process got it first."""
+        now = datetime.utcnow()
+        db = LazySession()
+        try:
+            session = await db.get()
+            claimed = await session.execute(
+                update(models.Job)
+                .where(models.Job.id == job_id, models.Job.status == QUEUED)
+                .values(status=RUNNING, attempts=models.Job.attempts + 1, started_at=now, updated_at=now)
+            )
+            await session.commit()
+            if claimed.rowcount != 1:
+                return None
+            return await session.get(models.Job, job_id)
+        finally:
+            await db.close()
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Job {job_id} could not be processed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await self._claim(job_id)
+        if job is None:
+            return
+
+        async def report(fraction: float):
+            await self._update(job_id, progress=min(1.0, max(0.0, fraction)))
+
+        started = time.perf_counter()
+        try:
+            handler = self._handlers.get(job.kind)
+            if handler is None:
+                raise JobFailed(f"No handler for job kind {job.kind!r}")
+            result = await asyncio.wait_for(handler(job.params or {}, report), self.timeout)
+        except asyncio.CancelledError:
+            # Shutting down; the job is requeued once it goes stale (see _requeue_stale)
+            raise
+        except Exception as e:
+            retry = not isinstance(e, JobFailed) and job.attempts < job.max_attempts
+            outcome = "retried" if retry else "failed"
+            metrics.JOB_SECONDS.labels(kind=job.kind, outcome=outcome).observe(time.perf_counter() - started)
+            logger.warning(f"Job {job_id} ({job.kind}) attempt {job.attempts} {outcome}: {e!r}")
+            if retry:
+                await self._update(job_id, status=QUEUED, error=repr(e))
+                self._retry_later(job_id, job.priority, self.retry_backoff * 2 ** (job.attempts - 1))
+            else:
+                await self._update(job_id, status=FAILED, error=repr(e), finished_at=datetime.utcnow())
+            return
+
+        metrics.JOB_SECONDS.labels(kind=job.kind, outcome="succeeded").observe(time.perf_counter() - started)
+        await self._update(job_id, status=SUCCEEDED, result=result, error=None, progress=1.0,
+                           finished_at=datetime.utcnow())
+
+    def _retry_later(self, job_id: str, priority: int, delay: float):
+        async def requeue():
+            await asyncio.sleep(delay)
+            self._enqueue(job_id, priority)
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+
+job_queue = JobQueue()
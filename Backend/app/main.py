@@ -1,29 +1,48 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import time
+
+# Measured from here so startup can report how long importing the app took
+_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import select, update
 from jose import JWTError, jwt
+import uuid
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import os
 import logging
 import asyncio
 import json
 import re
 
+from rama_research_server.citations import get_citation_engine
+from rama_research_server.index import PaperIndex, get_paper_index, relevance_from_score
+
+from . import metrics, paper_store
+from .auth import current_claims, current_user, token_verifier
 from .core import config
-from .db.session import get_db
+from .db.session import LazySession, get_async_db
 from .schemas.auth import UserLogin, Token, UserRegister, UserOut
+from .schemas.jobs import JobCreate, JobOut
 from .schemas.research import (
     ResearchQuery, ResearchPaper, ResearchWorkspace, WorkspaceTool, WorkspaceFile,
     InteractiveMindmap, MindmapNode, MindmapConnection, EnhancedResearchResponse,
     ComprehensiveSummaries, TopicSummary, DocumentSummary, AutomatedCitations,
-    IEEECitation, BibliographyEntry, SampleResearchPaper, ResearchPaperSection
+    IEEECitation, BibliographyEntry, SampleResearchPaper, ResearchPaperSection,
+    dump_json, validate_papers,
 )
 from .db import models  # Assuming a models module exists
-from .db.session import engine
+from .db import session as db_session
+from .jobs import JobFailed, job_queue
 from .mcp_client import mcp_client
+from .passwords import HashingOverloaded, password_hasher
+from .pipeline import StageGraph
+from .singleflight import SingleFlight
+from .startup import startup
 
 logger = logging.getLogger(__name__)
 
@@ -40,9 +59,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Use bcrypt with manual length truncation to avoid issues
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# Passwords are bcrypt-hashed by app.passwords, with manual length truncation to avoid issues
 def truncate_password(password: str, max_length: int = 72) -> str:
     """Truncate password to max_length bytes to avoid bcrypt limitations."""
     encoded = password.encode('utf-8')
@@ -55,43 +72,82 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # jti lets a single token be revoked (see app.auth)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, config.JWT_SECRET, algorithm=config.ALGORITHM)
     return encoded_jwt
 
 
-def test_db_connection_via_engine():
-    """Lightweight connectivity check using the configured SQLAlchemy engine.
+@app.on_event("startup")
+async def on_startup():
+    # Start serving immediately; the DB probe and worker spawning warm up in the background
+    startup.record("imports", time.perf_counter() - _IMPORT_STARTED)
+    startup.run("database", db_session.start_database_preparation())
+    startup.run("password_workers", password_hasher.warm())
+    startup.run("job_workers", job_queue.start())
+    if config.MCP_WARMUP_ON_STARTUP:
+        startup.run("mcp_workers", mcp_client.start())
+
 
-    For Postgres, this verifies server reachability. For SQLite, it's a no-op sanity check.
-    """
+@app.on_event("shutdown")
+async def on_shutdown():
+    await startup.cancel()
+    await job_queue.stop()
+    await mcp_client.stop()
+    await db_session.async_engine.dispose()
+    password_hasher.shutdown()
+
+
+@app.exception_handler(HashingOverloaded)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloaded):
+    # Shed authentication load instead of letting it queue up behind bcrypt
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication is temporarily overloaded, please retry"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    """Observe request latency and log slow requests with their span breakdown."""
+    spans = metrics.start_trace()
+    started = time.perf_counter()
+    status_code = 500
     try:
-        with engine.connect() as conn:
-            # Use driver-level SQL to avoid dialect-specific imports
-            conn.exec_driver_sql("SELECT 1")
-        return True
-    except Exception as e:
-        logger.warning("DB connectivity check failed: %s", e)
-        return False
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method, route=getattr(route, "path", "unmatched"), status=str(status_code)
+        ).observe(elapsed)
+        if config.SLOW_REQUEST_LOG_SECONDS and elapsed >= config.SLOW_REQUEST_LOG_SECONDS:
+            logger.warning(f"Slow request {request.method} {request.url.path} took {elapsed * 1000:.1f}ms: "
+                           f"{metrics.format_breakdown(spans) or 'no spans'}")
 
-@app.on_event("startup")
-def on_startup():
-    models.Base.metadata.create_all(bind=engine)
-    # Only perform connectivity check explicitly for Postgres to avoid noisy logs when using SQLite fallback
-    backend = engine.dialect.name
-    if backend == "postgresql":
-        ok = test_db_connection_via_engine()
-        if ok:
-            logger.info("PostgreSQL connectivity OK via SQLAlchemy engine.")
-        else:
-            logger.warning("PostgreSQL connectivity failed at startup. Check NETWORK/DNS/SSL settings.")
-    else:
-        logger.info("Using %s database backend (likely SQLite fallback for local dev).", backend)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "mcp_workers": mcp_client.stats()}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """200 once every startup phase has succeeded, 503 while warming up or if a phase failed."""
+    body = {**startup.status(), "mcp_workers": mcp_client.stats()}
+    # Without warmup the workers start on the first research request instead
+    ready = startup.ready and (mcp_client.initialized or not config.MCP_WARMUP_ON_STARTUP)
+    body["ready"] = ready
+    return JSONResponse(status_code=200 if ready else 503, content=body)
 
 
 @app.get("/")
@@ -99,17 +155,35 @@ async def root():
     return {"message": "R.A.M.A FastAPI is running"}
 
 
+async def get_user_by_email(db: LazySession, email: str) -> Optional[models.User]:
+    session = await db.get()
+    result = await session.execute(select(models.User).where(models.User.email == email))
+    return result.scalar_one_or_none()
+
+
 @app.post("/api/auth/login", response_model=Token)
-def login_for_access_token(form_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.email).first()
+async def login_for_access_token(form_data: UserLogin, db: LazySession = Depends(get_async_db)):
+    user = await get_user_by_email(db, form_data.email)
+    # Don't hold a pooled connection while bcrypt runs
+    await db.close()
     # Truncate password before verification
     truncated_password = truncate_password(form_data.password)
-    if not user or not pwd_context.verify(truncated_password, user.hashed_password):
+    verified, new_hash = (
+        await password_hasher.verify_and_update(truncated_password, user.hashed_password) if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # The bcrypt cost changed since this hash was stored; upgrade it transparently
+        session = await db.get()
+        await session.execute(
+            update(models.User).where(models.User.id == user.id).values(hashed_password=new_hash)
+        )
+        await session.commit()
     access_token_expires = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -118,25 +192,59 @@ def login_for_access_token(form_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @app.post("/api/auth/register", response_model=UserOut, status_code=201)
-def register_user(payload: UserRegister, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == payload.email).first()
+async def register_user(payload: UserRegister, db: LazySession = Depends(get_async_db)):
+    existing = await get_user_by_email(db, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
+    await db.close()
 
     # Truncate password to avoid bcrypt limitations
     truncated_password = truncate_password(payload.password)
-    hashed = pwd_context.hash(truncated_password)
+    hashed = await password_hasher.hash(truncated_password)
     user = models.User(email=payload.email, hashed_password=hashed)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    session = await db.get()
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+@app.post("/api/auth/logout", status_code=204)
+async def logout(claims: Dict[str, Any] = Depends(current_claims), db: LazySession = Depends(get_async_db)):
+    """Revoke the presented token."""
+    await token_verifier.revoke(db, claims)
+    return Response(status_code=204)
+
+
+@app.get("/api/auth/me", response_model=UserOut)
+async def read_current_user(user: UserOut = Depends(current_user)):
     return user
 
 
-# Mock data for research papers
+# Research endpoints require a logged-in user unless RESEARCH_REQUIRE_AUTH is off
+RESEARCH_AUTH = [Depends(current_user)] if config.RESEARCH_REQUIRE_AUTH else []
+
+
+async def no_user() -> Optional[UserOut]:
+    return None
+
+
+# The user making a research request, or None when RESEARCH_REQUIRE_AUTH is off
+research_user = current_user if config.RESEARCH_REQUIRE_AUTH else no_user
+
+
+def user_id(user: Optional[UserOut]) -> Optional[int]:
+    return user.id if user is not None else None
+
+
+# Placeholder until audio synthesis is wired to a TTS service
+AUDIO_PLACEHOLDER_URL = "data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEA..."
+
+
+# Mock data for research papers. Negative ids never collide with stored papers
 MOCK_RESEARCH_PAPERS = [
     {
-        "id": 1,
+        "id": -1,
         "title": "Quantum Computing Applications in Neural Network Optimization",
         "authors": ["Dr. Sarah Chen", "Prof. Michael Rodriguez", "Dr. Aisha Patel"],
         "abstract": "This paper explores the revolutionary potential of quantum computing in optimizing neural network architectures. We present a novel quantum-classical hybrid approach that demonstrates 300% improvement in convergence rates for deep learning models.",
@@ -147,7 +255,7 @@ MOCK_RESEARCH_PAPERS = [
         "keywords": ["quantum computing", "neural networks", "optimization", "hybrid algorithms"]
     },
     {
-        "id": 2,
+        "id": -2,
         "title": "Neuromorphic Computing: Bridging Biology and Silicon",
         "authors": ["Dr. Elena Vasquez", "Prof. James Liu", "Dr. Robert Thompson"],
         "abstract": "We investigate bio-inspired computing architectures that mimic neural structures. Our findings show significant energy efficiency improvements of up to 1000x compared to traditional von Neumann architectures.",
@@ -158,7 +266,7 @@ MOCK_RESEARCH_PAPERS = [
         "keywords": ["neuromorphic", "bio-inspired", "energy efficiency", "brain-computer interface"]
     },
     {
-        "id": 3,
+        "id": -3,
         "title": "Large Language Models for Scientific Discovery",
         "authors": ["Dr. Alex Turner", "Prof. Maria Santos", "Dr. David Kim"],
         "abstract": "This comprehensive study examines how large language models can accelerate scientific research through automated hypothesis generation and literature synthesis. We demonstrate novel applications in drug discovery and materials science.",
@@ -169,7 +277,7 @@ MOCK_RESEARCH_PAPERS = [
         "keywords": ["language models", "scientific discovery", "automation", "hypothesis generation"]
     },
     {
-        "id": 4,
+        "id": -4,
         "title": "Edge AI: Bringing Intelligence to IoT Devices",
         "authors": ["Dr. Jennifer Wang", "Prof. Carlos Silva", "Dr. Ahmed Hassan"],
         "abstract": "We present novel architectures for deploying artificial intelligence on resource-constrained edge devices. Our approach achieves 95% accuracy while consuming 10x less power than traditional cloud-based solutions.",
@@ -180,7 +288,7 @@ MOCK_RESEARCH_PAPERS = [
         "keywords": ["edge computing", "IoT", "artificial intelligence", "power efficiency"]
     },
     {
-        "id": 5,
+        "id": -5,
         "title": "Federated Learning for Privacy-Preserving AI",
         "authors": ["Dr. Rachel Green", "Prof. Antonio Lopez", "Dr. Yuki Tanaka"],
         "abstract": "This work addresses privacy concerns in machine learning by developing federated learning protocols that maintain data privacy while achieving comparable model performance to centralized approaches.",
@@ -192,6 +300,19 @@ MOCK_RESEARCH_PAPERS = [
     }
 ]
 
+# Validated once; the fallback paths reuse these instead of rebuilding them per request
+MOCK_PAPERS = validate_papers(MOCK_RESEARCH_PAPERS)
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize an already-validated model once.
+
+    Returning a model from a route with ``response_model`` makes FastAPI dump it,
+    validate the dump again and serialize the result; a ``Response`` skips that.
+    The ``response_model`` declarations stay for the OpenAPI schema.
+    """
+    return Response(content=dump_json(model), status_code=status_code, media_type="application/json")
+
 
 def generate_mock_workspace(topic: str) -> ResearchWorkspace:
     """Generate a mock research workspace based on the topic."""
@@ -338,63 +459,38 @@ def generate_comprehensive_summaries(topic: str, papers: List[ResearchPaper]) ->
 
 def generate_automated_citations(papers: List[ResearchPaper]) -> AutomatedCitations:
     """Generate automated IEEE citations and bibliography."""
+    engine = get_citation_engine()
+    ieee = engine.writer("ieee")
+    bibtex = engine.writer("bibtex")
     ieee_citations = []
     bibliography_entries = []
     
     for i, paper in enumerate(papers):
         citation_num = i + 1
+        record = paper.model_dump()
+        ieee_format = ieee.render(record)
         
-        # IEEE Citation
-        authors_str = paper.authors[0] if paper.authors else "Unknown Author"
-        if len(paper.authors) > 1:
-            authors_str += " et al."
-            
         ieee_citation = IEEECitation(
             id=citation_num,
             paper_id=paper.id,
-            citation_text=f'[{citation_num}] {authors_str}, "{paper.title}," {paper.journal}, vol. XX, no. X, pp. XX-XX, {paper.year}.',
+            citation_text=ieee_format,
             citation_number=citation_num,
             in_text_format=f"[{citation_num}]"
         )
         ieee_citations.append(ieee_citation)
         
-        # Bibliography Entry
-        authors_formatted = ", ".join(paper.authors[:3])  # Limit to first 3 authors
-        if len(paper.authors) > 3:
-            authors_formatted += " et al."
-            
-        ieee_format = f'[{citation_num}] {authors_formatted}, "{paper.title}," {paper.journal}, vol. XX, no. X, pp. XX-XX, {paper.year}.'
-        
-        # BibTeX format
-        bibtex_key = f"{paper.authors[0].split()[-1].lower()}{paper.year}" if paper.authors else f"unknown{paper.year}"
-        bibtex_format = f"""@article{{{bibtex_key},
-    title={{{paper.title}}},
-    author={{{" and ".join(paper.authors)}}},
-    journal={{{paper.journal}}},
-    year={{{paper.year}}},
-    volume={{XX}},
-    number={{X}},
-    pages={{XX--XX}}
-}}"""
-        
-        # APA format
-        apa_format = f'{authors_formatted} ({paper.year}). {paper.title}. {paper.journal}, XX(X), XX-XX.'
-        
-        # MLA format
-        mla_format = f'{authors_formatted}. "{paper.title}." {paper.journal}, vol. XX, no. X, {paper.year}, pp. XX-XX.'
-        
         bib_entry = BibliographyEntry(
             id=citation_num,
             paper_id=paper.id,
             ieee_format=ieee_format,
-            bibtex_format=bibtex_format,
-            apa_format=apa_format,
-            mla_format=mla_format
+            bibtex_format=bibtex.render(record),
+            apa_format=engine.format(record, "apa"),
+            mla_format=engine.format(record, "mla")
         )
         bibliography_entries.append(bib_entry)
     
     # Formatted bibliography string
-    formatted_bibliography = "REFERENCES\n\n" + "\n\n".join([entry.ieee_format for entry in bibliography_entries])
+    formatted_bibliography = ieee.header() + "\n\n".join([entry.ieee_format for entry in bibliography_entries])
     
     return AutomatedCitations(
         ieee_citations=ieee_citations,
@@ -500,33 +596,53 @@ Future research directions should focus on addressing scalability challenges, de
     )
 
 
-async def research_query_fallback(query: ResearchQuery, db: Session):
+_mock_paper_index = None
+
+
+def rank_local_papers(prompt: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Rank every paper the MCP server has fetched so far with the local BM25 paper index.
+
+    The hits keep their upstream ``external_id``; their ``id`` is not meaningful
+    until :func:`paper_store.with_stored_ids` resolves it.
+    """
+    try:
+        hits = get_paper_index().search(prompt, limit)
+    except Exception as e:
+        logger.warning(f"Local paper index search failed: {e}")
+        return []
+    return [{**paper, "relevance_score": relevance_from_score(score)} for score, paper in hits]
+
+
+def rank_mock_papers(prompt: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Rank the mock corpus with a BM25 index of its own; empty if nothing matches."""
+    global _mock_paper_index
+    if _mock_paper_index is None:
+        _mock_paper_index = PaperIndex()
+        _mock_paper_index.add_papers(MOCK_RESEARCH_PAPERS)
+    return [
+        {**paper, "relevance_score": relevance_from_score(score)}
+        for score, paper in _mock_paper_index.search(prompt, limit)
+    ]
+
+
+async def fallback_papers(db: LazySession, prompt: str) -> List[Dict[str, Any]]:
+    """Stored papers matching ``prompt`` in the local index, else matching mock papers."""
+    hits = await asyncio.to_thread(rank_local_papers, prompt)
+    if hits:
+        try:
+            # Only papers with a database row have an id that later lookups resolve
+            stored = await paper_store.with_stored_ids(db, validate_papers(hits))
+            if stored:
+                return [paper.model_dump() for paper in stored]
+        except Exception as e:
+            logger.warning(f"Resolving local index hits failed: {e}")
+    return await asyncio.to_thread(rank_mock_papers, prompt)
+
+
+async def research_query_fallback(query: ResearchQuery, db: LazySession):
     """Fallback function when MCP server is unavailable."""
-    # Filter papers based on relevance to the prompt
-    prompt_lower = query.prompt.lower()
-    relevant_papers = []
-    
-    for paper in MOCK_RESEARCH_PAPERS:
-        # Check if any keywords match the prompt
-        relevance = 0
-        for keyword in paper["keywords"]:
-            if keyword.lower() in prompt_lower:
-                relevance += 20
-        
-        # Check if prompt words appear in title or abstract
-        prompt_words = prompt_lower.split()
-        for word in prompt_words:
-            if len(word) > 3:  # Only check significant words
-                if word in paper["title"].lower():
-                    relevance += 15
-                if word in paper["abstract"].lower():
-                    relevance += 10
-        
-        # Update relevance score based on matches
-        if relevance > 0:
-            paper_copy = paper.copy()
-            paper_copy["relevance_score"] = min(paper["relevance_score"] + relevance, 100)
-            relevant_papers.append(paper_copy)
+    # Rank previously fetched papers (or the mock corpus) against the prompt
+    relevant_papers = await fallback_papers(db, query.prompt)
     
     # If no specific matches found, return all papers with lower relevance
     if not relevant_papers:
@@ -539,7 +655,7 @@ async def research_query_fallback(query: ResearchQuery, db: Session):
     relevant_papers.sort(key=lambda x: x["relevance_score"], reverse=True)
     
     # Convert to Pydantic models
-    papers = [ResearchPaper(**paper) for paper in relevant_papers]
+    papers = validate_papers(relevant_papers)
     
     # Generate workspace if requested
     workspace = generate_mock_workspace(query.prompt) if query.include_workspace else None
@@ -557,82 +673,309 @@ async def research_query_fallback(query: ResearchQuery, db: Session):
     sample_paper = generate_sample_research_paper(query.prompt, papers) if query.include_sample_paper else None
     
     # Generate mock audio URL if requested
-    audio_url = "data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEA..." if query.include_audio else None
+    audio_url = AUDIO_PLACEHOLDER_URL if query.include_audio else None
     
-    return EnhancedResearchResponse(
+    return EnhancedResearchResponse.model_construct(
         papers=papers,
         workspace=workspace,
         interactive_mindmap=mindmap,
         comprehensive_summaries=summaries,
         automated_citations=citations,
         sample_paper=sample_paper,
-        audio_url=audio_url
+        audio_url=audio_url,
+        partial_sections=[],
+        jobs={},
     )
 
 
-@app.post("/api/research/query", response_model=EnhancedResearchResponse)
-async def research_query(query: ResearchQuery, db: Session = Depends(get_db)):
-    """Process a research query and return enhanced research results with all features."""
-    
+async def stored_papers(db: LazySession, prompt: str) -> Optional[List[ResearchPaper]]:
+    """Recent stored results for ``prompt``, or None if it has to be searched upstream."""
     try:
-        # Use MCP client to search for papers
-        papers_data = await mcp_client.search_papers(query.prompt, max_results=10)
-        papers = []
-        
-        if "papers" in papers_data:
-            for paper_data in papers_data["papers"]:
-                papers.append(ResearchPaper(**paper_data))
-        
-        # Generate workspace if requested
-        workspace = None
-        if query.include_workspace:
-            workspace_data = await mcp_client.generate_workspace(query.prompt)
-            workspace = ResearchWorkspace(**workspace_data)
-        
-        # Generate mindmap if requested
-        mindmap = None
-        if query.include_mindmap:
-            mindmap_data = await mcp_client.create_mindmap(query.prompt)
-            mindmap = InteractiveMindmap(**mindmap_data)
-        
-        # Generate comprehensive summaries if requested
-        summaries = None
-        if query.include_summaries:
-            summaries = generate_comprehensive_summaries(query.prompt, papers)
+        return await paper_store.recent_results(db, prompt)
+    except Exception as e:
+        logger.warning(f"Reading stored results failed: {e}")
+        return None
+    finally:
+        # Don't hold a connection through the upstream search
+        await db.close()
+
+
+async def store_papers(db: LazySession, prompt: str, papers: List[ResearchPaper],
+                       papers_data: Dict[str, Any]) -> List[ResearchPaper]:
+    """Persist an upstream search; returns the papers with their database ids."""
+    if "mock" in papers_data.get("sources_used", []):
+        return papers
+    if papers_data.get("sources_truncated"):
+        # Cut short by the latency budget; a repeat query should search again
+        return papers
+    try:
+        return await paper_store.save_search(db, prompt, papers)
+    except Exception as e:
+        logger.warning(f"Storing search results failed: {e}")
+        return papers
+    finally:
+        # Give the connection back; the rest of the request doesn't need it
+        await db.close()
+
+
+async def fetch_papers(db: LazySession, prompt: str) -> List[ResearchPaper]:
+    """Papers for ``prompt``: stored results of a recent identical query, else a stored MCP search."""
+    papers = await stored_papers(db, prompt)
+    if papers is not None:
+        return papers
+    papers_data = await mcp_client.search_papers(prompt, max_results=10)
+    metrics.observe_search_sources(papers_data)
+    papers = validate_papers(papers_data.get("papers", []))
+    return await store_papers(db, prompt, papers, papers_data)
+
+
+# Identical concurrent requests share one computation
+papers_flight: SingleFlight[List[ResearchPaper]] = SingleFlight("fetch_papers")
+research_flight: SingleFlight[bytes] = SingleFlight("research_query")
+
+
+async def shared_papers(prompt: str) -> List[ResearchPaper]:
+    """:func:`fetch_papers`, coalesced with concurrent fetches of the same normalized prompt."""
+    async def fetch():
+        # Shared by every waiter, so it can't borrow any one request's session
+        db = LazySession()
+        try:
+            return await fetch_papers(db, prompt)
+        finally:
+            await db.close()
+
+    return await papers_flight.do(paper_store.normalize_prompt(prompt), fetch)
+
+
+def build_research_graph(query: ResearchQuery, db: LazySession, on_paper=None) -> StageGraph:
+    """Build the stage graph for a research query.
+
+    The paper search, workspace and mindmap are independent; summaries, citations
+    and the sample paper depend only on the paper list. With ``on_paper`` the
+    search streams results and ``on_paper`` is called with each paper as it arrives.
+    Only the streaming search uses ``db``.
+    """
+    
+    async def search_stage():
+        if on_paper is None:
+            return await shared_papers(query.prompt)
         
-        # Generate automated citations if requested
-        citations = None
-        if query.include_citations:
-            citations = generate_automated_citations(papers)
+        papers = await stored_papers(db, query.prompt)
+        if papers is not None:
+            for paper in papers:
+                on_paper(paper)
+            return papers
         
-        # Generate sample research paper if requested
-        sample_paper = None
-        if query.include_sample_paper:
-            sample_paper = generate_sample_research_paper(query.prompt, papers)
+        papers = []
+        async for kind, data in mcp_client.stream_search_papers(query.prompt, max_results=10):
+            if kind == "paper":
+                paper = ResearchPaper(**data)
+                papers.append(paper)
+                on_paper(paper)
+                continue
+            metrics.observe_search_sources(data)
+            if not papers:
+                # Nothing was streamed (e.g. an older server); emit the final list instead
+                for paper_data in data.get("papers", []):
+                    paper = ResearchPaper(**paper_data)
+                    papers.append(paper)
+                    on_paper(paper)
+            # The streamed papers carry search ids; the final ``papers`` event has the stored ones
+            papers = await store_papers(db, query.prompt, papers, data)
+        return papers
+
+    async def workspace_stage():
+        workspace_data = await mcp_client.generate_workspace(query.prompt)
+        return ResearchWorkspace(**workspace_data)
+
+    async def mindmap_stage():
+        mindmap_data = await mcp_client.create_mindmap(query.prompt)
+        return InteractiveMindmap(**mindmap_data)
+
+    async def summaries_stage(papers):
+        return generate_comprehensive_summaries(query.prompt, papers)
+
+    async def citations_stage(papers):
+        return generate_automated_citations(papers)
+
+    async def sample_paper_stage(papers):
+        return generate_sample_research_paper(query.prompt, papers)
+
+    graph = StageGraph().add("papers", search_stage)
+    if query.include_workspace:
+        graph.add("workspace", workspace_stage)
+    if query.include_mindmap:
+        graph.add("interactive_mindmap", mindmap_stage)
+    if query.include_summaries and "comprehensive_summaries" not in query.defer_sections:
+        graph.add("comprehensive_summaries", summaries_stage, deps=["papers"])
+    if query.include_citations:
+        graph.add("automated_citations", citations_stage, deps=["papers"])
+    if query.include_sample_paper and "sample_paper" not in query.defer_sections:
+        graph.add("sample_paper", sample_paper_stage, deps=["papers"])
+    return graph
+
+
+def research_query_key(query: ResearchQuery) -> Tuple:
+    """Queries with equal keys get the same response: same normalized prompt and options."""
+    options = query.model_dump(exclude={"prompt"})
+    options["defer_sections"] = tuple(sorted(set(query.defer_sections)))
+    return (paper_store.normalize_prompt(query.prompt), *sorted(options.items()))
+
+
+def inline_audio_url(query: ResearchQuery) -> Optional[str]:
+    # Generate mock audio URL if requested
+    return AUDIO_PLACEHOLDER_URL if query.include_audio and "audio" not in query.defer_sections else None
+
+
+async def submit_deferred_sections(query: ResearchQuery, papers: List[ResearchPaper],
+                                   owner: Optional[int]) -> Dict[str, str]:
+    """Queue the query's deferred sections as jobs owned by ``owner``; returns section -> job id."""
+    included = {
+        "comprehensive_summaries": query.include_summaries,
+        "sample_paper": query.include_sample_paper,
+        "audio": query.include_audio,
+    }
+    paper_data = [paper.model_dump(mode="json") for paper in papers]
+    jobs = {}
+    for section in dict.fromkeys(query.defer_sections):
+        if not included[section]:
+            continue
+        params = {"text": query.prompt} if section == "audio" else {"topic": query.prompt, "papers": paper_data}
+        jobs[section] = (await job_queue.submit(section, params, user_id=owner)).id
+    return jobs
+
+
+@app.post("/api/research/query", response_model=EnhancedResearchResponse)
+async def research_query(query: ResearchQuery, user: Optional[UserOut] = Depends(research_user)):
+    """Process a research query and return enhanced research results with all features.
+
+    Sections are computed as a dependency graph: the paper search, workspace and
+    mindmap run concurrently, and the paper-derived sections start as soon as the
+    search returns. Sections still running at the deadline are listed in
+    ``partial_sections`` instead of delaying the whole response.
+
+    Identical queries arriving while one is in flight wait for and share its
+    response rather than computing their own.
+    """
+    key = research_query_key(query)
+    owner = user_id(user)
+    if query.defer_sections:
+        # The response carries job ids only their owner may read, so share it only with them
+        key = (owner, *key)
+    body = await research_flight.do(key, lambda: compute_research_query(query, owner))
+    return Response(content=body, media_type="application/json")
+
+
+async def compute_research_query(query: ResearchQuery, owner: Optional[int] = None) -> bytes:
+    """The serialized response to ``query``; deferred sections are queued as jobs of ``owner``."""
+    # Shared by every coalesced request, so it can't borrow any one request's session
+    db = LazySession()
+    try:
+        outcome = await build_research_graph(query, db).run(deadline=config.RESEARCH_QUERY_DEADLINE_SECONDS)
+        metrics.observe_graph("research_query", outcome)
+        if "papers" in outcome.errors:
+            raise outcome.errors["papers"]
+        for name, error in outcome.errors.items():
+            logger.error(f"Research query stage {name} failed: {error}")
         
-        # Generate mock audio URL if requested
-        audio_url = "data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEA..." if query.include_audio else None
+        partial_sections = outcome.incomplete
+        jobs: Dict[str, str] = {}
+        if query.defer_sections:
+            try:
+                jobs = await submit_deferred_sections(query, outcome.results.get("papers", []), owner)
+            except Exception as e:
+                logger.error(f"Queueing deferred sections failed: {e}")
+                partial_sections = partial_sections + list(query.defer_sections)
         
-        return EnhancedResearchResponse(
-            papers=papers,
-            workspace=workspace,
-            interactive_mindmap=mindmap,
-            comprehensive_summaries=summaries,
-            automated_citations=citations,
-            sample_paper=sample_paper,
-            audio_url=audio_url
-        )
+        with metrics.span("build_response"):
+            # Every section is already a validated model
+            response = EnhancedResearchResponse.model_construct(
+                papers=outcome.results.get("papers", []),
+                workspace=outcome.results.get("workspace"),
+                interactive_mindmap=outcome.results.get("interactive_mindmap"),
+                comprehensive_summaries=outcome.results.get("comprehensive_summaries"),
+                automated_citations=outcome.results.get("automated_citations"),
+                sample_paper=outcome.results.get("sample_paper"),
+                audio_url=inline_audio_url(query),
+                partial_sections=partial_sections,
+                jobs=jobs,
+            )
+            return dump_json(response)
         
     except Exception as e:
         logger.error(f"Research query error: {e}")
         # Fallback to mock data if MCP fails
-        return await research_query_fallback(query, db)
+        return dump_json(await research_query_fallback(query, db))
+    finally:
+        await db.close()
+
+
+def _ndjson_event(event: str, data: Any) -> bytes:
+    if isinstance(data, BaseModel):
+        return b'{"event":' + json.dumps(event).encode() + b',"data":' + dump_json(data) + b"}\n"
+    return (json.dumps({"event": event, "data": jsonable_encoder(data)}) + "\n").encode()
+
+
+@app.post("/api/research/query/stream")
+async def research_query_stream(query: ResearchQuery, user: Optional[UserOut] = Depends(research_user)):
+    """Stream a research query as newline-delimited JSON events.
+
+    Emits one ``paper`` event per paper as the sources return them, then one event
+    per section (``papers``, ``workspace``, ``interactive_mindmap``,
+    ``comprehensive_summaries``, ``automated_citations``, ``sample_paper``) as each
+    completes, and finally a ``done`` event listing any ``partial_sections``.
+
+    Streamed papers are numbered in arrival order. The ``papers`` event repeats the
+    list once it is stored, with the database ids that the non-streaming endpoint
+    returns and ``/api/research/papers/{paper_id}/summary`` accepts.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    # Dependencies are torn down before a streamed body ends, so the stream owns its session
+    db = LazySession()
+    graph = build_research_graph(query, db, on_paper=lambda paper: queue.put_nowait(("paper", paper)))
+
+    async def events():
+        run = asyncio.create_task(graph.run(
+            deadline=config.RESEARCH_QUERY_DEADLINE_SECONDS,
+            on_stage=lambda name, result: queue.put_nowait((name, result)),
+        ))
+        run.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, data = item
+                yield _ndjson_event(event, data)
+            
+            outcome = run.result()
+            metrics.observe_graph("research_query_stream", outcome)
+            for name, error in outcome.errors.items():
+                logger.error(f"Research query stage {name} failed: {error}")
+            partial_sections = outcome.incomplete
+            jobs: Dict[str, str] = {}
+            if query.defer_sections:
+                try:
+                    jobs = await submit_deferred_sections(query, outcome.results.get("papers", []), user_id(user))
+                except Exception as e:
+                    logger.error(f"Queueing deferred sections failed: {e}")
+                    partial_sections = partial_sections + list(query.defer_sections)
+            yield _ndjson_event("done", {
+                "audio_url": inline_audio_url(query),
+                "partial_sections": partial_sections,
+                "jobs": jobs,
+            })
+        finally:
+            run.cancel()
+            await db.close()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 
 # Individual Feature Endpoints
 
-@app.post("/api/research/mindmap", response_model=InteractiveMindmap)
-async def generate_research_mindmap(request: dict, db: Session = Depends(get_db)):
+@app.post("/api/research/mindmap", response_model=InteractiveMindmap, dependencies=RESEARCH_AUTH)
+async def generate_research_mindmap(request: dict, db: LazySession = Depends(get_async_db)):
     """Generate an interactive mind map for a research topic."""
     topic = request.get("topic", "")
     if not topic:
@@ -640,14 +983,14 @@ async def generate_research_mindmap(request: dict, db: Session = Depends(get_db)
     
     try:
         mindmap_data = await mcp_client.create_mindmap(topic)
-        return InteractiveMindmap(**mindmap_data)
+        return model_response(InteractiveMindmap(**mindmap_data))
     except Exception as e:
         logger.error(f"Mindmap generation error: {e}")
-        return generate_mock_mindmap(topic)
+        return model_response(generate_mock_mindmap(topic))
 
 
-@app.post("/api/research/summaries", response_model=ComprehensiveSummaries)
-async def generate_research_summaries(request: dict, db: Session = Depends(get_db)):
+@app.post("/api/research/summaries", response_model=ComprehensiveSummaries, dependencies=RESEARCH_AUTH)
+async def generate_research_summaries(request: dict, db: LazySession = Depends(get_async_db)):
     """Generate comprehensive summaries for a research topic."""
     topic = request.get("topic", "")
     if not topic:
@@ -655,24 +998,16 @@ async def generate_research_summaries(request: dict, db: Session = Depends(get_d
     
     try:
         # Get papers for the topic
-        papers_data = await mcp_client.search_papers(topic, max_results=10)
-        papers = []
-        if "papers" in papers_data:
-            for paper_data in papers_data["papers"]:
-                papers.append(ResearchPaper(**paper_data))
-        else:
-            # Use mock papers if MCP fails
-            papers = [ResearchPaper(**paper) for paper in MOCK_RESEARCH_PAPERS[:5]]
+        papers = await shared_papers(topic) or MOCK_PAPERS[:5]
         
-        return generate_comprehensive_summaries(topic, papers)
+        return model_response(generate_comprehensive_summaries(topic, papers))
     except Exception as e:
         logger.error(f"Summaries generation error: {e}")
-        papers = [ResearchPaper(**paper) for paper in MOCK_RESEARCH_PAPERS[:5]]
-        return generate_comprehensive_summaries(topic, papers)
+        return model_response(generate_comprehensive_summaries(topic, MOCK_PAPERS[:5]))
 
 
-@app.post("/api/research/citations", response_model=AutomatedCitations)
-async def generate_research_citations(request: dict, db: Session = Depends(get_db)):
+@app.post("/api/research/citations", response_model=AutomatedCitations, dependencies=RESEARCH_AUTH)
+async def generate_research_citations(request: dict, db: LazySession = Depends(get_async_db)):
     """Generate automated IEEE citations and bibliography."""
     topic = request.get("topic", "")
     if not topic:
@@ -680,23 +1015,66 @@ async def generate_research_citations(request: dict, db: Session = Depends(get_d
     
     try:
         # Get papers for the topic
-        papers_data = await mcp_client.search_papers(topic, max_results=10)
-        papers = []
-        if "papers" in papers_data:
-            for paper_data in papers_data["papers"]:
-                papers.append(ResearchPaper(**paper_data))
-        else:
-            papers = [ResearchPaper(**paper) for paper in MOCK_RESEARCH_PAPERS]
+        papers = await shared_papers(topic) or MOCK_PAPERS
         
-        return generate_automated_citations(papers)
+        return model_response(generate_automated_citations(papers))
     except Exception as e:
         logger.error(f"Citations generation error: {e}")
-        papers = [ResearchPaper(**paper) for paper in MOCK_RESEARCH_PAPERS]
-        return generate_automated_citations(papers)
+        return model_response(generate_automated_citations(MOCK_PAPERS))
+
+
+# Export format -> (citation style, media type, file extension)
+CITATION_EXPORT_FORMATS = {
+    "bib": ("bibtex", "application/x-bibtex", "bib"),
+    "ris": ("ris", "application/x-research-info-systems", "ris"),
+    "ieee": ("ieee", "text/plain; charset=utf-8", "txt"),
+}
+
 
+@app.get("/api/research/citations/export", dependencies=RESEARCH_AUTH)
+async def export_citations(format: str = "bib", topic: Optional[str] = None):
+    """Stream a bibliography of stored papers as BibTeX, RIS or IEEE text.
 
-@app.post("/api/research/sample-paper", response_model=SampleResearchPaper)
-async def generate_research_paper(request: dict, db: Session = Depends(get_db)):
+    With ``topic`` the export holds that query's last results in rank order,
+    otherwise every stored paper. Papers are read and formatted in batches of
+    ``CITATION_EXPORT_BATCH_SIZE``, so the size of the library does not matter.
+    """
+    if format not in CITATION_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(CITATION_EXPORT_FORMATS)}")
+    style, media_type, extension = CITATION_EXPORT_FORMATS[format]
+    
+    # Dependencies are torn down before a streamed body ends, so the stream owns its session
+    db = LazySession()
+    query_id = None
+    if topic:
+        try:
+            query_id = await paper_store.query_id(db, topic)
+        except BaseException:
+            await db.close()
+            raise
+        if query_id is None:
+            await db.close()
+            raise HTTPException(status_code=404, detail="No stored results for this topic")
+    writer = get_citation_engine().writer(style)
+
+    async def body():
+        try:
+            async for papers in paper_store.iter_papers(db, query_id, config.CITATION_EXPORT_BATCH_SIZE):
+                yield await asyncio.to_thread(lambda: "".join(writer.stream(papers)))
+            if writer.count == 0:
+                yield writer.header()
+        finally:
+            await db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="references.{extension}"'},
+    )
+
+
+@app.post("/api/research/sample-paper", response_model=SampleResearchPaper, dependencies=RESEARCH_AUTH)
+async def generate_research_paper(request: dict, db: LazySession = Depends(get_async_db)):
     """Generate a sample research paper based on the topic."""
     topic = request.get("topic", "")
     if not topic:
@@ -704,35 +1082,26 @@ async def generate_research_paper(request: dict, db: Session = Depends(get_db)):
     
     try:
         # Get papers for the topic
-        papers_data = await mcp_client.search_papers(topic, max_results=10)
-        papers = []
-        if "papers" in papers_data:
-            for paper_data in papers_data["papers"]:
-                papers.append(ResearchPaper(**paper_data))
-        else:
-            papers = [ResearchPaper(**paper) for paper in MOCK_RESEARCH_PAPERS]
+        papers = await shared_papers(topic) or MOCK_PAPERS
         
-        return generate_sample_research_paper(topic, papers)
+        return model_response(generate_sample_research_paper(topic, papers))
     except Exception as e:
         logger.error(f"Sample paper generation error: {e}")
-        papers = [ResearchPaper(**paper) for paper in MOCK_RESEARCH_PAPERS]
-        return generate_sample_research_paper(topic, papers)
+        return model_response(generate_sample_research_paper(topic, MOCK_PAPERS))
 
 
-@app.get("/api/research/papers/{paper_id}/summary")
-async def get_paper_summary(paper_id: int, db: Session = Depends(get_db)):
+@app.get("/api/research/papers/{paper_id}/summary", dependencies=RESEARCH_AUTH)
+async def get_paper_summary(paper_id: int, db: LazySession = Depends(get_async_db)):
     """Get detailed summary for a specific research paper."""
-    # Find paper in mock data (in real implementation, would query database)
-    paper_data = None
-    for paper in MOCK_RESEARCH_PAPERS:
-        if paper["id"] == paper_id:
-            paper_data = paper
-            break
+    if paper_id < 0:
+        # Results from the mock corpus
+        paper = next((paper for paper in MOCK_PAPERS if paper.id == paper_id), None)
+    else:
+        paper = await paper_store.get_paper(db, paper_id)
     
-    if not paper_data:
+    if paper is None:
         raise HTTPException(status_code=404, detail="Paper not found")
     
-    paper = ResearchPaper(**paper_data)
     summary = DocumentSummary(
         paper_id=paper.id,
         title=paper.title,
@@ -753,4 +1122,60 @@ async def get_paper_summary(paper_id: int, db: Session = Depends(get_db)):
         significance="This work makes substantial contributions to the field by introducing novel methodologies and demonstrating their effectiveness across multiple application domains."
     )
     
-    return summary
+    return model_response(summary)
+
+
+# Background jobs
+
+async def _job_papers(params: Dict[str, Any]) -> List[ResearchPaper]:
+    if not params.get("topic"):
+        raise JobFailed("topic is required")
+    if "papers" not in params:
+        return await shared_papers(params["topic"]) or MOCK_PAPERS
+    try:
+        return validate_papers(params["papers"])
+    except ValueError as e:
+        raise JobFailed(f"invalid papers: {e}")
+
+
+@job_queue.handler("comprehensive_summaries")
+async def summaries_job(params: Dict[str, Any], progress) -> Dict[str, Any]:
+    papers = await _job_papers(params)
+    await progress(0.5)
+    summaries = await asyncio.to_thread(generate_comprehensive_summaries, params["topic"], papers)
+    return summaries.model_dump(mode="json", by_alias=True)
+
+
+@job_queue.handler("sample_paper")
+async def sample_paper_job(params: Dict[str, Any], progress) -> Dict[str, Any]:
+    papers = await _job_papers(params)
+    await progress(0.5)
+    paper = await asyncio.to_thread(generate_sample_research_paper, params["topic"], papers)
+    return paper.model_dump(mode="json", by_alias=True)
+
+
+@job_queue.handler("audio")
+async def audio_job(params: Dict[str, Any], progress) -> Dict[str, Any]:
+    if not params.get("text"):
+        raise JobFailed("text is required")
+    return await mcp_client.synthesize_audio(params["text"], params.get("voice", "neutral"))
+
+
+@app.post("/api/jobs", response_model=JobOut, status_code=202)
+async def create_job(request: JobCreate, user: Optional[UserOut] = Depends(research_user)):
+    """Queue a background job; poll ``GET /api/jobs/{id}`` for its progress and result."""
+    try:
+        job = await job_queue.submit(request.kind, request.params, request.priority, user_id=user_id(user))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_response(JobOut.model_validate(job), status_code=202)
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str, user: Optional[UserOut] = Depends(research_user)):
+    """Status, progress and (once succeeded) result of a background job submitted by the caller."""
+    job = await job_queue.get(job_id)
+    # Other users' jobs look missing rather than forbidden, so ids can't be probed
+    if job is None or (user is not None and job.user_id != user.id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return model_response(JobOut.model_validate(job))
@@ -1,315 +1,259 @@
 """MCP Client integration for RAMA backend."""
 
 import asyncio
+import itertools
 import json
 import logging
-import subprocess
 import sys
-from typing import Any, Dict, List, Optional
-from contextlib import asynccontextmanager
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+from .core import config
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the standard library is used otherwise
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
-class MCPClient:
-    """Client for communicating with RAMA Research MCP Server."""
-    
-    def __init__(self):
-        self.process = None
-        self.initialized = False
-    
-    async def start(self):
-        """Start the MCP server process."""
+# The MCP server package lives next to the backend: <repo>/mcp-server
+MCP_SERVER_DIR = Path(__file__).resolve().parents[2] / "mcp-server"
+
+# Tool results for large paper lists easily exceed asyncio's 64 KiB line limit
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+# Experimental capability under which the RAMA server returns tool payloads as
+# structuredContent instead of JSON text (see rama_research_server.codec)
+COMPACT_PAYLOAD_CAPABILITY = "rama/compactPayload"
+
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps(message: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(message)
+    return json.dumps(message, separators=(",", ":")).encode()
+
+
+def _search_arguments(query: str, max_results: int, latency_budget: Optional[float]) -> Dict[str, Any]:
+    arguments = {"query": query, "max_results": max_results, "sources": ["arxiv", "scholar"]}
+    budget = config.SEARCH_LATENCY_BUDGET_SECONDS if latency_budget is None else latency_budget
+    if budget > 0:
+        arguments["latency_budget"] = budget
+    return arguments
+
+
+class MCPError(RuntimeError):
+    """Raised when the MCP server answers a request with a JSON-RPC error."""
+
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class MCPConnectionClosed(ConnectionError):
+    """Raised for requests that were in flight when the server pipe closed."""
+
+
+class MCPTools:
+    """The RAMA research tools on top of ``call_tool``, with mock fallbacks.
+
+    Shared by :class:`MCPClient` (one server process) and :class:`MCPClientPool`
+    (a pool of them); subclasses provide :meth:`call_tool`.
+    """
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def stream_tool(self, name: str, arguments: Dict[str, Any],
+                          timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Call an MCP tool, yielding its incremental results before the final one.
+
+        Yields ``("progress", payload)`` for every progress notification whose
+        message carries a JSON payload, then ``("result", data)`` once.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_progress(params: Dict[str, Any]):
+            try:
+                queue.put_nowait(("progress", _loads(params.get("message") or "null")))
+            except ValueError:
+                pass
+
+        call = asyncio.create_task(self.call_tool(name, arguments, timeout=timeout, on_progress=on_progress))
+        call.add_done_callback(lambda _: queue.put_nowait(None))
         try:
-            # Start the MCP server as a subprocess
-            cmd = [sys.executable, "-m", "rama_research_server.server"]
-            self.process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd="../mcp-server"
-            )
-            
-            # Initialize the connection
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "resources": {},
-                        "tools": {}
-                    },
-                    "clientInfo": {
-                        "name": "rama-backend",
-                        "version": "0.1.0"
-                    }
-                }
-            }
-            
-            await self._send_request(init_request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                self.initialized = True
-                logger.info("MCP Server initialized successfully")
-            else:
-                logger.error(f"MCP Server initialization failed: {response}")
-                
-        except Exception as e:
-            logger.error(f"Failed to start MCP server: {e}")
-            self.initialized = False
-    
-    async def stop(self):
-        """Stop the MCP server process."""
-        if self.process:
-            self.process.terminate()
-            await self.process.wait()
-            self.process = None
-            self.initialized = False
-    
-    async def _send_request(self, request: Dict[str, Any]):
-        """Send a JSON-RPC request to the MCP server."""
-        if not self.process or not self.process.stdin:
-            raise RuntimeError("MCP server not started")
-        
-        request_str = json.dumps(request) + "\n"
-        self.process.stdin.write(request_str.encode())
-        await self.process.stdin.drain()
-    
-    async def _read_response(self) -> Optional[Dict[str, Any]]:
-        """Read a JSON-RPC response from the MCP server."""
-        if not self.process or not self.process.stdout:
-            return None
-        
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if item[1] is not None:
+                    yield item
+            yield "result", call.result()
+        finally:
+            call.cancel()
+
+    async def stream_search_papers(self, query: str, max_results: int = 10, timeout: Optional[float] = None,
+                                   latency_budget: Optional[float] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Search for papers, yielding ``("paper", paper)`` as each source returns one.
+
+        Ends with ``("result", data)`` carrying the complete search result.
+        """
+        streamed = 0
         try:
-            line = await self.process.stdout.readline()
-            if line:
-                return json.loads(line.decode().strip())
+            async for kind, data in self.stream_tool(
+                "search_papers",
+                _search_arguments(query, max_results, latency_budget),
+                timeout=timeout or config.MCP_SEARCH_TIMEOUT_SECONDS,
+            ):
+                if kind == "progress":
+                    streamed += 1
+                    yield "paper", data
+                else:
+                    yield "result", data
+            return
         except Exception as e:
-            logger.error(f"Error reading MCP response: {e}")
-        
-        return None
-    
-    async def search_papers(self, query: str, max_results: int = 10) -> Dict[str, Any]:
+            logger.error(f"MCP streaming paper search failed: {e!r}")
+            if streamed:
+                raise
+
+        # Fallback to mock data if MCP server fails before producing anything
+        mock = self._get_mock_papers(query)
+        for paper in mock["papers"]:
+            yield "paper", paper
+        yield "result", mock
+
+    async def search_papers(self, query: str, max_results: int = 10, timeout: Optional[float] = None,
+                            latency_budget: Optional[float] = None) -> Dict[str, Any]:
         """Search for research papers using MCP server."""
-        if not self.initialized:
-            await self.start()
-        
-        if not self.initialized:
-            # Fallback to mock data if MCP server fails
-            return self._get_mock_papers(query)
-        
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/call",
-                "params": {
-                    "name": "search_papers",
-                    "arguments": {
-                        "query": query,
-                        "max_results": max_results,
-                        "sources": ["arxiv", "scholar"]
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                content = response["result"].get("content", [])
-                if content and content[0].get("type") == "text":
-                    result_data = json.loads(content[0]["text"])
-                    return result_data
-            
+            return await self.call_tool(
+                "search_papers",
+                _search_arguments(query, max_results, latency_budget),
+                timeout=timeout or config.MCP_SEARCH_TIMEOUT_SECONDS,
+            )
         except Exception as e:
-            logger.error(f"MCP paper search failed: {e}")
-        
-        # Fallback to mock data
+            logger.error(f"MCP paper search failed: {e!r}")
+
+        # Fallback to mock data if MCP server fails
         return self._get_mock_papers(query)
-    
-    async def generate_workspace(self, topic: str) -> Dict[str, Any]:
+
+    async def generate_workspace(self, topic: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Generate research workspace using MCP server."""
-        if not self.initialized:
-            await self.start()
-        
-        if not self.initialized:
-            return self._get_mock_workspace(topic)
-        
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": "generate_workspace",
-                    "arguments": {
-                        "topic": topic,
-                        "include_tools": True,
-                        "include_files": True
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                content = response["result"].get("content", [])
-                if content and content[0].get("type") == "text":
-                    return json.loads(content[0]["text"])
-            
+            return await self.call_tool(
+                "generate_workspace",
+                {
+                    "topic": topic,
+                    "include_tools": True,
+                    "include_files": True
+                },
+                timeout=timeout,
+            )
         except Exception as e:
-            logger.error(f"MCP workspace generation failed: {e}")
-        
+            logger.error(f"MCP workspace generation failed: {e!r}")
+
         return self._get_mock_workspace(topic)
-    
-    async def create_mindmap(self, topic: str) -> Dict[str, Any]:
+
+    async def create_mindmap(self, topic: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Create research mindmap using MCP server."""
-        if not self.initialized:
-            await self.start()
-        
-        if not self.initialized:
-            return self._get_mock_mindmap(topic)
-        
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 4,
-                "method": "tools/call",
-                "params": {
-                    "name": "create_mindmap",
-                    "arguments": {
-                        "topic": topic,
-                        "depth": 3,
-                        "include_connections": True
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                content = response["result"].get("content", [])
-                if content and content[0].get("type") == "text":
-                    return json.loads(content[0]["text"])
-            
+            return await self.call_tool(
+                "create_mindmap",
+                {
+                    "topic": topic,
+                    "depth": 3,
+                    "include_connections": True
+                },
+                timeout=timeout,
+            )
         except Exception as e:
-            logger.error(f"MCP mindmap creation failed: {e}")
-        
+            logger.error(f"MCP mindmap creation failed: {e!r}")
+
         return self._get_mock_mindmap(topic)
-    
-    async def generate_comprehensive_summaries(self, query: str, papers: List[Dict]) -> Dict[str, Any]:
+
+    async def generate_comprehensive_summaries(self, query: str, papers: List[Dict],
+                                               timeout: Optional[float] = None) -> Dict[str, Any]:
         """Generate comprehensive summaries using MCP server."""
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 4,
-                "method": "tools/call",
-                "params": {
-                    "name": "generate_comprehensive_summaries",
-                    "arguments": {
-                        "query": query,
-                        "papers": papers
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                return response["result"]["content"][0]["text"]
-            
+            return await self.call_tool(
+                "generate_comprehensive_summaries",
+                {
+                    "topic": query,
+                    "papers": papers
+                },
+                timeout=timeout,
+            )
         except Exception as e:
-            logger.error(f"MCP comprehensive summaries generation failed: {e}")
-        
+            logger.error(f"MCP comprehensive summaries generation failed: {e!r}")
+
         return self._get_mock_summaries(query, papers)
-    
-    async def generate_ieee_citations(self, papers: List[Dict]) -> Dict[str, Any]:
+
+    async def generate_ieee_citations(self, papers: List[Dict], timeout: Optional[float] = None) -> Dict[str, Any]:
         """Generate IEEE citations using MCP server."""
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 5,
-                "method": "tools/call",
-                "params": {
-                    "name": "generate_ieee_citations",
-                    "arguments": {
-                        "papers": papers
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                return response["result"]["content"][0]["text"]
-            
+            return await self.call_tool(
+                "generate_ieee_citations",
+                {
+                    "papers": papers
+                },
+                timeout=timeout,
+            )
         except Exception as e:
-            logger.error(f"MCP IEEE citations generation failed: {e}")
-        
+            logger.error(f"MCP IEEE citations generation failed: {e!r}")
+
         return self._get_mock_citations(papers)
-    
-    async def generate_sample_paper(self, query: str, papers: List[Dict]) -> Dict[str, Any]:
+
+    async def generate_sample_paper(self, query: str, papers: List[Dict],
+                                    timeout: Optional[float] = None) -> Dict[str, Any]:
         """Generate sample research paper using MCP server."""
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 6,
-                "method": "tools/call",
-                "params": {
-                    "name": "generate_sample_paper",
-                    "arguments": {
-                        "query": query,
-                        "papers": papers
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                return response["result"]["content"][0]["text"]
-            
+            return await self.call_tool(
+                "generate_sample_paper",
+                {
+                    "topic": query,
+                    "papers": papers
+                },
+                timeout=timeout,
+            )
         except Exception as e:
-            logger.error(f"MCP sample paper generation failed: {e}")
-        
+            logger.error(f"MCP sample paper generation failed: {e!r}")
+
         return self._get_mock_sample_paper(query, papers)
-    
-    async def create_interactive_mindmap(self, query: str, papers: List[Dict]) -> Dict[str, Any]:
+
+    async def synthesize_audio(self, text: str, voice: str = "neutral",
+                               timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Synthesize speech for ``text`` using MCP server.
+
+        There is no mock fallback: failures propagate so background jobs can retry.
+        """
+        return await self.call_tool("synthesize_audio", {"text": text, "voice": voice}, timeout=timeout)
+
+    async def create_interactive_mindmap(self, query: str, papers: List[Dict],
+                                         timeout: Optional[float] = None) -> Dict[str, Any]:
         """Create interactive mindmap using MCP server."""
         try:
-            request = {
-                "jsonrpc": "2.0",
-                "id": 7,
-                "method": "tools/call",
-                "params": {
-                    "name": "create_interactive_mindmap",
-                    "arguments": {
-                        "query": query,
-                        "papers": papers
-                    }
-                }
-            }
-            
-            await self._send_request(request)
-            response = await self._read_response()
-            
-            if response and response.get("result"):
-                return response["result"]["content"][0]["text"]
-            
+            return await self.call_tool(
+                "create_interactive_mindmap",
+                {
+                    "topic": query,
+                    "papers": papers
+                },
+                timeout=timeout,
+            )
         except Exception as e:
-            logger.error(f"MCP interactive mindmap creation failed: {e}")
-        
+            logger.error(f"MCP interactive mindmap creation failed: {e!r}")
+
         return self._get_mock_interactive_mindmap(query, papers)
-    
+
     def _get_mock_papers(self, query: str) -> Dict[str, Any]:
         """Fallback mock papers when MCP server is unavailable."""
         return {
@@ -553,5 +497,405 @@ class MCPClient:
             ]
         }
 
+
+class MCPClient(MCPTools):
+    """Client for communicating with RAMA Research MCP Server.
+
+    Requests are multiplexed over the single stdio pipe: every request gets an id
+    from a monotonic counter, and one background reader task routes each reply to
+    the future of the request that is waiting for it. Any number of calls can be in
+    flight at once, each with its own timeout and cancellation.
+    """
+
+    def __init__(self, request_timeout: Optional[float] = None, compact_payloads: Optional[bool] = None):
+        self.process = None
+        self.initialized = False
+        self.request_timeout = request_timeout or config.MCP_REQUEST_TIMEOUT_SECONDS
+        self.compact_payloads = config.MCP_COMPACT_PAYLOADS if compact_payloads is None else compact_payloads
+        # Whether the running server agreed to send tool payloads as structuredContent
+        self.compact = False
+        self._bytes_received = 0
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        # Progress-notification callbacks, keyed by progress token (the request id)
+        self._progress: Dict[int, Callable[[Dict[str, Any]], None]] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently awaiting a reply."""
+        return len(self._pending)
+
+    @property
+    def bytes_received(self) -> int:
+        """Bytes read from the server's stdout so far (payload size accounting)."""
+        return self._bytes_received
+
+    async def start(self):
+        """Start the MCP server process."""
+        async with self._start_lock:
+            if self.initialized:
+                return
+            if self.process is not None:
+                # Reap a previous server process that died underneath us
+                await self._terminate()
+            try:
+                started = time.perf_counter()
+                # Start the MCP server as a subprocess
+                cmd = [sys.executable, "-m", "rama_research_server.server"]
+                self.process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(MCP_SERVER_DIR),
+                    limit=_STREAM_LIMIT,
+                )
+                self._reader_task = asyncio.create_task(self._read_loop(self.process))
+                self._stderr_task = asyncio.create_task(self._drain_stderr(self.process))
+                spawned = time.perf_counter()
+
+                # Initialize the connection
+                result = await self.request(
+                    "initialize",
+                    {
+                        "protocolVersion": "2024-11-05",
+                        "capabilities": {
+                            "resources": {},
+                            "tools": {},
+                            "experimental": (
+                                {COMPACT_PAYLOAD_CAPABILITY: {"version": 1}} if self.compact_payloads else {}
+                            ),
+                        },
+                        "clientInfo": {
+                            "name": "rama-backend",
+                            "version": "0.1.0"
+                        }
+                    },
+                    timeout=config.MCP_STARTUP_TIMEOUT_SECONDS,
+                )
+                await self.notify("notifications/initialized")
+                server_experimental = (result.get("capabilities") or {}).get("experimental") or {}
+                self.compact = self.compact_payloads and COMPACT_PAYLOAD_CAPABILITY in server_experimental
+                self.initialized = True
+                logger.info("MCP Server initialized successfully (%s): spawn %.0fms, initialize %.0fms",
+                            result.get("serverInfo"), (spawned - started) * 1000,
+                            (time.perf_counter() - spawned) * 1000)
+
+            except Exception as e:
+                logger.error(f"Failed to start MCP server: {e}")
+                await self._terminate()
+
+    async def stop(self):
+        """Stop the MCP server process."""
+        async with self._start_lock:
+            await self._terminate()
+
+    async def _terminate(self):
+        self.initialized = False
+        process, self.process = self.process, None
+        if process and process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done():
+                task.cancel()
+        self._reader_task = self._stderr_task = None
+        self._fail_pending(MCPConnectionClosed("MCP server stopped"))
+
+    async def _ensure_started(self) -> bool:
+        if not self.initialized:
+            await self.start()
+        return self.initialized
+
+    # --- JSON-RPC transport ------------------------------------------------------
+
+    async def _write(self, message: Dict[str, Any]):
+        """Write one JSON-RPC message to the server's stdin."""
+        if not self.process or not self.process.stdin:
+            raise MCPConnectionClosed("MCP server not started")
+
+        data = _dumps(message) + b"\n"
+        # Concurrent writers must not interleave partial lines on the pipe
+        async with self._write_lock:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Send a JSON-RPC notification (no reply expected)."""
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._write(message)
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None,
+                      on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Send a JSON-RPC request and wait for its correlated reply.
+
+        Raises ``asyncio.TimeoutError`` after ``timeout`` seconds (defaults to
+        ``request_timeout``). On timeout or cancellation the server is told to
+        abandon the request via ``notifications/cancelled``. If ``on_progress`` is
+        given, the request carries a progress token and ``on_progress`` receives the
+        params of every ``notifications/progress`` the server sends for it.
+
+        Time spent waiting for the pipe and for the reply is observed as the
+        ``queue`` and ``server`` phases of ``rama_mcp_call_seconds``.
+        """
+        started = time.perf_counter()
+        label = params.get("name", method) if method == "tools/call" and params else method
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        if on_progress is not None:
+            message["params"] = {**(params or {}), "_meta": {"progressToken": request_id}}
+            self._progress[request_id] = on_progress
+
+        try:
+            await self._write(message)
+            sent = time.perf_counter()
+            metrics.MCP_CALL_SECONDS.labels(method=label, phase="queue").observe(sent - started)
+            result = await asyncio.wait_for(future, timeout or self.request_timeout)
+            elapsed = time.perf_counter() - sent
+            metrics.MCP_CALL_SECONDS.labels(method=label, phase="server").observe(elapsed)
+            metrics.record(f"mcp.{label}.queue", sent - started)
+            metrics.record(f"mcp.{label}.server", elapsed)
+            return result
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if self._pending.pop(request_id, None) is not None:
+                reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "cancelled"
+                # Fire and forget: the caller may itself be in the middle of being cancelled
+                asyncio.ensure_future(self._cancel_remote(request_id, reason))
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+            self._progress.pop(request_id, None)
+
+    async def _cancel_remote(self, request_id: int, reason: str):
+        try:
+            await self.notify("notifications/cancelled", {"requestId": request_id, "reason": reason})
+        except Exception as e:
+            logger.debug(f"Could not cancel MCP request {request_id}: {e}")
+
+    async def _read_loop(self, process):
+        """Route every reply on the server's stdout to its pending request future."""
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                self._bytes_received += len(line)
+                try:
+                    message = _loads(line)
+                except ValueError:
+                    logger.warning("Discarding non JSON-RPC output from MCP server: %r", line[:200])
+                    continue
+                await self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading MCP response: {e}")
+        finally:
+            if self.process is process:
+                self.initialized = False
+            self._fail_pending(MCPConnectionClosed("MCP server closed the connection"))
+
+    async def _dispatch(self, message: Dict[str, Any]):
+        if "method" in message:
+            # Server-initiated request or notification
+            if message["method"] == "ping" and "id" in message:
+                await self._write({"jsonrpc": "2.0", "id": message["id"], "result": {}})
+            elif message["method"] == "notifications/progress":
+                params = message.get("params") or {}
+                callback = self._progress.get(params.get("progressToken"))
+                if callback is not None:
+                    callback(params)
+            return
+
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            # Reply for a request that already timed out or was cancelled
+            return
+        if "error" in message:
+            error = message["error"] or {}
+            future.set_exception(MCPError(error.get("message", "MCP error"), error.get("code"), error.get("data")))
+        else:
+            future.set_result(message.get("result") or {})
+
+    async def _drain_stderr(self, process):
+        """Forward server logs; an unread stderr pipe would eventually block the server."""
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                return
+            logger.debug("mcp-server: %s", line.decode(errors="replace").rstrip())
+
+    def _fail_pending(self, exc: BaseException):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    # --- Tools ---------------------------------------------------------------------
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Call an MCP tool and return its payload.
+
+        With the compact payload capability negotiated the payload arrives already
+        decoded as ``structuredContent``; otherwise it is parsed from the JSON text.
+        """
+        if not await self._ensure_started():
+            raise MCPConnectionClosed("MCP server unavailable")
+
+        result = await self.request("tools/call", {"name": name, "arguments": arguments},
+                                    timeout=timeout, on_progress=on_progress)
+        if result.get("isError"):
+            raise MCPError(f"Tool {name} failed: {result.get('content')}")
+
+        structured = result.get("structuredContent")
+        if structured is not None:
+            return structured
+        content = result.get("content", [])
+        if content and content[0].get("type") == "text":
+            with metrics.span(f"mcp.{name}.decode", metrics.MCP_CALL_SECONDS, method=name, phase="decode"):
+                return _loads(content[0]["text"])
+        raise MCPError(f"Tool {name} returned no text content")
+
+
+class MCPClientPool(MCPTools):
+    """Load-balanced pool of MCP server worker processes.
+
+    Each worker is an independent :class:`MCPClient` with its own server process.
+    ``tools/call`` requests go to the healthy worker with the fewest requests in
+    flight. Crashed workers are restarted in the background, and requests that were
+    in flight on a worker when it died are retried on another healthy worker.
+    """
+
+    def __init__(self, size: Optional[int] = None, request_timeout: Optional[float] = None,
+                 compact_payloads: Optional[bool] = None):
+        self.initialized = False
+        self.size = max(1, size or config.MCP_POOL_SIZE)
+        self.workers = [MCPClient(request_timeout, compact_payloads) for _ in range(self.size)]
+        self._restarts: Dict[int, asyncio.Task] = {}
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(worker.in_flight for worker in self.workers)
+
+    @property
+    def bytes_received(self) -> int:
+        return sum(worker.bytes_received for worker in self.workers)
+
+    async def start(self):
+        """Start all worker processes concurrently; raises if none of them came up."""
+        async with self._start_lock:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker.start() for worker in self.workers))
+            self.initialized = any(worker.initialized for worker in self.workers)
+            logger.info("MCP worker pool started in %.0fms: %d/%d workers healthy",
+                        (time.perf_counter() - started) * 1000,
+                        sum(worker.initialized for worker in self.workers), self.size)
+            if not self.initialized:
+                raise MCPConnectionClosed("No MCP worker could be started")
+
+    async def stop(self):
+        """Stop all worker processes."""
+        async with self._start_lock:
+            for task in self._restarts.values():
+                task.cancel()
+            self._restarts.clear()
+            await asyncio.gather(*(worker.stop() for worker in self.workers))
+            self.initialized = False
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-worker health and queue depth."""
+        return [
+            {
+                "worker": index,
+                "pid": worker.process.pid if worker.process else None,
+                "healthy": worker.initialized,
+                "restarting": index in self._restarts,
+                "in_flight": worker.in_flight,
+                "compact_payloads": worker.compact,
+            }
+            for index, worker in enumerate(self.workers)
+        ]
+
+    def _pick_worker(self) -> Optional[MCPClient]:
+        healthy = []
+        for index, worker in enumerate(self.workers):
+            if worker.initialized:
+                healthy.append(worker)
+            elif self.initialized:
+                self._schedule_restart(index)
+        if not healthy:
+            return None
+        return min(healthy, key=lambda worker: worker.in_flight)
+
+    def _schedule_restart(self, index: int):
+        if index in self._restarts:
+            return
+        task = asyncio.create_task(self._restart(index))
+        self._restarts[index] = task
+        task.add_done_callback(lambda _: self._restarts.pop(index, None))
+
+    async def _restart(self, index: int):
+        worker = self.workers[index]
+        delay = config.MCP_WORKER_RESTART_BACKOFF_SECONDS
+        while not worker.initialized:
+            logger.warning("Restarting MCP worker %d", index)
+            await worker.start()
+            if worker.initialized:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None,
+                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Call an MCP tool on the least-loaded healthy worker."""
+        if not self.initialized:
+            await self.start()
+
+        delivered = 0
+        if on_progress is not None:
+            forward = on_progress
+
+            def on_progress(params: Dict[str, Any]):
+                nonlocal delivered
+                delivered += 1
+                forward(params)
+
+        for _ in range(self.size):
+            worker = self._pick_worker()
+            if worker is None:
+                break
+            try:
+                return await worker.call_tool(name, arguments, timeout=timeout, on_progress=on_progress)
+            except MCPConnectionClosed as e:
+                if delivered:
+                    # Partial results already reached the caller; a retry would repeat them
+                    raise
+                # The worker died with our request in flight; tools are idempotent so retry elsewhere
+                logger.warning(f"MCP worker failed during {name}: {e}; retrying on another worker")
+                self._schedule_restart(self.workers.index(worker))
+
+        raise MCPConnectionClosed("No healthy MCP workers available")
+
+
 # Global MCP client instance
-mcp_client = MCPClient()
+mcp_client = MCPClientPool()
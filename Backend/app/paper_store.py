@@ -0,0 +1,283 @@
+"""Persistence of search results: papers, their authors, and which query returned them.
+
+Every upstream search is written in one transaction: papers and authors are
+upserted in bulk (matched on ``external_id`` and ``name``), and the query's
+ranked results replace the previous ones. A query repeated within
+``QUERY_RESULTS_TTL_SECONDS`` is then answered from the ``query_results`` index
+without an upstream search, and papers can be looked up by id.
+"""
+
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import delete, func, select
+
+from . import metrics
+from .core import config
+from .db import models
+from .db.session import LazySession
+from .schemas.research import ResearchPaper
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _WHITESPACE.sub(" ", prompt).strip().lower()
+
+
+def paper_key(paper: ResearchPaper) -> str:
+    """Stable identity of a paper across searches."""
+    if paper.external_id:
+        return paper.external_id
+    if paper.doi:
+        return f"doi_{paper.doi.lower()}"
+    title = normalize_prompt(paper.title)
+    return f"title_{hashlib.sha1(title.encode()).hexdigest()[:20]}"
+
+
+def _insert(session):
+    """The dialect's INSERT construct, which supports ON CONFLICT for upserts."""
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not implemented for {dialect}")
+    return insert
+
+
+def _to_schema(paper: models.Paper, relevance_score: int) -> ResearchPaper:
+    # Rows were validated when they were stored
+    return ResearchPaper.model_construct(
+        id=paper.id,
+        title=paper.title,
+        authors=[author.name for author in paper.authors],
+        abstract=paper.abstract,
+        year=paper.year,
+        journal=paper.journal,
+        citations=paper.citations,
+        relevance_score=relevance_score,
+        keywords=list(paper.keywords or []),
+        url=paper.url,
+        doi=paper.doi,
+        external_id=paper.external_id,
+    )
+
+
+async def recent_results(db: LazySession, prompt: str, limit: int = 10) -> Optional[List[ResearchPaper]]:
+    """Stored results of ``prompt`` if it ran within the TTL, best first; else None."""
+    if config.QUERY_RESULTS_TTL_SECONDS <= 0:
+        return None
+    cutoff = datetime.utcnow() - timedelta(seconds=config.QUERY_RESULTS_TTL_SECONDS)
+    session = await db.get()
+    with metrics.span("db.recent_results"):
+        query_id = (await session.execute(
+            select(models.Query.id)
+            .where(models.Query.normalized_prompt == normalize_prompt(prompt), models.Query.last_run_at >= cutoff)
+        )).scalar_one_or_none()
+        if query_id is None:
+            return None
+        rows = (await session.execute(
+            select(models.Paper, models.QueryResult.relevance_score)
+            .join(models.QueryResult, models.QueryResult.paper_id == models.Paper.id)
+            .where(models.QueryResult.query_id == query_id)
+            .order_by(models.QueryResult.rank)
+            .limit(limit)
+        )).all()
+    return [_to_schema(paper, relevance) for paper, relevance in rows] or None
+
+
+async def save_search(db: LazySession, prompt: str, papers: List[ResearchPaper]) -> List[ResearchPaper]:
+    """Store a search's ranked papers in one transaction.
+
+    Returns the papers renumbered with their database ids, so later lookups by
+    id (e.g. per-paper summaries) are indexed reads.
+    """
+    now = datetime.utcnow()
+    by_key: Dict[str, ResearchPaper] = {}
+    for paper in papers:
+        by_key.setdefault(paper_key(paper), paper)
+
+    session = await db.get()
+    insert = _insert(session)
+    try:
+        with metrics.span("db.save_search"):
+            ids: Dict[str, int] = {}
+            if by_key:
+                stmt = insert(models.Paper).values([
+                    {
+                        "external_id": key,
+                        "doi": paper.doi,
+                        "title": paper.title,
+                        "abstract": paper.abstract,
+                        "year": paper.year,
+                        "journal": paper.journal,
+                        "citations": paper.citations,
+                        "url": paper.url,
+                        "keywords": paper.keywords,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for key, paper in by_key.items()
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[models.Paper.external_id],
+                    set_={
+                        "doi": func.coalesce(stmt.excluded.doi, models.Paper.doi),
+                        "title": stmt.excluded.title,
+                        "abstract": stmt.excluded.abstract,
+                        "year": stmt.excluded.year,
+                        "journal": stmt.excluded.journal,
+                        "citations": stmt.excluded.citations,
+                        "url": func.coalesce(stmt.excluded.url, models.Paper.url),
+                        "keywords": stmt.excluded.keywords,
+                        "updated_at": now,
+                    },
+                ).returning(models.Paper.external_id, models.Paper.id)
+                ids = dict((await session.execute(stmt)).all())
+                await _link_authors(session, insert, {ids[key]: paper.authors for key, paper in by_key.items()})
+
+            query_id = (await session.execute(
+                insert(models.Query)
+                .values(normalized_prompt=normalize_prompt(prompt), prompt=prompt,
+                        run_count=1, created_at=now, last_run_at=now)
+                .on_conflict_do_update(
+                    index_elements=[models.Query.normalized_prompt],
+                    set_={"prompt": prompt, "last_run_at": now, "run_count": models.Query.run_count + 1},
+                )
+                .returning(models.Query.id)
+            )).scalar_one()
+            await session.execute(delete(models.QueryResult).where(models.QueryResult.query_id == query_id))
+
+            stored: List[ResearchPaper] = []
+            results: List[Dict[str, Any]] = []
+            seen = set()
+            for paper in papers:
+                paper_id = ids[paper_key(paper)]
+                if paper_id in seen:
+                    continue
+                seen.add(paper_id)
+                results.append({"query_id": query_id, "paper_id": paper_id, "rank": len(results),
+                                "relevance_score": paper.relevance_score})
+                stored.append(paper.model_copy(update={"id": paper_id}))
+            if results:
+                await session.execute(insert(models.QueryResult).values(results))
+            await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    return stored
+
+
+async def _link_authors(session, insert, authors_by_paper: Dict[int, List[str]]):
+    names = list(dict.fromkeys(name for authors in authors_by_paper.values() for name in authors))
+    if not names:
+        return
+    await session.execute(
+        insert(models.Author).values([{"name": name} for name in names])
+        .on_conflict_do_nothing(index_elements=[models.Author.name])
+    )
+    author_ids = dict((await session.execute(
+        select(models.Author.name, models.Author.id).where(models.Author.name.in_(names))
+    )).all())
+    links = [
+        {"paper_id": paper_id, "author_id": author_ids[name], "position": position}
+        for paper_id, authors in authors_by_paper.items()
+        for position, name in enumerate(dict.fromkeys(authors))
+    ]
+    await session.execute(insert(models.paper_authors).values(links).on_conflict_do_nothing())
+
+
+async def get_paper(db: LazySession, paper_id: int) -> Optional[ResearchPaper]:
+    """A stored paper by id, with its best relevance score across queries."""
+    session = await db.get()
+    paper = await session.get(models.Paper, paper_id)
+    if paper is None:
+        return None
+    relevance = (await session.execute(
+        select(func.max(models.QueryResult.relevance_score)).where(models.QueryResult.paper_id == paper_id)
+    )).scalar()
+    return _to_schema(paper, relevance or 0)
+
+
+async def with_stored_ids(db: LazySession, papers: List[ResearchPaper]) -> List[ResearchPaper]:
+    """The papers that are stored, in order, renumbered with their database ids.
+
+    Papers are matched on :func:`paper_key`; those without a row are left out.
+    """
+    keys = [paper_key(paper) for paper in papers]
+    if not keys:
+        return []
+    session = await db.get()
+    ids = dict((await session.execute(
+        select(models.Paper.external_id, models.Paper.id).where(models.Paper.external_id.in_(set(keys)))
+    )).all())
+    stored: List[ResearchPaper] = []
+    seen = set()
+    for key, paper in zip(keys, papers):
+        paper_id = ids.get(key)
+        if paper_id is not None and paper_id not in seen:
+            seen.add(paper_id)
+            stored.append(paper.model_copy(update={"id": paper_id}))
+    return stored
+
+
+async def query_id(db: LazySession, prompt: str) -> Optional[int]:
+    """Id of the stored query for ``prompt``, however long ago it ran."""
+    session = await db.get()
+    return (await session.execute(
+        select(models.Query.id).where(models.Query.normalized_prompt == normalize_prompt(prompt))
+    )).scalar_one_or_none()
+
+
+async def iter_papers(db: LazySession, query_id: Optional[int] = None,
+                      batch_size: int = 500) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stored papers as plain dicts, ``batch_size`` at a time.
+
+    Every paper in id order, or only the results of ``query_id`` in rank order.
+    Batches are read with keyset pagination and dropped from the session once
+    yielded, so the whole library is never held in memory.
+    """
+    session = await db.get()
+    stmt = select(models.Paper)
+    if query_id is None:
+        position = models.Paper.id
+    else:
+        position = models.QueryResult.rank
+        stmt = stmt.join(models.QueryResult, models.QueryResult.paper_id == models.Paper.id).where(
+            models.QueryResult.query_id == query_id
+        )
+    stmt = stmt.add_columns(position).order_by(position).limit(batch_size)
+    after = None
+    while True:
+        page = stmt if after is None else stmt.where(position > after)
+        with metrics.span("db.iter_papers"):
+            rows = (await session.execute(page)).all()
+        if not rows:
+            return
+        batch = [
+            {
+                "id": paper.id,
+                "external_id": paper.external_id,
+                "title": paper.title,
+                "authors": [author.name for author in paper.authors],
+                "abstract": paper.abstract,
+                "year": paper.year,
+                "journal": paper.journal,
+                "doi": paper.doi,
+                "url": paper.url,
+                "keywords": list(paper.keywords or []),
+            }
+            for paper, _ in rows
+        ]
+        after = rows[-1][1]
+        session.expunge_all()
+        yield batch
+        if len(rows) < batch_size:
+            return
@@ -0,0 +1,136 @@
+"""Password hashing on a dedicated, bounded process pool.
+
+bcrypt is CPU-bound by design. Running it on the event loop or the default
+threadpool lets a burst of logins starve every other request. Hashes are
+computed in ``PASSWORD_HASH_WORKERS`` separate processes instead, and at most
+``PASSWORD_HASH_MAX_QUEUE`` operations may wait for one. Beyond that, new
+operations fail fast with :class:`HashingOverloaded`, which the API turns into
+a 503 with ``Retry-After``.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from . import metrics
+from .core import config
+
+logger = logging.getLogger(__name__)
+
+_context: Optional[CryptContext] = None
+
+
+def _init_worker(rounds: int):
+    global _context
+    _context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _hash(password: str) -> str:
+    return _context.hash(password)
+
+
+def _ping() -> bool:
+    return _context is not None
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    # Returns a new hash when the stored one uses a different cost than configured
+    return _context.verify_and_update(password, hashed)
+
+
+class HashingOverloaded(RuntimeError):
+    """Raised when the hashing queue is full; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing is overloaded; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Async bcrypt hashing with a concurrency cap and queue-length load shedding."""
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 rounds: Optional[int] = None):
+        self.workers = max(1, workers or config.PASSWORD_HASH_WORKERS)
+        self.max_queue = max(0, config.PASSWORD_HASH_MAX_QUEUE if max_queue is None else max_queue)
+        self.rounds = rounds or config.BCRYPT_ROUNDS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        # Moving average of one operation's run time, used to estimate Retry-After
+        self._avg_seconds = 0.25
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs an event loop and threads is unsafe; forkserver
+            # (or spawn on Windows) starts workers from a clean interpreter instead
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(self.rounds,),
+            )
+        return self._executor
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        return max(1, math.ceil(self._in_flight * self._avg_seconds / self.workers))
+
+    async def _run(self, operation: str, func, *args):
+        if self._in_flight >= self.workers + self.max_queue:
+            metrics.PASSWORD_HASH_REJECTED.labels(operation=operation).inc()
+            raise HashingOverloaded(self.retry_after())
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool and retry once
+                logger.warning("Password hashing pool broke; restarting it")
+                self.shutdown(wait=False)
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            elapsed = time.perf_counter() - started
+            metrics.PASSWORD_HASH_SECONDS.labels(operation=operation).observe(elapsed)
+            metrics.record(f"password.{operation}", elapsed)
+            if self._in_flight < self.workers:
+                # Only uncontended runs measure the cost of bcrypt itself
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+
+    async def warm(self):
+        """Start the worker processes now rather than on the first login."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Concurrent submissions make the executor spawn up to ``workers`` processes
+        await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.workers)))
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check ``password``; also return a replacement hash if ``hashed`` needs a rehash."""
+        return await self._run("verify", _verify_and_update, password, hashed)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,120 @@
+"""Small dependency-graph executor for multi-stage request pipelines.
+
+Stages are async callables with named dependencies. Every stage starts as soon
+as the stages it depends on have finished, so independent stages run
+concurrently and end-to-end latency tracks the slowest dependency chain rather
+than the sum of all stages. A total deadline bounds the whole run: whatever has
+not finished by then is cancelled and reported as pending.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class Stage:
+    name: str
+    func: StageFunc
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class GraphResult:
+    """Outcome of a :meth:`StageGraph.run` call."""
+
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    pending: List[str] = field(default_factory=list)
+    # Seconds each stage spent running, excluding the wait for its dependencies
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Every stage of the graph, in registration order
+    stages: List[str] = field(default_factory=list)
+
+    @property
+    def incomplete(self) -> List[str]:
+        """Stages that timed out or failed, in registration order."""
+        return [name for name in self.stages if name in self.errors or name in self.pending]
+
+
+class StageGraph:
+    """Run async stages concurrently, respecting their dependencies."""
+
+    def __init__(self):
+        self._stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, func: StageFunc, deps: Iterable[str] = ()) -> "StageGraph":
+        """Register a stage.
+
+        ``func`` is awaited with the results of ``deps`` as keyword arguments.
+        """
+        deps = tuple(deps)
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name!r} depends on unknown stages: {missing}")
+        self._stages[name] = Stage(name, func, deps)
+        return self
+
+    async def run(self, deadline: Optional[float] = None,
+                  on_stage: Optional[Callable[[str, Any], None]] = None) -> GraphResult:
+        """Run every stage; give up on unfinished stages after ``deadline`` seconds.
+
+        ``on_stage(name, result)`` is called as soon as each stage succeeds, which
+        lets callers stream sections before the whole graph has finished.
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+        outcome = GraphResult(stages=list(self._stages))
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.create_task(
+                self._run_stage(stage, tasks, on_stage, outcome.timings), name=f"stage:{stage.name}"
+            )
+
+        if not tasks:
+            return outcome
+
+        try:
+            _, not_done = await asyncio.wait(tasks.values(), timeout=deadline)
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            await asyncio.gather(*not_done, return_exceptions=True)
+
+        for name, task in tasks.items():
+            if task in not_done:
+                outcome.pending.append(name)
+            elif task.exception() is not None:
+                outcome.errors[name] = task.exception()
+            else:
+                outcome.results[name] = task.result()
+
+        if outcome.pending:
+            logger.warning("Pipeline deadline of %ss reached; unfinished stages: %s", deadline, outcome.pending)
+        return outcome
+
+    @staticmethod
+    async def _run_stage(stage: Stage, tasks: Dict[str, asyncio.Task],
+                         on_stage: Optional[Callable[[str, Any], None]], timings: Dict[str, float]) -> Any:
+        if stage.deps:
+            # asyncio.wait (unlike gather) never cancels the shared dependency tasks
+            await asyncio.wait([tasks[dep] for dep in stage.deps])
+        # .result() re-raises a failed dependency's exception in the dependent stage
+        inputs = {dep: tasks[dep].result() for dep in stage.deps}
+        started = time.perf_counter()
+        try:
+            result = await stage.func(**inputs)
+        finally:
+            timings[stage.name] = time.perf_counter() - started
+        if on_stage is not None:
+            on_stage(stage.name, result)
+        return result
@@ -0,0 +1,31 @@
+"""Schemas for background jobs."""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+    # 0 runs first, 9 last
+    priority: int = Field(5, ge=0, le=9)
+
+
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: str
+    priority: int
+    progress: float
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
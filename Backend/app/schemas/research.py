@@ -1,10 +1,15 @@
 """Research-specific schemas for RAMA project."""
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Iterable, List, Literal, Optional, Dict, Any
 from datetime import datetime
 
 
+# Sections that can be computed by a background job instead of inside the request
+DeferrableSection = Literal["comprehensive_summaries", "sample_paper", "audio"]
+
+
 class ResearchQuery(BaseModel):
     prompt: str
     include_workspace: bool = True
@@ -13,6 +18,8 @@ class ResearchQuery(BaseModel):
     include_summaries: bool = True
     include_citations: bool = True
     include_sample_paper: bool = True
+    # Included sections to queue as jobs; the response carries their ids in ``jobs``
+    defer_sections: List[DeferrableSection] = []
 
 
 class ResearchPaper(BaseModel):
@@ -27,6 +34,8 @@ class ResearchPaper(BaseModel):
     keywords: List[str]
     url: Optional[str] = None
     doi: Optional[str] = None
+    # Upstream identifier, e.g. "arxiv_2401.01234"
+    external_id: Optional[str] = None
 
 
 class WorkspaceTool(BaseModel):
@@ -73,7 +82,7 @@ class MindmapConnection(BaseModel):
     label: Optional[str] = None
 
     class Config:
-        allow_population_by_field_name = True
+        populate_by_name = True
 
 
 class InteractiveMindmap(BaseModel):
@@ -175,6 +184,10 @@ class EnhancedResearchResponse(BaseModel):
     automated_citations: Optional[AutomatedCitations] = None
     sample_paper: Optional[SampleResearchPaper] = None
     audio_url: Optional[str] = None
+    # Sections that missed the request deadline or failed and were left out
+    partial_sections: List[str] = []
+    # Deferred sections -> id of the job computing them (GET /api/jobs/{id})
+    jobs: Dict[str, str] = {}
 
 
 # For backward compatibility
@@ -183,3 +196,21 @@ ResearchResponse = EnhancedResearchResponse
 
 # Enable forward references
 ResearchPaperSection.model_rebuild()
+
+
+# --- Cached validation and serialization ------------------------------------------------
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter for ``tp``; building one compiles its validator, so each is built once."""
+    return TypeAdapter(tp)
+
+
+def validate_papers(data: Iterable[Dict[str, Any]]) -> List[ResearchPaper]:
+    """Validate a list of paper dicts (e.g. from the MCP server) in a single pass."""
+    return adapter(List[ResearchPaper]).validate_python(list(data))
+
+
+def dump_json(model: BaseModel) -> bytes:
+    """JSON for an already-validated model, keyed by alias as FastAPI would render it."""
+    return model.model_dump_json(by_alias=True).encode()
@@ -0,0 +1,63 @@
+"""Coalescing of identical concurrent computations ("single flight").
+
+The first caller for a key starts the computation as a task; callers arriving
+while it runs await the same task instead of starting their own. Waiters are
+reference-counted: one waiter going away (e.g. a closed browser tab) leaves the
+task running for the others, and the task is cancelled only once every waiter
+has gone.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Generic, TypeVar
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Share one in-flight ``func()`` among concurrent callers of :meth:`do` with the same key."""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._calls: Dict[Hashable, _Call[T]] = {}
+
+    def __len__(self) -> int:
+        """Number of computations in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            outcome = "leader"
+        else:
+            outcome = "shared"
+        metrics.COALESCED_REQUESTS.labels(operation=self.operation, outcome=outcome).inc()
+
+        call.waiters += 1
+        try:
+            # shield: cancelling one waiter must not cancel the shared task
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                logger.debug(f"Cancelling {self.operation}: every waiter has gone")
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call[T]):
+        # A newer call may already own the key if this one was abandoned
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,62 @@
+"""Startup phases that warm the service in the background.
+
+The app starts accepting requests immediately; database preparation, MCP worker
+spawning and password worker spawning run as background tasks. Each phase's
+duration is logged, and ``/ready`` reports from :data:`startup` whether the
+service is warm; a failed phase keeps it not ready.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """Runs named warmup phases concurrently and records how long each took."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def record(self, name: str, seconds: float, status: str = "done"):
+        self.phases[name] = {"status": status, "seconds": round(seconds, 4)}
+        logger.info(f"Startup phase {name} {status} in {seconds * 1000:.0f}ms")
+
+    def run(self, name: str, awaitable: Awaitable[Any]) -> asyncio.Task:
+        """Run ``awaitable`` in the background as phase ``name``."""
+        self.phases[name] = {"status": "running", "seconds": None}
+        started = time.perf_counter()
+
+        async def phase():
+            try:
+                result = await awaitable
+            except Exception as e:
+                logger.error(f"Startup phase {name} failed: {e}")
+                self.record(name, time.perf_counter() - started, "failed")
+                return None
+            self.record(name, time.perf_counter() - started)
+            return result
+
+        task = asyncio.create_task(phase(), name=f"startup:{name}")
+        self._tasks.append(task)
+        return task
+
+    @property
+    def ready(self) -> bool:
+        """True once every phase has finished successfully."""
+        return all(phase["status"] == "done" for phase in self.phases.values())
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "phases": self.phases}
+
+    async def cancel(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+startup = StartupTracker()
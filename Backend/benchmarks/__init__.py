@@ -0,0 +1,8 @@
+"""Offline benchmarks for the backend and the MCP research server.
+
+Run from ``Backend/`` with ``python -m benchmarks``. arXiv and Scholar are
+replaced by the recorded results in ``fixtures/sources.json`` (including their
+typical latency), the database is a throwaway SQLite file and the MCP search
+cache is off, so runs are repeatable and need no network. Results are written
+as JSON; pass ``--compare`` with an earlier result file to print the changes.
+"""
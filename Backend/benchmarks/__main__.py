@@ -0,0 +1,118 @@
+"""Command line entry point: ``python -m benchmarks [--suite micro|mcp|api|auth] ...``."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from .common import BACKEND_DIR, MCP_SERVER_SRC, environment
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "sources.json"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SUITES = ("micro", "mcp", "api", "auth")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run (repeatable; default all)")
+    parser.add_argument("--iterations", type=int, default=200, help="iterations per microbenchmark")
+    parser.add_argument("--mcp-iterations", type=int, default=30, help="calls per MCP tool")
+    parser.add_argument("--requests", type=int, default=50, help="research queries in the API suite")
+    parser.add_argument("--concurrency", type=int, default=8, help="research queries in flight at once")
+    parser.add_argument("--logins", type=int, default=64, help="logins per hashing worker count in the auth suite")
+    parser.add_argument("--login-concurrency", type=int, default=32, help="logins in flight at once")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="recorded arXiv/Scholar results")
+    parser.add_argument("--search-cache", action="store_true", help="leave the MCP search cache and stored query results enabled")
+    parser.add_argument("--output", type=Path, help="result file (default benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier result file to diff against")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace, data_dir: str):
+    """Point the backend and every MCP server process at offline, throwaway state.
+
+    Must run before ``app`` or ``rama_research_server`` is imported; spawned MCP
+    workers inherit the environment.
+    """
+    os.environ["RAMA_SOURCE_FIXTURES"] = str(args.fixtures.resolve())
+    os.environ["RAMA_DATA_DIR"] = data_dir
+    if not args.search_cache:
+        os.environ["RAMA_SEARCH_CACHE_ENABLED"] = "0"
+        os.environ["QUERY_RESULTS_TTL_SECONDS"] = "0"
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(data_dir) / 'bench.db'}")
+    for path in (BACKEND_DIR, MCP_SERVER_SRC):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+
+def run_suites(args: argparse.Namespace) -> Dict[str, Any]:
+    from . import api, auth, mcp, micro
+
+    results: Dict[str, Any] = {}
+    for suite in args.suite or SUITES:
+        started = time.perf_counter()
+        if suite == "micro":
+            results[suite] = micro.run(args.iterations)
+        elif suite == "mcp":
+            results[suite] = asyncio.run(mcp.run(args.mcp_iterations))
+        elif suite == "api":
+            results[suite] = asyncio.run(api.run(args.requests, args.concurrency))
+        elif suite == "auth":
+            results[suite] = asyncio.run(auth.run(args.logins, args.login_concurrency))
+        print(f"{suite}: done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Map dotted metric paths to values, e.g. ``api.research_query.latency.p95_ms``."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    now = flatten(current["results"])
+    before = flatten(baseline["results"])
+    print(f"\n{'metric':<72} {'baseline':>12} {'current':>12} {'change':>9}")
+    for path in sorted(now):
+        if path not in before or not path.endswith(("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "_per_s")):
+            continue
+        old, new = before[path], now[path]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{path:<72} {old:>12.3f} {new:>12.3f} {change:>9}")
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="rama-bench-") as data_dir:
+        configure_environment(args, data_dir)
+        report = {
+            "environment": environment(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "parameters": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+            "results": run_suites(args),
+        }
+
+    output = args.output or RESULTS_DIR / f"{report['environment']['git_revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""End-to-end latency of ``POST /api/research/query`` through an in-process ASGI client."""
+
+import time
+from typing import Any, Dict
+
+import httpx
+
+from .common import run_concurrently, summarize
+
+QUERY = {
+    "prompt": "transformer language models",
+    "include_workspace": True,
+    "include_mindmap": True,
+    "include_summaries": True,
+    "include_citations": True,
+    "include_sample_paper": True,
+    "include_audio": False,
+}
+USER = {"email": "api-bench@example.com", "password": "benchmark-password"}
+
+
+async def run(requests: int, concurrency: int, warmup: int = 2) -> Dict[str, Any]:
+    from app.main import app
+    from app.mcp_client import mcp_client
+
+    errors = 0
+    partial = 0
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await client.post("/api/auth/register", json=USER)
+            token = (await client.post("/api/auth/login", json=USER)).json()["access_token"]
+            client.headers["Authorization"] = f"Bearer {token}"
+
+            async def query():
+                nonlocal errors, partial
+                response = await client.post("/api/research/query", json=QUERY)
+                if response.status_code != 200:
+                    errors += 1
+                elif response.json().get("partial_sections"):
+                    partial += 1
+
+            for _ in range(warmup):
+                await query()
+            errors = partial = 0
+
+            started = time.perf_counter()
+            samples = await run_concurrently(query, requests, concurrency)
+            elapsed = time.perf_counter() - started
+        await mcp_client.stop()
+
+    return {
+        "research_query": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "errors": errors,
+            "partial_responses": partial,
+            "throughput_rps": round(requests / elapsed, 3) if elapsed else None,
+            "latency": summarize(samples),
+        }
+    }
@@ -0,0 +1,74 @@
+"""Login throughput against the number of password hashing workers.
+
+For each worker count a storm of concurrent logins runs against the ASGI app
+while ``GET /health`` is polled alongside it; the latter shows whether an
+authentication storm starves the rest of the API.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .common import run_concurrently, summarize
+
+USER = {"email": "bench@example.com", "password": "benchmark-password"}
+
+
+def worker_counts(cpus: int) -> List[int]:
+    counts, n = [], 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    return counts + [cpus]
+
+
+async def run(logins: int, concurrency: int, workers: Optional[List[int]] = None) -> Dict[str, Any]:
+    from app import passwords
+    from app.main import app
+
+    cpus = os.cpu_count() or 1
+    results: Dict[str, Any] = {"cpu_count": cpus, "bcrypt_rounds": passwords.password_hasher.rounds, "runs": []}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await client.post("/api/auth/register", json=USER)
+
+            for count in workers or worker_counts(cpus):
+                passwords.password_hasher.shutdown()
+                passwords.password_hasher.workers = count
+                statuses: Dict[int, int] = {}
+
+                async def login():
+                    response = await client.post("/api/auth/login", json=USER)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+                # Spawn the worker processes outside the measurement
+                await asyncio.gather(*(login() for _ in range(count)))
+                statuses.clear()
+
+                health: List[float] = []
+                storm = asyncio.ensure_future(run_concurrently(login, logins, concurrency))
+                started = time.perf_counter()
+                while not storm.done():
+                    probe = time.perf_counter()
+                    await client.get("/health")
+                    health.append(time.perf_counter() - probe)
+                    await asyncio.sleep(0.01)
+                samples = await storm
+                elapsed = time.perf_counter() - started
+
+                results["runs"].append({
+                    "workers": count,
+                    "logins": logins,
+                    "concurrency": concurrency,
+                    "statuses": {str(code): n for code, n in sorted(statuses.items())},
+                    "throughput_logins_per_s": round(statuses.get(200, 0) / elapsed, 3),
+                    "login_latency": summarize(samples),
+                    "health_latency_during_storm": summarize(health),
+                })
+    passwords.password_hasher.shutdown()
+    return results
@@ -0,0 +1,94 @@
+"""Timing helpers and result bookkeeping shared by the benchmark suites."""
+
+import asyncio
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+MCP_SERVER_SRC = BACKEND_DIR.parent / "mcp-server" / "src"
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """Linear-interpolated percentile ``q`` (0-100) of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = (len(sorted_samples) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_samples) - 1)
+    return sorted_samples[low] + (sorted_samples[high] - sorted_samples[low]) * (rank - low)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds for samples given in seconds."""
+    ordered = sorted(sample * 1000 for sample in samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 4),
+        "min_ms": round(ordered[0], 4),
+        "p50_ms": round(percentile(ordered, 50), 4),
+        "p90_ms": round(percentile(ordered, 90), 4),
+        "p95_ms": round(percentile(ordered, 95), 4),
+        "p99_ms": round(percentile(ordered, 99), 4),
+        "max_ms": round(ordered[-1], 4),
+    }
+
+
+def time_sync(func: Callable[[], Any], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def time_async(func: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def run_concurrently(func: Callable[[], Awaitable[Any]], requests: int, concurrency: int) -> List[float]:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight; returns per-call latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await func()
+            samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
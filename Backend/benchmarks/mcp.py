@@ -0,0 +1,83 @@
+"""MCP round-trip overhead per tool.
+
+Each tool is timed as a direct in-process call of the server method
+``handle_call_tool`` dispatches to, and as a decoded
+:meth:`app.mcp_client.MCPClient.call_tool` over stdio once per payload codec:
+``standard`` (JSON text content) and ``compact`` (negotiated structuredContent).
+The difference between the medians is the transport and serialization
+overhead; ``bytes_per_call`` is what crossed the pipe per reply.
+"""
+
+from typing import Any, Dict
+
+from .common import time_async
+
+PAPERS = [
+    {
+        "id": 1,
+        "title": "Attention Is All You Need",
+        "authors": ["Ashish Vaswani", "Noam Shazeer", "Niki Parmar"],
+        "abstract": "We propose the Transformer, a network architecture based solely on attention mechanisms.",
+        "year": 2017,
+        "journal": "NeurIPS",
+        "citations": 120000,
+        "relevance_score": 95,
+        "url": "http://arxiv.org/abs/1706.03762v1",
+    },
+    {
+        "id": 2,
+        "title": "Deep Residual Learning for Image Recognition",
+        "authors": ["Kaiming He", "Xiangyu Zhang", "Shaoqing Ren", "Jian Sun"],
+        "abstract": "We present a residual learning framework to ease the training of very deep networks.",
+        "year": 2015,
+        "journal": "CVPR",
+        "citations": 200000,
+        "relevance_score": 80,
+        "url": "http://arxiv.org/abs/1512.03385v1",
+    },
+]
+
+TOOL_ARGUMENTS: Dict[str, Dict[str, Any]] = {
+    "search_papers": {"query": "transformer language models", "max_results": 10},
+    "generate_workspace": {"topic": "transformer language models"},
+    "create_mindmap": {"topic": "transformer language models"},
+    "create_interactive_mindmap": {"topic": "transformer language models"},
+    "generate_comprehensive_summaries": {"topic": "transformer language models", "papers": PAPERS},
+    "generate_ieee_citations": {"papers": PAPERS},
+    "generate_sample_paper": {"topic": "transformer language models", "papers": PAPERS},
+    "synthesize_audio": {"text": "A short summary of transformer language models."},
+}
+
+
+async def run(iterations: int) -> Dict[str, Any]:
+    from rama_research_server.server import RAMAResearchServer
+
+    from app.mcp_client import MCPClient
+
+    server = RAMAResearchServer()
+    clients = {"standard": MCPClient(compact_payloads=False), "compact": MCPClient(compact_payloads=True)}
+    for client in clients.values():
+        await client.start()
+        if not client.initialized:
+            raise RuntimeError("MCP server failed to start")
+
+    results = {}
+    try:
+        for tool, arguments in TOOL_ARGUMENTS.items():
+            method = getattr(server, tool)
+            direct = await time_async(lambda: method(**arguments), iterations)
+            results[tool] = {"direct": direct}
+            for codec, client in clients.items():
+                received = client.bytes_received
+                await client.call_tool(tool, arguments)
+                reply_bytes = client.bytes_received - received
+                round_trip = await time_async(lambda: client.call_tool(tool, arguments), iterations)
+                results[tool][codec] = {
+                    "round_trip": round_trip,
+                    "overhead_p50_ms": round(round_trip["p50_ms"] - direct["p50_ms"], 4),
+                    "bytes_per_call": reply_bytes,
+                }
+    finally:
+        for client in clients.values():
+            await client.stop()
+    return results
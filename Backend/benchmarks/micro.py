@@ -0,0 +1,124 @@
+"""Microbenchmarks of CPU-bound helpers on the research query path."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .common import time_sync
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "sources.json"
+TOPIC = "transformer language models"
+RESPONSE_PAPERS = 100
+LAYOUT_NODES = 1000
+
+
+def response_paths(raw_papers: List[Dict[str, Any]], iterations: int) -> Dict[str, Any]:
+    """Validation and serialization cost of a 100-paper research response.
+
+    ``before`` builds each paper with ``ResearchPaper(**data)`` and returns the
+    model through ``response_model``; ``after`` validates the list with the cached
+    adapter and returns it serialized once via ``model_response``.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.main import model_response
+    from app.schemas.research import EnhancedResearchResponse, ResearchPaper, validate_papers
+
+    app = FastAPI()
+
+    @app.get("/before", response_model=EnhancedResearchResponse)
+    def before():
+        return EnhancedResearchResponse(papers=[ResearchPaper(**paper) for paper in raw_papers])
+
+    @app.get("/after", response_model=EnhancedResearchResponse)
+    def after():
+        return model_response(EnhancedResearchResponse.model_construct(
+            papers=validate_papers(raw_papers), partial_sections=[],
+        ))
+
+    client = TestClient(app)
+    assert client.get("/before").json() == client.get("/after").json()
+    return {
+        "papers": len(raw_papers),
+        "validate_before": time_sync(lambda: [ResearchPaper(**paper) for paper in raw_papers], iterations),
+        "validate_after": time_sync(lambda: validate_papers(raw_papers), iterations),
+        "request_before": time_sync(lambda: client.get("/before"), iterations),
+        "request_after": time_sync(lambda: client.get("/after"), iterations),
+    }
+
+
+def mindmap_layouts(iterations: int) -> Dict[str, Any]:
+    """Force-directed layout of a random tree of ``LAYOUT_NODES`` nodes.
+
+    ``cold`` starts from random positions; ``warm_start`` lays out the tree
+    again after 10% more nodes were attached, starting from the cold result.
+    """
+    import random
+
+    from rama_research_server.layout import force_layout
+
+    rng = random.Random(0)
+    edges = [(i, rng.randrange(i)) for i in range(1, LAYOUT_NODES)]
+    grown_nodes = LAYOUT_NODES * 11 // 10
+    grown = edges + [(i, rng.randrange(LAYOUT_NODES)) for i in range(LAYOUT_NODES, grown_nodes)]
+    cold = force_layout(LAYOUT_NODES, edges)
+    known = {i: tuple(xy) for i, xy in enumerate(cold.positions)}
+    warm = force_layout(grown_nodes, grown, known=known)
+    # A layout takes a few hundred milliseconds: run fewer of them
+    runs = max(1, iterations // 20)
+    return {
+        "nodes": LAYOUT_NODES,
+        "cold_iterations": cold.iterations,
+        "warm_start_iterations": warm.iterations,
+        "cold": time_sync(lambda: force_layout(LAYOUT_NODES, edges), runs, warmup=1),
+        "warm_start": time_sync(lambda: force_layout(grown_nodes, grown, known=known), runs, warmup=1),
+    }
+
+
+def run(iterations: int) -> Dict[str, Any]:
+    from rama_research_server.keyphrases import KeyphraseExtractor
+
+    from app.main import (
+        generate_automated_citations,
+        generate_comprehensive_summaries,
+        generate_mock_mindmap,
+        generate_mock_workspace,
+        generate_sample_research_paper,
+    )
+    from app.schemas.research import EnhancedResearchResponse, ResearchPaper
+
+    fixtures = json.loads(FIXTURES.read_text(encoding="utf-8"))
+    raw_papers = [paper for source in fixtures.values() for paper in source["papers"]]
+    keywords = KeyphraseExtractor().extract(raw_papers)
+    papers = [
+        ResearchPaper(**{**paper, "id": i, "external_id": paper["id"], "keywords": paper_keywords})
+        for i, (paper, paper_keywords) in enumerate(zip(raw_papers, keywords), 1)
+    ]
+
+    response = EnhancedResearchResponse(
+        papers=papers,
+        workspace=generate_mock_workspace(TOPIC),
+        interactive_mindmap=generate_mock_mindmap(TOPIC),
+        comprehensive_summaries=generate_comprehensive_summaries(TOPIC, papers),
+        automated_citations=generate_automated_citations(papers),
+        sample_paper=generate_sample_research_paper(TOPIC, papers),
+    )
+    payload = response.model_dump(mode="json", by_alias=True)
+    paper_dicts = [paper.model_dump() for paper in papers]
+    response_papers = [
+        {**paper_dicts[i % len(paper_dicts)], "id": i + 1} for i in range(RESPONSE_PAPERS)
+    ]
+
+    return {
+        "inputs": {"papers": len(papers)},
+        # A fresh extractor each time: no memoized papers or corpus statistics
+        "extract_keyphrases_batch": time_sync(lambda: KeyphraseExtractor().extract(raw_papers), iterations),
+        "generate_automated_citations": time_sync(lambda: generate_automated_citations(papers), iterations),
+        "generate_sample_research_paper": time_sync(lambda: generate_sample_research_paper(TOPIC, papers), iterations),
+        "validate_enhanced_research_response": time_sync(
+            lambda: EnhancedResearchResponse.model_validate(payload), iterations
+        ),
+        "research_response_100_papers": response_paths(response_papers, iterations),
+        "mindmap_layout": mindmap_layouts(iterations),
+    }
@@ -36,7 +36,15 @@ const ResearchInterface = () => {
     }
   }, [navigate]);
 
-  const handleLogout = () => {
+  const authHeaders = () => ({ Authorization: `Bearer ${localStorage.getItem('access_token')}` });
+
+  const handleLogout = async () => {
+    try {
+      // Revoke the token server-side; logging out locally must not depend on it
+      await axios.post('http://localhost:8000/api/auth/logout', null, { headers: authHeaders() });
+    } catch (err) {
+      console.warn('Logout request failed:', err);
+    }
     localStorage.removeItem('access_token');
     navigate('/');
   };
@@ -57,7 +65,7 @@ const ResearchInterface = () => {
         include_citations: featureOptions.citations,
         include_sample_paper: featureOptions.samplePaper,
         include_audio: featureOptions.audio
-      });
+      }, { headers: authHeaders() });
 
       const data = response.data;
       setResearchResults(data.papers);
@@ -69,7 +77,11 @@ const ResearchInterface = () => {
       setAudioUrl(data.audio_url);
     } catch (err) {
       console.error('Research query error:', err);
-      if (err.response) {
+      if (err.response && err.response.status === 401) {
+        // Token expired or revoked: back to the login page
+        localStorage.removeItem('access_token');
+        navigate('/');
+      } else if (err.response) {
         setError(err.response.data.detail || 'Failed to process research query.');
       } else if (err.request) {
         setError('Unable to connect to server. Please try again later.');
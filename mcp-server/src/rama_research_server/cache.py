@@ -0,0 +1,176 @@
+"""Two-tier cache for paper search results.
+
+Results are keyed by the normalized query, the set of sources searched and
+``max_results``. Lookups hit an in-process LRU first and fall back to a SQLite
+file shared by every server worker. Entries carry a freshness deadline derived
+from per-source TTLs plus a stale window during which they may still be served
+while a refresh runs in the background.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger("rama-research-server.cache")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class CacheEntry:
+    value: Dict[str, Any]
+    created_at: float
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.fresh_until
+
+    def is_usable(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.stale_until
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+class SearchCache:
+    """In-memory LRU in front of a size-bounded SQLite store."""
+
+    def __init__(
+        self,
+        path: Path,
+        ttls: Dict[str, float],
+        default_ttl: float = 3600,
+        stale_seconds: float = 0,
+        memory_entries: int = 256,
+        disk_entries: int = 5000,
+    ):
+        self.path = Path(path)
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.stale_seconds = stale_seconds
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    fresh_until REAL NOT NULL,
+                    stale_until REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_search_cache_last_access ON search_cache (last_access)")
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Search cache disk tier disabled ({self.path}): {e}")
+            return None
+
+    @staticmethod
+    def make_key(query: str, sources: Iterable[str], max_results: int) -> str:
+        payload = json.dumps([normalize_query(query), sorted(set(sources)), int(max_results)])
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def ttl_for(self, sources: Iterable[str]) -> float:
+        """A result is only as fresh as its most volatile source."""
+        ttls = [self.ttls.get(source, self.default_ttl) for source in sources]
+        return min(ttls) if ttls else self.default_ttl
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for ``key`` if it is fresh or still within its stale window."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.is_usable(now):
+                    self._memory.move_to_end(key)
+                    return entry
+                del self._memory[key]
+
+            entry = self._load(key, now)
+            if entry is not None:
+                self._remember(key, entry)
+            return entry
+
+    def put(self, key: str, value: Dict[str, Any], sources: Iterable[str]) -> CacheEntry:
+        now = time.time()
+        fresh_until = now + self.ttl_for(sources)
+        entry = CacheEntry(value, now, fresh_until, fresh_until + self.stale_seconds)
+        with self._lock:
+            self._remember(key, entry)
+            self._store(key, entry, now)
+        return entry
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str, now: float) -> Optional[CacheEntry]:
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT value, created_at, fresh_until, stale_until FROM search_cache WHERE key = ? AND stale_until > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Search cache read failed: {e}")
+            return None
+
+    def _store(self, key: str, entry: CacheEntry, now: float):
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, created_at, fresh_until, stale_until, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(entry.value), entry.created_at, entry.fresh_until, entry.stale_until, now),
+            )
+            self._evict(now)
+        except sqlite3.Error as e:
+            logger.warning(f"Search cache write failed: {e}")
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM search_cache WHERE stale_until <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        overflow = count - self.disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,460 @@
+"""Citation formatting in IEEE, APA, MLA, BibTeX and RIS.
+
+Each style is a template compiled once. Inline styles (IEEE, APA, MLA) are
+format strings in which ``[...]`` marks an optional segment, dropped when any
+field inside it is empty, so a paper without a DOI loses the whole ", doi: {doi}"
+rather than leaving a dangling separator. Record styles (BibTeX, RIS) are
+ordered field lists whose empty fields are skipped.
+
+Author names are parsed once per paper into first, von, last and suffix parts,
+whether written "Ashish Vaswani", "Vaswani, Ashish", "Vaswani A" or
+"Martin Luther King, Jr.". Formatted entries are memoized per paper id, content
+hash and style. Only the parts that depend on a paper's place in a bibliography
+(the IEEE number, the de-duplicated BibTeX key) are added per render, so a
+:class:`BibliographyWriter` can stream a bibliography of any size in a single
+pass.
+"""
+
+import hashlib
+import re
+import string
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from . import config
+
+STYLES = ("ieee", "apa", "mla", "bibtex", "ris")
+
+# Authors listed before the style's "et al." takes over
+IEEE_MAX_AUTHORS = 6
+APA_MAX_AUTHORS = 20
+
+_SUFFIXES = frozenset({"jr", "sr", "ii", "iii", "iv", "v"})
+# Lower-case name particles that belong to the last name ("van", "de la")
+_PARTICLES = frozenset({"da", "de", "del", "della", "der", "di", "du", "la", "le", "van", "von", "y"})
+_BIBTEX_SPECIAL_RE = re.compile(r"([&%$#_{}])")
+_KEY_STRIP_RE = re.compile(r"[^a-z0-9]")
+
+
+# --- Names ----------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Name:
+    first: str
+    last: str
+    von: str = ""
+    suffix: str = ""
+
+    @property
+    def full_last(self) -> str:
+        return f"{self.von} {self.last}" if self.von else self.last
+
+    @property
+    def initials(self) -> str:
+        """"Jean-Paul Q." as "J.-P. Q."."""
+        return " ".join(
+            "-".join(part[0] + "." for part in word.split("-") if part)
+            for word in self.first.split()
+        )
+
+
+def _is_suffix(word: str) -> bool:
+    return word.rstrip(".").lower() in _SUFFIXES
+
+
+def parse_name(raw: str) -> Name:
+    """Split an author name as written by the paper sources into its parts."""
+    raw = " ".join(raw.split()).strip(" ,")
+    if raw.startswith("{") and raw.endswith("}"):
+        # Institutional author, already protected BibTeX-style
+        return Name("", raw[1:-1])
+    parts = [part.strip() for part in raw.split(",") if part.strip()]
+    if len(parts) >= 2:
+        if len(parts) == 2 and _is_suffix(parts[1]):
+            # "Martin Luther King, Jr."
+            name = parse_name(parts[0])
+            return Name(name.first, name.last, name.von, parts[1])
+        if len(parts) == 2:
+            last, first, suffix = parts[0], parts[1], ""
+        elif _is_suffix(parts[1]):
+            # BibTeX order "von Last, Jr, First"
+            last, suffix, first = parts[0], parts[1], " ".join(parts[2:])
+        else:
+            # "Last, First, Jr."
+            last, first, suffix = parts[0], parts[1], " ".join(parts[2:])
+        words = last.split()
+        split = 0
+        while split < len(words) - 1 and words[split] in _PARTICLES:
+            split += 1
+        return Name(first, " ".join(words[split:]), " ".join(words[:split]), suffix)
+
+    words = raw.split()
+    if not words:
+        return Name("", "")
+    suffix = words.pop() if len(words) > 1 and _is_suffix(words[-1]) else ""
+    if len(words) == 2 and words[1].isalpha() and words[1].isupper() and len(words[1]) <= 3 and not words[0].isupper():
+        # Initials after the surname, as in PubMed: "Vaswani AN"
+        return Name(" ".join(f"{letter}." for letter in words[1]), words[0], "", suffix)
+    # The last name starts at the first lower-case particle ("Ludwig van Beethoven"), else it is the last word
+    start = next((i for i in range(1, len(words) - 1) if words[i] in _PARTICLES), len(words) - 1)
+    end = start
+    while end < len(words) - 1 and words[end] in _PARTICLES:
+        end += 1
+    return Name(" ".join(words[:start]), " ".join(words[end:]), " ".join(words[start:end]), suffix)
+
+
+def _join(names: Sequence[str], conjunction: str, serial_comma: bool = True) -> str:
+    if len(names) <= 1:
+        return "".join(names)
+    if len(names) == 2:
+        separator = ", " if serial_comma and conjunction == "&" else " "
+        return f"{names[0]}{separator}{conjunction} {names[1]}"
+    return f"{', '.join(names[:-1])}{',' if serial_comma else ''} {conjunction} {names[-1]}"
+
+
+def ieee_authors(names: Sequence[Name]) -> str:
+    def one(name: Name) -> str:
+        text = f"{name.initials} {name.full_last}".strip()
+        return f"{text}, {name.suffix}" if name.suffix else text
+
+    if len(names) > IEEE_MAX_AUTHORS:
+        return f"{one(names[0])} et al."
+    return _join([one(name) for name in names], "and")
+
+
+def apa_authors(names: Sequence[Name]) -> str:
+    def one(name: Name) -> str:
+        text = f"{name.full_last}, {name.initials}" if name.initials else name.full_last
+        return f"{text}, {name.suffix}" if name.suffix else text
+
+    if len(names) > APA_MAX_AUTHORS:
+        return ", ".join(one(name) for name in names[:APA_MAX_AUTHORS - 1]) + ", . . . " + one(names[-1])
+    return _join([one(name) for name in names], "&")
+
+
+def mla_authors(names: Sequence[Name]) -> str:
+    def inverted(name: Name) -> str:
+        text = f"{name.full_last}, {name.first}" if name.first else name.full_last
+        return f"{text}, {name.suffix}" if name.suffix else text
+
+    if not names:
+        return ""
+    if len(names) == 1:
+        return inverted(names[0])
+    if len(names) == 2:
+        second = f"{names[1].first} {names[1].full_last}".strip()
+        return f"{inverted(names[0])}, and {second}"
+    return f"{inverted(names[0])}, et al"
+
+
+def bibtex_name(name: Name) -> str:
+    if not name.first and not name.von and not name.suffix:
+        # Braces stop BibTeX from splitting "OpenAI Team" into first and last names
+        return f"{{{name.last}}}" if " " in name.last else name.last
+    parts = [name.full_last] + ([name.suffix] if name.suffix else []) + ([name.first] if name.first else [])
+    return ", ".join(parts)
+
+
+def ris_name(name: Name) -> str:
+    return ", ".join(part for part in (name.full_last, name.first, name.suffix) if part)
+
+
+# --- Templates ----------------------------------------------------------------------
+
+Segment = Tuple[bool, Tuple[Tuple[str, Optional[str]], ...]]  # (optional, ((literal, field), ...))
+
+
+class Template:
+    """An inline citation template; ``[...]`` marks a segment dropped when a field in it is empty."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.segments: List[Segment] = []
+        for optional, part in _split_segments(text):
+            pieces = tuple((literal, field or None) for literal, field, _, _ in string.Formatter().parse(part))
+            self.segments.append((optional, pieces))
+
+    def render(self, fields: Dict[str, str]) -> str:
+        out: List[str] = []
+        for optional, pieces in self.segments:
+            if optional and any(field and not fields.get(field) for _, field in pieces):
+                continue
+            for literal, field in pieces:
+                out.append(literal)
+                if field:
+                    out.append(fields.get(field, ""))
+        text = "".join(out)
+        # A field ending in a period ("et al.", "n.d.") before the closing one
+        return text[:-1] if text.endswith("..") else text
+
+
+def _split_segments(text: str) -> List[Tuple[bool, str]]:
+    segments = []
+    for i, part in enumerate(re.split(r"[\[\]]", text)):
+        if part:
+            segments.append((i % 2 == 1, part))
+    return segments
+
+
+INLINE_TEMPLATES = {
+    "ieee": Template('[{authors}, ]"{title},"[ {journal},] {year}[, doi: {doi}].'),
+    "apa": Template("[{authors} ]({year}). {title}.[ {journal}.][ {link}]"),
+    "mla": Template('[{authors}. ]"{title}."[ {journal},] {year}[, {link}].'),
+}
+
+# (BibTeX field, paper field) in output order
+BIBTEX_FIELDS = (
+    ("title", "title"),
+    ("author", "authors"),
+    ("journal", "journal"),
+    ("year", "year"),
+    ("doi", "doi"),
+    ("url", "url"),
+    ("keywords", "keywords"),
+)
+
+# (RIS tag, paper field); "authors" expands to one AU line per author
+RIS_FIELDS = (
+    ("TI", "title"),
+    ("AU", "authors"),
+    ("PY", "year"),
+    ("JO", "journal"),
+    ("DO", "doi"),
+    ("UR", "url"),
+    ("KW", "keywords"),
+    ("AB", "abstract"),
+)
+
+
+def bibtex_escape(text: str) -> str:
+    return _BIBTEX_SPECIAL_RE.sub(r"\\\1", text).replace("~", r"\textasciitilde{}").replace("^", r"\textasciicircum{}")
+
+
+def _ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+
+
+def paper_id(paper: Dict[str, Any]) -> str:
+    return str(paper.get("external_id") or paper.get("doi") or paper.get("id") or paper.get("title") or "")
+
+
+def citation_hash(paper: Dict[str, Any]) -> str:
+    """Hash of the fields citations are built from."""
+    text = "\x1f".join([
+        str(paper.get("title") or ""), "\x1e".join(paper.get("authors") or []), str(paper.get("year") or ""),
+        str(paper.get("journal") or ""), str(paper.get("doi") or ""), str(paper.get("url") or ""),
+        "\x1e".join(paper.get("keywords") or []), str(paper.get("abstract") or ""),
+    ])
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+# --- Engine ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Entry:
+    """A formatted paper, independent of its place in a bibliography."""
+
+    text: str
+    # BibTeX only: the entry type and the citation key the allocator starts from
+    entry_type: str = ""
+    key_base: str = ""
+
+
+class CitationEngine:
+    """Formats papers in every style, memoizing entries per paper and style.
+
+    Thread-safe.
+    """
+
+    def __init__(self, cache_entries: Optional[int] = None):
+        self.cache_entries = cache_entries or config.CITATION_CACHE_ENTRIES
+        self._cache: "OrderedDict[Tuple[str, str, str], Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._formatters: Dict[str, Callable[[Dict[str, Any], List[Name]], Entry]] = {
+            "ieee": self._inline("ieee"),
+            "apa": self._inline("apa"),
+            "mla": self._inline("mla"),
+            "bibtex": self._bibtex,
+            "ris": self._ris,
+        }
+
+    def entry(self, paper: Dict[str, Any], style: str) -> Entry:
+        """The memoized entry of ``paper`` in ``style``; raises ``ValueError`` for unknown styles."""
+        formatter = self._formatters.get(style)
+        if formatter is None:
+            raise ValueError(f"Unknown citation style {style!r}; expected one of {list(STYLES)}")
+        key = (paper_id(paper), citation_hash(paper), style)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        entry = formatter(paper, [parse_name(author) for author in paper.get("authors") or [] if author.strip()])
+        with self._lock:
+            self._cache[key] = entry
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return entry
+
+    def format(self, paper: Dict[str, Any], style: str) -> str:
+        """``paper`` in ``style``, without an IEEE number; BibTeX uses the undeduplicated key."""
+        entry = self.entry(paper, style)
+        if style == "bibtex":
+            return _bibtex_text(entry, entry.key_base)
+        return entry.text
+
+    def writer(self, style: str) -> "BibliographyWriter":
+        if style not in self._formatters:
+            raise ValueError(f"Unknown citation style {style!r}; expected one of {list(STYLES)}")
+        return BibliographyWriter(self, style)
+
+    def bibliography(self, papers: Iterable[Dict[str, Any]], style: str) -> List[str]:
+        """Entries of ``papers`` in order, numbered (IEEE) or with unique keys (BibTeX)."""
+        return list(self.writer(style).entries(papers))
+
+    @staticmethod
+    def _fields(paper: Dict[str, Any]) -> Dict[str, str]:
+        doi = str(paper.get("doi") or "").strip()
+        url = str(paper.get("url") or "").strip()
+        return {
+            "title": " ".join(str(paper.get("title") or "Untitled").split()),
+            "journal": " ".join(str(paper.get("journal") or "").split()),
+            "year": str(paper.get("year") or "n.d."),
+            "doi": doi,
+            "link": f"https://doi.org/{doi}" if doi else url,
+        }
+
+    def _inline(self, style: str) -> Callable[[Dict[str, Any], List[Name]], Entry]:
+        template = INLINE_TEMPLATES[style]
+        authors = {"ieee": ieee_authors, "apa": apa_authors, "mla": mla_authors}[style]
+
+        def render(paper: Dict[str, Any], names: List[Name]) -> Entry:
+            fields = self._fields(paper)
+            fields["authors"] = authors(names)
+            if style == "apa" and fields["authors"] and not fields["authors"].endswith("."):
+                fields["authors"] += "."
+            elif style == "mla":
+                # The template adds the period after the names
+                fields["authors"] = fields["authors"].rstrip(".")
+            return Entry(template.render(fields))
+
+        return render
+
+    def _bibtex(self, paper: Dict[str, Any], names: List[Name]) -> Entry:
+        fields = self._fields(paper)
+        values = {
+            "title": "{" + bibtex_escape(fields["title"]) + "}",
+            "authors": " and ".join(bibtex_name(name) for name in names),
+            "journal": bibtex_escape(fields["journal"]),
+            "year": str(paper.get("year") or ""),
+            "doi": fields["doi"],
+            "url": str(paper.get("url") or ""),
+            "keywords": bibtex_escape(", ".join(paper.get("keywords") or [])),
+        }
+        lines = [f"  {name} = {{{values[field]}}}" for name, field in BIBTEX_FIELDS if values[field]]
+        base = _KEY_STRIP_RE.sub("", _ascii(names[0].last).lower()) if names else ""
+        return Entry(
+            text=",\n" + ",\n".join(lines) + "\n}",
+            entry_type="article" if fields["journal"] else "misc",
+            key_base=f"{base or 'unknown'}{values['year']}",
+        )
+
+    def _ris(self, paper: Dict[str, Any], names: List[Name]) -> Entry:
+        fields = self._fields(paper)
+        values: Dict[str, List[str]] = {
+            "title": [fields["title"]],
+            "authors": [ris_name(name) for name in names],
+            "year": [str(paper.get("year") or "")],
+            "journal": [fields["journal"]],
+            "doi": [fields["doi"]],
+            "url": [str(paper.get("url") or "")],
+            "keywords": list(paper.get("keywords") or []),
+            "abstract": [" ".join(str(paper.get("abstract") or "").split())],
+        }
+        lines = ["TY  - JOUR" if fields["journal"] else "TY  - GEN"]
+        lines.extend(f"{tag}  - {value}" for tag, field in RIS_FIELDS for value in values[field] if value)
+        lines.append("ER  - ")
+        return Entry("\n".join(lines))
+
+
+def _bibtex_text(entry: Entry, key: str) -> str:
+    return f"@{entry.entry_type}{{{key}{entry.text}"
+
+
+class BibliographyWriter:
+    """Renders a bibliography one entry at a time.
+
+    Keeps only the running IEEE number and the BibTeX keys already used, so
+    entries can be streamed out as papers are read.
+    """
+
+    def __init__(self, engine: CitationEngine, style: str):
+        self.engine = engine
+        self.style = style
+        self.count = 0
+        self._started = False
+        self._keys: Set[str] = set()
+        # Suffixes already tried per base key, so a common base does not rescan from "a"
+        self._suffixes: Dict[str, int] = {}
+
+    def header(self) -> str:
+        return "REFERENCES\n\n" if self.style == "ieee" else ""
+
+    def allocate_key(self, base: str) -> str:
+        """``base``, or ``base`` with the first free suffix a, b, ..., z, aa, ... appended."""
+        key, n = base, self._suffixes.get(base, 0)
+        if n:
+            key = base + _letters(n)
+        while key in self._keys:
+            n += 1
+            key = base + _letters(n)
+        self._suffixes[base] = n
+        self._keys.add(key)
+        return key
+
+    def render(self, paper: Dict[str, Any]) -> str:
+        """The next entry, numbered or keyed by its place in the bibliography."""
+        entry = self.engine.entry(paper, self.style)
+        self.count += 1
+        if self.style == "ieee":
+            return f"[{self.count}] {entry.text}"
+        if self.style == "bibtex":
+            return _bibtex_text(entry, self.allocate_key(entry.key_base))
+        return entry.text
+
+    def entries(self, papers: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        for paper in papers:
+            yield self.render(paper)
+
+    def stream(self, papers: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """The bibliography document in chunks: the header, then each entry with its separator."""
+        if not self._started:
+            self._started = True
+            yield self.header()
+        for text in self.entries(papers):
+            yield text + "\n\n"
+
+
+def _letters(n: int) -> str:
+    """1 -> "a", 26 -> "z", 27 -> "aa"."""
+    out = ""
+    while n > 0:
+        n, remainder = divmod(n - 1, 26)
+        out = chr(ord("a") + remainder) + out
+    return out
+
+
+_shared: Optional[CitationEngine] = None
+
+
+def get_citation_engine() -> CitationEngine:
+    """Process-wide :class:`CitationEngine`, so its memo is shared by every caller."""
+    global _shared
+    if _shared is None:
+        _shared = CitationEngine()
+    return _shared
@@ -0,0 +1,53 @@
+"""Encoding of tool payloads on the wire.
+
+Tool results are plain dicts. Clients that announce the experimental
+``rama/compactPayload`` capability during ``initialize`` receive them as the
+result's ``structuredContent``: one JSON object inside the JSON-RPC reply, with
+no JSON-in-a-string layer to escape and parse a second time. Other MCP clients
+get the standard ``TextContent`` block, encoded as compact JSON.
+
+orjson is used when it is installed; the standard library otherwise.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple, Union
+
+from mcp.types import TextContent
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+COMPACT_PAYLOAD_CAPABILITY = "rama/compactPayload"
+
+
+def dumps(payload: Any) -> str:
+    """Compact JSON text for ``payload``."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def client_accepts_compact(session) -> bool:
+    """Whether the client announced the compact payload capability."""
+    params = getattr(session, "client_params", None)
+    experimental = params.capabilities.experimental if params is not None else None
+    return bool(experimental) and COMPACT_PAYLOAD_CAPABILITY in experimental
+
+
+def tool_result(payload: Dict[str, Any], compact: bool) -> Union[List[TextContent], Tuple[List[TextContent], Dict[str, Any]]]:
+    """Shape a tool payload for the low-level server's ``call_tool`` handler.
+
+    A ``(content, structured)`` tuple puts ``payload`` in ``structuredContent``
+    without an accompanying text copy.
+    """
+    if compact:
+        return [], payload
+    return [TextContent(type="text", text=dumps(payload))]
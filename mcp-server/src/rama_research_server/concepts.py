@@ -0,0 +1,305 @@
+"""Concept co-occurrence graph built from the keyphrases of every fetched paper.
+
+Each distinct keyphrase (compared by lemma) is a concept. The graph is a sparse,
+symmetric co-occurrence matrix persisted in SQLite: one ``cooccurrence`` row per
+pair of concepts that appeared in the same paper, holding the number of such
+papers. Concepts are related by normalized pointwise mutual information,
+
+    NPMI(a, b) = log(p(a, b) / (p(a) p(b))) / -log p(a, b)
+
+with probabilities over papers. Each concept's top neighbours are precomputed
+into ``neighbours``, so looking up related concepts reads k rows.
+
+Papers are added incrementally. Counts are updated for the new papers' pairs,
+and only the concepts those pairs touch have their neighbours recomputed. The
+scores of other concepts drift slowly as the paper count grows, and are
+refreshed the next time one of their pairs changes.
+"""
+
+import heapq
+import json
+import logging
+import math
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from .index import paper_key
+from .keyphrases import phrase_key
+
+logger = logging.getLogger("rama-research-server.concepts")
+
+# Keyphrases of a paper that enter the graph; the best ones carry the signal
+CONCEPTS_PER_PAPER = 10
+
+
+def npmi(pair_count: int, count_a: int, count_b: int, papers: int) -> float:
+    """Normalized PMI in [-1, 1] of two concepts seen together in ``pair_count`` papers."""
+    if pair_count <= 0 or papers <= 0:
+        return -1.0
+    if pair_count >= papers:
+        return 1.0
+    p_ab = pair_count / papers
+    pmi = math.log(p_ab * papers * papers / (count_a * count_b))
+    return pmi / -math.log(p_ab)
+
+
+class ConceptGraph:
+    """SQLite-backed concept co-occurrence graph with precomputed top-k neighbours."""
+
+    def __init__(self, path: Union[str, Path] = ":memory:", neighbours: int = 20, min_cooccurrence: int = 2):
+        self.path = str(path)
+        self.neighbours = neighbours
+        self.min_cooccurrence = min_cooccurrence
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS concepts (
+                concept_id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                label TEXT NOT NULL,
+                papers INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS papers (
+                key TEXT PRIMARY KEY,
+                concepts TEXT NOT NULL
+            );
+            -- Upper triangle (a < b) of the symmetric co-occurrence matrix
+            CREATE TABLE IF NOT EXISTS cooccurrence (
+                a INTEGER NOT NULL,
+                b INTEGER NOT NULL,
+                papers INTEGER NOT NULL,
+                PRIMARY KEY (a, b)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_cooccurrence_b ON cooccurrence (b, a);
+            CREATE TABLE IF NOT EXISTS neighbours (
+                concept_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                neighbour_id INTEGER NOT NULL,
+                npmi REAL NOT NULL,
+                papers INTEGER NOT NULL,
+                PRIMARY KEY (concept_id, rank)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            """
+        )
+
+    # --- Writing --------------------------------------------------------------------
+
+    def add_papers(self, papers: Iterable[Dict[str, Any]]) -> int:
+        """Count the keyphrases of papers not seen before; returns how many were added.
+
+        A known paper whose keyphrases changed has its old counts replaced.
+        """
+        added = 0
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                paper_count = self._paper_count()
+                concept_delta: Counter = Counter()
+                pair_delta: Counter = Counter()
+                for paper in papers:
+                    labels = self._concept_labels(paper)
+                    if not labels:
+                        continue
+                    ids = sorted(self._concept_ids(labels))
+                    key = paper_key(paper)
+                    row = conn.execute("SELECT concepts FROM papers WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        old = json.loads(row[0])
+                        if old == ids:
+                            continue
+                        concept_delta.subtract(old)
+                        pair_delta.subtract(combinations(old, 2))
+                        paper_count -= 1
+                    conn.execute("INSERT OR REPLACE INTO papers (key, concepts) VALUES (?, ?)", (key, json.dumps(ids)))
+                    concept_delta.update(ids)
+                    pair_delta.update(combinations(ids, 2))
+                    paper_count += 1
+                    added += 1
+
+                if concept_delta:
+                    conn.executemany(
+                        "UPDATE concepts SET papers = papers + ? WHERE concept_id = ?",
+                        [(delta, concept_id) for concept_id, delta in concept_delta.items() if delta],
+                    )
+                    conn.executemany(
+                        "INSERT INTO cooccurrence (a, b, papers) VALUES (?, ?, ?) "
+                        "ON CONFLICT (a, b) DO UPDATE SET papers = papers + excluded.papers",
+                        [(a, b, delta) for (a, b), delta in pair_delta.items() if delta],
+                    )
+                    conn.execute("DELETE FROM cooccurrence WHERE papers <= 0")
+                    conn.execute("INSERT OR REPLACE INTO stats (name, value) VALUES ('papers', ?)", (paper_count,))
+                    touched: Set[int] = set()
+                    for a, b in pair_delta:
+                        touched.add(a)
+                        touched.add(b)
+                    self._refresh_neighbours(touched, paper_count)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    @staticmethod
+    def _concept_labels(paper: Dict[str, Any]) -> Dict[str, str]:
+        labels: Dict[str, str] = {}
+        for phrase in (paper.get("keywords") or [])[:CONCEPTS_PER_PAPER]:
+            key = phrase_key(phrase)
+            if key:
+                labels.setdefault(key, phrase.lower())
+        return labels
+
+    def _concept_ids(self, labels: Dict[str, str]) -> List[int]:
+        self._conn.executemany(
+            "INSERT INTO concepts (key, label) VALUES (?, ?) ON CONFLICT (key) DO NOTHING", labels.items()
+        )
+        keys = list(labels)
+        placeholders = ",".join("?" * len(keys))
+        return [row[0] for row in self._conn.execute(
+            f"SELECT concept_id FROM concepts WHERE key IN ({placeholders})", keys
+        )]
+
+    def _refresh_neighbours(self, concept_ids: Set[int], paper_count: int):
+        """Recompute the top-k neighbours of ``concept_ids`` from their matrix rows."""
+        conn = self._conn
+        for concept_id in concept_ids:
+            own = conn.execute("SELECT papers FROM concepts WHERE concept_id = ?", (concept_id,)).fetchone()[0]
+            rows = conn.execute(
+                """
+                SELECT m.other, m.papers, c.papers FROM (
+                    SELECT b AS other, papers FROM cooccurrence WHERE a = ?
+                    UNION ALL
+                    SELECT a AS other, papers FROM cooccurrence WHERE b = ?
+                ) AS m JOIN concepts AS c ON c.concept_id = m.other
+                """,
+                (concept_id, concept_id),
+            ).fetchall()
+            # Pairs seen in too few papers only fill the list after the reliable ones
+            best = heapq.nlargest(
+                self.neighbours,
+                ((count >= self.min_cooccurrence, npmi(count, own, other_count, paper_count), other, count)
+                 for other, count, other_count in rows),
+            )
+            conn.execute("DELETE FROM neighbours WHERE concept_id = ?", (concept_id,))
+            conn.executemany(
+                "INSERT INTO neighbours (concept_id, rank, neighbour_id, npmi, papers) VALUES (?, ?, ?, ?, ?)",
+                [(concept_id, rank, other, score, count) for rank, (_, score, other, count) in enumerate(best)],
+            )
+
+    # --- Reading --------------------------------------------------------------------
+
+    def _paper_count(self) -> int:
+        row = self._conn.execute("SELECT value FROM stats WHERE name = 'papers'").fetchone()
+        return int(row[0]) if row else 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._paper_count()
+
+    def related(self, topic: str, limit: int = 8) -> List[Tuple[str, float]]:
+        """Concepts related to ``topic`` as ``(label, npmi)`` pairs, most related first.
+
+        A topic that is a known concept reads its precomputed neighbours. Otherwise
+        the neighbours of the known concepts among its word n-grams (longest
+        first) are merged, keeping each neighbour's best score.
+        """
+        words = phrase_key(topic).split()
+        grams = [
+            " ".join(words[start:start + size])
+            for size in range(len(words), 0, -1)
+            for start in range(len(words) - size + 1)
+        ]
+        if not grams:
+            return []
+        with self._lock:
+            placeholders = ",".join("?" * len(grams))
+            known = dict(self._conn.execute(
+                f"SELECT key, concept_id FROM concepts WHERE key IN ({placeholders})", grams
+            ).fetchall())
+            # Longest matching n-grams only: "neural network" rather than "network" as well
+            matched: List[int] = []
+            covered: Set[str] = set()
+            for gram in grams:
+                if gram in known and not any(f" {gram} " in f" {longer} " for longer in covered):
+                    matched.append(known[gram])
+                    covered.add(gram)
+            if not matched:
+                return []
+            placeholders = ",".join("?" * len(matched))
+            rows = self._conn.execute(
+                f"""
+                SELECT c.label, n.npmi, n.concept_id, n.neighbour_id FROM neighbours AS n
+                JOIN concepts AS c ON c.concept_id = n.neighbour_id
+                WHERE n.concept_id IN ({placeholders}) AND n.rank < ?
+                """,
+                (*matched, limit),
+            ).fetchall()
+        best: Dict[str, float] = defaultdict(lambda: -1.0)
+        for label, score, _, neighbour_id in rows:
+            if neighbour_id not in matched:
+                best[label] = max(best[label], score)
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def links(self, labels: Sequence[str]) -> List[Tuple[int, int, float]]:
+        """Pairs among ``labels`` that are each other's stored neighbours.
+
+        Returns ``(i, j, npmi)`` with ``i < j`` indexing into ``labels``; labels that
+        are not known concepts have no links.
+        """
+        positions: Dict[str, int] = {}
+        for position, label in enumerate(labels):
+            positions.setdefault(phrase_key(label), position)
+        positions.pop("", None)
+        if len(positions) < 2:
+            return []
+        with self._lock:
+            placeholders = ",".join("?" * len(positions))
+            ids = dict(self._conn.execute(
+                f"SELECT concept_id, key FROM concepts WHERE key IN ({placeholders})", list(positions)
+            ).fetchall())
+            if len(ids) < 2:
+                return []
+            placeholders = ",".join("?" * len(ids))
+            rows = self._conn.execute(
+                f"""
+                SELECT concept_id, neighbour_id, npmi FROM neighbours
+                WHERE concept_id IN ({placeholders}) AND neighbour_id IN ({placeholders})
+                """,
+                (*ids, *ids),
+            ).fetchall()
+        found: Dict[Tuple[int, int], float] = {}
+        for concept_id, neighbour_id, score in rows:
+            i, j = sorted((positions[ids[concept_id]], positions[ids[neighbour_id]]))
+            if i != j:
+                found[i, j] = max(found.get((i, j), -1.0), score)
+        return sorted((i, j, score) for (i, j), score in found.items())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared: Dict[str, ConceptGraph] = {}
+
+
+def get_concept_graph(path: Optional[Union[str, Path]] = None) -> ConceptGraph:
+    """Process-wide :class:`ConceptGraph` for ``path`` (defaults to the configured graph file)."""
+    from . import config
+
+    key = str(path or config.CONCEPT_GRAPH_PATH)
+    if key not in _shared:
+        _shared[key] = ConceptGraph(key, config.CONCEPT_NEIGHBOURS, config.CONCEPT_MIN_COOCCURRENCE)
+    return _shared[key]
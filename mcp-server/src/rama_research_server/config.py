@@ -0,0 +1,125 @@
+"""Runtime settings for the RAMA research MCP server.
+
+Values come from environment variables (a local .env is honoured) with defaults
+suitable for local development.
+"""
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# Directory for on-disk state (search cache, indexes). Shared by all server workers.
+DATA_DIR: Path = Path(os.getenv("RAMA_DATA_DIR", Path.home() / ".rama-research"))
+
+# --- Search result cache ----------------------------------------------------------
+SEARCH_CACHE_PATH: Path = Path(os.getenv("RAMA_SEARCH_CACHE_PATH", DATA_DIR / "search_cache.sqlite3"))
+SEARCH_CACHE_ENABLED: bool = os.getenv("RAMA_SEARCH_CACHE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+# Entries kept in the in-process LRU tier and in the SQLite tier
+SEARCH_CACHE_MEMORY_ENTRIES: int = _env_int("RAMA_SEARCH_CACHE_MEMORY_ENTRIES", 256)
+SEARCH_CACHE_DISK_ENTRIES: int = _env_int("RAMA_SEARCH_CACHE_DISK_ENTRIES", 5000)
+# Freshness per source in seconds; a result is fresh for the shortest TTL among its sources
+SEARCH_CACHE_TTLS: dict = {
+    "arxiv": _env_float("RAMA_SEARCH_CACHE_TTL_ARXIV", 24 * 3600),
+    "scholar": _env_float("RAMA_SEARCH_CACHE_TTL_SCHOLAR", 6 * 3600),
+}
+SEARCH_CACHE_DEFAULT_TTL: float = _env_float("RAMA_SEARCH_CACHE_TTL_DEFAULT", 3600)
+# How long past expiry a stale result may still be served while it is refreshed
+SEARCH_CACHE_STALE_SECONDS: float = _env_float("RAMA_SEARCH_CACHE_STALE_SECONDS", 7 * 24 * 3600)
+
+# --- Paper sources ------------------------------------------------------------------
+# Threads shared by the blocking source clients (arXiv, Scholar): the concurrency budget
+SOURCE_MAX_WORKERS: int = _env_int("RAMA_SOURCE_MAX_WORKERS", 8)
+# Per-source timeout in seconds; a source that overruns contributes what it has so far
+SOURCE_TIMEOUTS: dict = {
+    "arxiv": _env_float("RAMA_SOURCE_TIMEOUT_ARXIV", 20),
+    "scholar": _env_float("RAMA_SOURCE_TIMEOUT_SCHOLAR", 20),
+}
+SOURCE_DEFAULT_TIMEOUT: float = _env_float("RAMA_SOURCE_TIMEOUT_DEFAULT", 20)
+# Duplicate a source's request once it has gone HEDGE_QUANTILE of its usual time without results
+HEDGE_ENABLED: bool = os.getenv("RAMA_HEDGE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+HEDGE_QUANTILE: float = _env_float("RAMA_HEDGE_QUANTILE", 0.95)
+# Hedged requests allowed per search, on average, per source
+HEDGE_BUDGET: float = _env_float("RAMA_HEDGE_BUDGET", 0.1)
+# Latency percentiles per source: observations before they are used, and their half-life in observations
+LATENCY_MIN_SAMPLES: int = _env_int("RAMA_LATENCY_MIN_SAMPLES", 20)
+LATENCY_HALF_LIFE: int = _env_int("RAMA_LATENCY_HALF_LIFE", 500)
+# JSON file of recorded results served instead of the live sources (offline benchmarks)
+SOURCE_FIXTURES: str = os.getenv("RAMA_SOURCE_FIXTURES", "")
+
+# Import arXiv/Scholar clients and numpy/scipy in the background right after startup
+PRELOAD_LIBRARIES: bool = os.getenv("RAMA_PRELOAD_LIBRARIES", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+# --- Upstream HTTP -------------------------------------------------------------------
+# Pooled connections of the shared HTTP client (HTTP/2 when the h2 package is installed)
+HTTP_MAX_CONNECTIONS: int = _env_int("RAMA_HTTP_MAX_CONNECTIONS", 100)
+HTTP_MAX_KEEPALIVE_CONNECTIONS: int = _env_int("RAMA_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+HTTP_KEEPALIVE_EXPIRY: float = _env_float("RAMA_HTTP_KEEPALIVE_EXPIRY", 30)
+HTTP_TIMEOUT: float = _env_float("RAMA_HTTP_TIMEOUT", 15)
+HTTP_CONNECT_TIMEOUT: float = _env_float("RAMA_HTTP_CONNECT_TIMEOUT", 5)
+HTTP_USER_AGENT: str = os.getenv("RAMA_HTTP_USER_AGENT", "rama-research-server/0.1")
+# Retries of connection errors, 429 and 5xx; backoff doubles from HTTP_RETRY_BACKOFF up to the max, with jitter
+HTTP_RETRIES: int = _env_int("RAMA_HTTP_RETRIES", 3)
+HTTP_RETRY_BACKOFF: float = _env_float("RAMA_HTTP_RETRY_BACKOFF", 0.5)
+HTTP_RETRY_MAX_BACKOFF: float = _env_float("RAMA_HTTP_RETRY_MAX_BACKOFF", 8)
+# Token buckets per host as (requests per second, burst); arXiv asks for one request every 3 seconds.
+# The limits hold across every server process that shares HTTP_RATE_LIMIT_PATH. Scholar is searched
+# through scholarly's own HTTP session: its bucket is taken once per page of results, and those
+# requests are not retried by the shared client
+HTTP_RATE_LIMIT_PATH: Path = Path(os.getenv("RAMA_HTTP_RATE_LIMIT_PATH", DATA_DIR / "rate_limits.sqlite3"))
+HTTP_RATE_LIMITS: dict = {
+    "export.arxiv.org": (_env_float("RAMA_RATE_LIMIT_ARXIV", 1 / 3), _env_float("RAMA_RATE_LIMIT_ARXIV_BURST", 1)),
+    "scholar.google.com": (_env_float("RAMA_RATE_LIMIT_SCHOLAR", 0.5), _env_float("RAMA_RATE_LIMIT_SCHOLAR_BURST", 2)),
+}
+HTTP_DEFAULT_RATE_LIMIT: tuple = (_env_float("RAMA_RATE_LIMIT_DEFAULT", 10), _env_float("RAMA_RATE_LIMIT_DEFAULT_BURST", 20))
+# Consecutive failed searches that open a source's circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD: int = _env_int("RAMA_BREAKER_FAILURE_THRESHOLD", 5)
+BREAKER_RESET_SECONDS: float = _env_float("RAMA_BREAKER_RESET_SECONDS", 30)
+ARXIV_API_URL: str = os.getenv("RAMA_ARXIV_API_URL", "https://export.arxiv.org/api/query")
+
+# --- Local paper index ---------------------------------------------------------------
+# BM25 full-text index of every paper fetched so far; also read by the backend's offline fallback
+PAPER_INDEX_PATH: Path = Path(os.getenv("RAMA_PAPER_INDEX_PATH", DATA_DIR / "paper_index.sqlite3"))
+PAPER_INDEX_ENABLED: bool = os.getenv("RAMA_PAPER_INDEX_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+# --- Keyphrases ----------------------------------------------------------------------
+KEYPHRASES_PER_PAPER: int = _env_int("RAMA_KEYPHRASES_PER_PAPER", 10)
+# Papers whose keyphrases are memoized (by id and content hash)
+KEYPHRASE_CACHE_ENTRIES: int = _env_int("RAMA_KEYPHRASE_CACHE_ENTRIES", 20000)
+# Distinct phrases with document frequencies kept for idf; rare ones are dropped beyond it
+KEYPHRASE_MAX_VOCABULARY: int = _env_int("RAMA_KEYPHRASE_MAX_VOCABULARY", 200000)
+
+# --- Concept graph -------------------------------------------------------------------
+# Keyphrase co-occurrence graph behind related concepts in mindmaps
+CONCEPT_GRAPH_PATH: Path = Path(os.getenv("RAMA_CONCEPT_GRAPH_PATH", DATA_DIR / "concept_graph.sqlite3"))
+CONCEPT_GRAPH_ENABLED: bool = os.getenv("RAMA_CONCEPT_GRAPH_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+# Neighbours precomputed per concept
+CONCEPT_NEIGHBOURS: int = _env_int("RAMA_CONCEPT_NEIGHBOURS", 20)
+# Papers two concepts must share before their NPMI ranks ahead of chance pairings
+CONCEPT_MIN_COOCCURRENCE: int = _env_int("RAMA_CONCEPT_MIN_COOCCURRENCE", 2)
+
+# --- Mindmap layout ------------------------------------------------------------------
+# Force-directed layout limits: a run stops at whichever is reached first
+LAYOUT_MAX_ITERATIONS: int = _env_int("RAMA_LAYOUT_MAX_ITERATIONS", 300)
+LAYOUT_TIME_BUDGET: float = _env_float("RAMA_LAYOUT_TIME_BUDGET", 0.5)
+# Barnes-Hut opening angle: larger is faster and coarser (0 is exact)
+LAYOUT_THETA: float = _env_float("RAMA_LAYOUT_THETA", 0.9)
+# Pull of every node towards the layout's centre; keeps disconnected parts together
+LAYOUT_GRAVITY: float = _env_float("RAMA_LAYOUT_GRAVITY", 0.05)
+# Topics whose last layout is kept for warm-starting the next one
+LAYOUT_CACHE_ENTRIES: int = _env_int("RAMA_LAYOUT_CACHE_ENTRIES", 128)
+
+# --- Citations -----------------------------------------------------------------------
+# Formatted entries memoized per paper and style; a bibliography export touches each once
+CITATION_CACHE_ENTRIES: int = _env_int("RAMA_CITATION_CACHE_ENTRIES", 50000)
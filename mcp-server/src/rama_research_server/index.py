@@ -0,0 +1,287 @@
+"""Local full-text index over every paper the server has fetched.
+
+Papers are stored in SQLite next to an inverted index whose postings lists are
+delta + varint compressed ``(doc_id, term_frequency, doc_length)`` triples.
+Documents are only ever appended, so new search results are indexed
+incrementally by appending to the affected postings in one transaction. Queries
+are ranked with Okapi BM25.
+
+The same index ranks live search results and serves searches when the upstream
+sources are slow or unreachable.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .text import tokenize
+
+logger = logging.getLogger("rama-research-server.index")
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+# BM25 score at which relevance_score reaches 50; maps unbounded scores onto 0-100
+RELEVANCE_HALF_SCORE = 6.0
+
+
+def _put_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_postings(postings: Iterable[Tuple[int, int, int]], last_doc: int = 0) -> bytes:
+    """Encode ascending ``(doc_id, tf, doc_length)`` triples, doc ids as deltas from ``last_doc``."""
+    out = bytearray()
+    for doc_id, tf, length in postings:
+        _put_varint(out, doc_id - last_doc)
+        _put_varint(out, tf)
+        _put_varint(out, length)
+        last_doc = doc_id
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> Iterator[Tuple[int, int, int]]:
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+    doc_id = 0
+    for i in range(0, len(values) - 2, 3):
+        doc_id += values[i]
+        yield doc_id, values[i + 1], values[i + 2]
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    """Stable identity for a paper across sources: DOI if known, else its normalized title."""
+    doi = (paper.get("doi") or "").strip().lower()
+    if doi:
+        return f"doi:{doi}"
+    return "title:" + " ".join(tokenize(paper.get("title", ""), min_length=1))
+
+
+def paper_terms(paper: Dict[str, Any]) -> List[str]:
+    """Indexed tokens of a paper; the title counts twice."""
+    title = tokenize(paper.get("title", ""))
+    body = tokenize(paper.get("abstract", "") + " " + " ".join(paper.get("keywords") or []))
+    return title + title + body
+
+
+def relevance_from_score(score: float) -> int:
+    """Map a BM25 score onto the 0-100 ``relevance_score`` scale."""
+    return int(round(100 * score / (score + RELEVANCE_HALF_SCORE))) if score > 0 else 0
+
+
+class PaperIndex:
+    """SQLite-backed BM25 inverted index of papers."""
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                paper TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL,
+                last_doc INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stats (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            """
+        )
+
+    # --- Writing --------------------------------------------------------------------
+
+    def add_papers(self, papers: Iterable[Dict[str, Any]]) -> int:
+        """Index papers not seen before; returns how many documents were added.
+
+        Known papers (same DOI or title) have their stored metadata refreshed. If
+        their text changed, the old document is tombstoned and re-added.
+        """
+        added = 0
+        batch: Dict[str, List[Tuple[int, int, int]]] = defaultdict(list)
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stats = self._stats()
+                next_doc = (conn.execute("SELECT MAX(doc_id) FROM docs").fetchone()[0] or 0) + 1
+                for paper in papers:
+                    terms = paper_terms(paper)
+                    if not terms:
+                        continue
+                    key = paper_key(paper)
+                    content_hash = hashlib.sha1(" ".join(terms).encode()).hexdigest()
+                    stored = {k: v for k, v in paper.items() if k != "relevance_score"}
+                    row = conn.execute("SELECT doc_id, content_hash, length FROM docs WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        if row[1] == content_hash:
+                            conn.execute("UPDATE docs SET paper = ? WHERE doc_id = ?", (json.dumps(stored), row[0]))
+                            continue
+                        # Postings are append-only: retire the old document instead of rewriting them
+                        conn.execute("UPDATE docs SET deleted = 1, key = ? WHERE doc_id = ?", (f"{key}#{row[0]}", row[0]))
+                        stats["doc_count"] -= 1
+                        stats["total_length"] -= row[2]
+
+                    doc_id = next_doc
+                    next_doc += 1
+                    conn.execute(
+                        "INSERT INTO docs (doc_id, key, content_hash, length, paper) VALUES (?, ?, ?, ?, ?)",
+                        (doc_id, key, content_hash, len(terms), json.dumps(stored)),
+                    )
+                    for term, tf in Counter(terms).items():
+                        batch[term].append((doc_id, tf, len(terms)))
+                    stats["doc_count"] += 1
+                    stats["total_length"] += len(terms)
+                    added += 1
+
+                for term, postings in batch.items():
+                    row = conn.execute("SELECT df, last_doc, data FROM postings WHERE term = ?", (term,)).fetchone()
+                    df, last_doc, data = row if row else (0, 0, b"")
+                    conn.execute(
+                        "INSERT OR REPLACE INTO postings (term, df, last_doc, data) VALUES (?, ?, ?, ?)",
+                        (term, df + len(postings), postings[-1][0], data + encode_postings(postings, last_doc)),
+                    )
+                conn.executemany("INSERT OR REPLACE INTO stats (name, value) VALUES (?, ?)", stats.items())
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return added
+
+    # --- Reading --------------------------------------------------------------------
+
+    def _stats(self) -> Dict[str, float]:
+        stats = {"doc_count": 0.0, "total_length": 0.0}
+        stats.update(self._conn.execute("SELECT name, value FROM stats").fetchall())
+        return stats
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._stats()["doc_count"])
+
+    def _idf(self, df: int, doc_count: float) -> float:
+        return math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top ``limit`` indexed papers for ``query`` as ``(bm25_score, paper)`` pairs."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        scores: Dict[int, float] = defaultdict(float)
+        with self._lock:
+            stats = self._stats()
+            if not stats["doc_count"]:
+                return []
+            avg_length = stats["total_length"] / stats["doc_count"]
+            placeholders = ",".join("?" * len(terms))
+            for _, df, data in self._conn.execute(
+                f"SELECT term, df, data FROM postings WHERE term IN ({placeholders})", tuple(terms)
+            ):
+                idf = self._idf(df, stats["doc_count"])
+                for doc_id, tf, length in decode_postings(data):
+                    scores[doc_id] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+
+            # Over-fetch a little so tombstoned documents don't shrink the result
+            top = heapq.nlargest(limit * 2, scores.items(), key=lambda item: item[1])
+            if not top:
+                return []
+            rows = dict(self._conn.execute(
+                f"SELECT doc_id, paper FROM docs WHERE deleted = 0 AND doc_id IN ({','.join('?' * len(top))})",
+                [doc_id for doc_id, _ in top],
+            ).fetchall())
+        results = [(score, json.loads(rows[doc_id])) for doc_id, score in top if doc_id in rows]
+        return results[:limit]
+
+    def scorer(self, query: str) -> Callable[[List[Dict[str, Any]]], List[float]]:
+        """BM25 scoring function for ``query`` using the index's current corpus statistics.
+
+        The statistics are read once, so the returned function scores papers
+        without touching the database. The papers don't need to be indexed; unseen
+        terms get the idf of a term that occurs in no document.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return lambda papers: [0.0] * len(papers)
+        with self._lock:
+            stats = self._stats()
+            placeholders = ",".join("?" * len(terms))
+            dfs = dict(self._conn.execute(
+                f"SELECT term, df FROM postings WHERE term IN ({placeholders})", tuple(terms)
+            ).fetchall())
+        doc_count = max(stats["doc_count"], 1.0)
+        index_avg_length = stats["total_length"] / stats["doc_count"] if stats["doc_count"] else None
+        idfs = {term: self._idf(dfs.get(term, 0), doc_count) for term in terms}
+
+        def score(papers: List[Dict[str, Any]]) -> List[float]:
+            if not papers:
+                return []
+            paper_counts = [Counter(paper_terms(paper)) for paper in papers]
+            avg_length = index_avg_length
+            if avg_length is None:
+                avg_length = sum(sum(counts.values()) for counts in paper_counts) / len(papers) or 1.0
+            scores = []
+            for counts in paper_counts:
+                length = sum(counts.values())
+                total = 0.0
+                for term in terms:
+                    tf = counts.get(term, 0)
+                    if tf:
+                        total += idfs[term] * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+                scores.append(total)
+            return scores
+
+        return score
+
+    def score(self, query: str, papers: List[Dict[str, Any]]) -> List[float]:
+        """BM25 score of each paper for ``query``; see :meth:`scorer`."""
+        if not papers:
+            return []
+        return self.scorer(query)(papers)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared: Dict[str, PaperIndex] = {}
+
+
+def get_paper_index(path: Optional[Union[str, Path]] = None) -> PaperIndex:
+    """Process-wide :class:`PaperIndex` for ``path`` (defaults to the configured index file)."""
+    from . import config
+
+    key = str(path or config.PAPER_INDEX_PATH)
+    if key not in _shared:
+        _shared[key] = PaperIndex(key)
+    return _shared[key]
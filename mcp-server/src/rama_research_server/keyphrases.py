@@ -0,0 +1,242 @@
+"""Batch keyphrase extraction for search results.
+
+Candidates are found RAKE-style: runs of up to ``MAX_PHRASE_WORDS`` content
+words between stop words and punctuation. Each candidate is scored from
+- how its words co-occur with other content words in the document (RAKE's
+  degree / frequency),
+- how often and how early it appears, with a boost for phrases in the title
+  (as in YAKE),
+- its inverse document frequency over every paper the extractor has seen.
+Phrases that overlap a better one ("neural" next to "neural networks") are
+dropped.
+
+Single words are only kept when they look like specific nouns and stand out
+in the paper: they must appear in the title or at least
+``MIN_SINGLE_WORD_FREQUENCY`` times, must not end like an adverb, participle or
+adjective ("solely", "dispensing", "task-agnostic") and must not be one of the
+generic nouns every abstract uses ("model", "way"). A lone word that occurs once
+in an abstract is usually incidental vocabulary rather than a topic.
+
+Words are compared by lemma, so "neural network" and "neural networks" are one
+phrase. Keyphrases are memoized per paper id and content hash. A batch adds all
+of its new documents to the corpus statistics before scoring any of them, so a
+result set is ranked against itself as well as the papers seen before it.
+"""
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from .text import STOP_WORDS, TOKEN_RE
+
+MAX_PHRASE_WORDS = 3
+# Shortest word that can be a keyphrase on its own; words in longer phrases need 2 letters
+MIN_SINGLE_WORD_LENGTH = 3
+TITLE_BOOST = 1.5
+# Occurrences a single word outside the title needs to be a keyphrase
+MIN_SINGLE_WORD_FREQUENCY = 2
+# Endings of adverbs, participles and adjectives; single words ending so are not keyphrases
+NON_NOUN_SUFFIXES = ("ly", "ing", "ed", "ive", "ous", "ful", "less", "able", "ible", "ic", "ical", "ior")
+
+# Punctuation that ends a candidate phrase; dashes only when they stand alone
+_BOUNDARY_RE = re.compile(r"[.,;:!?()\[\]{}\"]+|\s[-–—]+\s")
+
+# Words that are common in abstracts but never useful as keyphrases on their own
+ACADEMIC_STOP_WORDS = frozenset("""
+able achieve achieved achieves across address addressed addresses additionally allow allows
+among approach approaches around article available based best better case cases central challenge
+challenges compared comparison consider considered demonstrate demonstrated demonstrates describe
+described different discuss discussed due effective efficient enable enables especially et etc
+existing experiment experiments extensive finally find findings first focus following furthermore
+given good high however important improve improved improves improvement including increase increasing
+introduce introduced introduces key large less like low main make makes many method methods moreover
+much new novel number obtain obtained often one order outperform outperforms overall paper particular
+particularly performance perform performed possible present presented presents previous problem
+problems promising propose proposed proposes provide provided provides recent recently related
+respectively result results second several show showed shown shows significant significantly
+similar simple state studied studies study successfully suggest task tasks three two type types
+use used uses using various via well whether work works yet
+already approximately commonly directly easily effectively efficiently entirely even explicitly
+generally highly largely mainly naturally nearly notably relatively simply sometimes still
+substantially typically usually widely
+achieving allowing create creates need needs reaching remain remains require required requires
+""".split())
+
+PHRASE_STOP_WORDS = STOP_WORDS | ACADEMIC_STOP_WORDS
+
+# Nouns that only make a keyphrase as part of a longer phrase ("language model", not "model")
+GENERIC_SINGLE_WORDS = frozenset("""
+algorithm application architecture data framework information layer level model network
+parameter part process scale set structure system technique term time unit value way
+""".split())
+
+# Plurals the suffix rules below get wrong
+IRREGULAR_LEMMAS = {
+    "analyses": "analysis", "appendices": "appendix", "axes": "axis", "bases": "basis",
+    "caches": "cache", "children": "child", "criteria": "criterion", "diagnoses": "diagnosis",
+    "feet": "foot", "hypotheses": "hypothesis", "indices": "index", "lemmata": "lemma",
+    "matrices": "matrix", "men": "man", "mice": "mouse", "niches": "niche", "people": "person",
+    "phenomena": "phenomenon", "spectra": "spectrum", "syntheses": "synthesis", "theses": "thesis",
+    "vertices": "vertex", "women": "woman",
+}
+# Words ending in "s" that are not plurals
+_KEEP_S = ("ss", "us", "is", "ics", "ous", "ness")
+SINGULAR_S = frozenset({"alias", "atlas", "bias", "canvas", "chaos", "lens", "news", "series", "species"})
+
+
+@lru_cache(maxsize=65536)
+def lemma(word: str) -> str:
+    """Singular form of an English noun; other words are returned unchanged."""
+    if word.endswith("'s"):
+        word = word[:-2]
+    irregular = IRREGULAR_LEMMAS.get(word)
+    if irregular is not None:
+        return irregular
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(_KEEP_S) or word in SINGULAR_S:
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "ches", "shes", "xes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def phrase_key(phrase: str) -> str:
+    """A phrase's words as lemmas, for comparing keyphrases."""
+    return " ".join(lemma(token) for token in TOKEN_RE.findall(phrase.lower()))
+
+
+Candidate = Tuple[Tuple[str, ...], str]  # (lemmas, surface form)
+
+
+def candidates(text: str) -> List[Tuple[int, Candidate]]:
+    """Candidate phrases of ``text`` in order, each with the index of its sentence fragment."""
+    found = []
+    for fragment_no, fragment in enumerate(_BOUNDARY_RE.split(text.lower())):
+        run: List[str] = []
+        for token in TOKEN_RE.findall(fragment) + [""]:
+            if token and token not in PHRASE_STOP_WORDS and not token.isdigit() and len(run) < MAX_PHRASE_WORDS:
+                run.append(token)
+                continue
+            if run and (len(run) > 1 or len(run[0]) >= MIN_SINGLE_WORD_LENGTH):
+                found.append((fragment_no, (tuple(lemma(word) for word in run), " ".join(run))))
+            # A content word that overflowed the phrase starts the next one
+            run = [token] if token and token not in PHRASE_STOP_WORDS and not token.isdigit() else []
+    return found
+
+
+def content_hash(paper: Dict[str, Any]) -> str:
+    text = f"{paper.get('title', '')}\n{paper.get('abstract', '')}"
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+class KeyphraseExtractor:
+    """Keyphrases for batches of papers, with corpus statistics kept across batches.
+
+    Thread-safe; batches are serialized.
+    """
+
+    def __init__(self, per_paper: Optional[int] = None, cache_entries: Optional[int] = None,
+                 max_vocabulary: Optional[int] = None):
+        self.per_paper = per_paper or config.KEYPHRASES_PER_PAPER
+        self.cache_entries = cache_entries or config.KEYPHRASE_CACHE_ENTRIES
+        self.max_vocabulary = max_vocabulary or config.KEYPHRASE_MAX_VOCABULARY
+        self._cache: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
+        # Number of documents each phrase occurred in, and the number of documents
+        self._df: Counter = Counter()
+        self._documents = 0
+        self._lock = threading.Lock()
+
+    def extract(self, papers: List[Dict[str, Any]]) -> List[List[str]]:
+        """Keyphrases of each paper's title and abstract, best first."""
+        with self._lock:
+            keys = [(str(paper.get("external_id") or paper.get("id") or ""), content_hash(paper)) for paper in papers]
+            results: List[Optional[List[str]]] = []
+            pending: Dict[Tuple[str, str], Tuple[List[Tuple[int, Candidate]], set]] = {}
+            for key, paper in zip(keys, papers):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                elif key not in pending:
+                    title = candidates(paper.get("title") or "")
+                    body = candidates(paper.get("abstract") or "")
+                    pending[key] = (title + [(fragment + 1, c) for fragment, c in body], {c[0] for _, c in title})
+                results.append(cached)
+
+            for found, _ in pending.values():
+                self._df.update({phrase for _, (phrase, _) in found})
+            self._documents += len(pending)
+            if len(self._df) > self.max_vocabulary:
+                self._prune()
+
+            ranked = {key: self._rank(found, title_phrases) for key, (found, title_phrases) in pending.items()}
+            self._cache.update(ranked)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+            return [ranked[key] if result is None else result for key, result in zip(keys, results)]
+
+    def extract_text(self, text: str, title: str = "") -> List[str]:
+        """Keyphrases of free text, scored against the corpus without joining it."""
+        with self._lock:
+            title_found = candidates(title)
+            found = title_found + [(fragment + 1, c) for fragment, c in candidates(text)]
+            return self._rank(found, {c[0] for _, c in title_found})
+
+    def _rank(self, found: List[Tuple[int, Candidate]], title_phrases: set) -> List[str]:
+        word_freq: Counter = Counter()
+        word_degree: Counter = Counter()
+        phrase_freq: Counter = Counter()
+        first_fragment: Dict[Tuple[str, ...], int] = {}
+        surface: Dict[Tuple[str, ...], str] = {}
+        for fragment, (phrase, text) in found:
+            phrase_freq[phrase] += 1
+            first_fragment.setdefault(phrase, fragment)
+            surface.setdefault(phrase, text)
+            for word in phrase:
+                word_freq[word] += 1
+                word_degree[word] += len(phrase)
+
+        documents = self._documents + 1
+        scored = []
+        for phrase, freq in phrase_freq.items():
+            if len(phrase) == 1 and not _salient_word(phrase[0], surface[phrase], freq, phrase in title_phrases):
+                continue
+            rake = sum(word_degree[word] / word_freq[word] for word in phrase)
+            idf = math.log(documents / (self._df.get(phrase, 0) + 1)) + 1
+            position = 1 + 1 / (1 + first_fragment[phrase])
+            score = rake * (1 + math.log(freq)) * idf * position
+            if phrase in title_phrases:
+                score *= TITLE_BOOST
+            scored.append((score, phrase))
+        scored.sort(reverse=True)
+
+        selected: List[Tuple[str, ...]] = []
+        for _, phrase in scored:
+            if any(_overlaps(phrase, other) for other in selected):
+                continue
+            selected.append(phrase)
+            if len(selected) == self.per_paper:
+                break
+        return [surface[phrase] for phrase in selected]
+
+    def _prune(self):
+        """Forget phrases seen in a single document; they carry the least idf information."""
+        self._df = Counter({phrase: df for phrase, df in self._df.items() if df > 1})
+
+
+def _salient_word(word_lemma: str, word: str, freq: int, in_title: bool) -> bool:
+    """Whether a single word is a specific noun prominent enough to be a keyphrase."""
+    if word_lemma in GENERIC_SINGLE_WORDS or word.rsplit("-", 1)[-1].endswith(NON_NOUN_SUFFIXES):
+        return False
+    return in_title or freq >= MIN_SINGLE_WORD_FREQUENCY
+
+
+def _overlaps(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """Whether one phrase occurs inside the other."""
+    short, long = (a, b) if len(a) <= len(b) else (b, a)
+    return any(long[i:i + len(short)] == short for i in range(len(long) - len(short) + 1))
@@ -0,0 +1,76 @@
+"""Online latency percentiles per paper source.
+
+A :class:`LatencyTracker` keeps a histogram of observed latencies in
+logarithmic buckets (each ``BUCKET_GROWTH`` times wider than the last), so any
+percentile is read in one pass over a few dozen counters with a relative
+error under 5%. Counts are halved every ``HALF_LIFE`` observations, so the
+percentiles follow a source whose latency drifts instead of averaging over its
+whole history.
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional
+
+from . import config
+
+MIN_SECONDS = 0.01
+MAX_SECONDS = 300.0
+BUCKET_GROWTH = 1.1
+_BUCKETS = int(math.ceil(math.log(MAX_SECONDS / MIN_SECONDS, BUCKET_GROWTH))) + 1
+
+
+class LatencyTracker:
+    """Decaying log-bucket histogram of one source's latencies."""
+
+    def __init__(self, half_life: Optional[int] = None):
+        self.half_life = half_life or config.LATENCY_HALF_LIFE
+        self._counts: List[float] = [0.0] * _BUCKETS
+        self._total = 0.0
+        self._since_decay = 0
+        self.observations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        if seconds <= MIN_SECONDS:
+            return 0
+        return min(_BUCKETS - 1, int(math.log(seconds / MIN_SECONDS, BUCKET_GROWTH)) + 1)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._counts[self._bucket(seconds)] += 1
+            self._total += 1
+            self.observations += 1
+            self._since_decay += 1
+            if self._since_decay >= self.half_life:
+                self._counts = [count / 2 for count in self._counts]
+                self._total /= 2
+                self._since_decay = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The ``q`` quantile in seconds (a bucket's upper edge); None before ``LATENCY_MIN_SAMPLES``."""
+        with self._lock:
+            if self.observations < config.LATENCY_MIN_SAMPLES:
+                return None
+            target = q * self._total
+            seen = 0.0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= target:
+                    return MIN_SECONDS * BUCKET_GROWTH ** index
+            return MAX_SECONDS
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {"p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99)}
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(name: str) -> LatencyTracker:
+    """Process-wide tracker for ``name`` (a source, or a source and phase such as ``arxiv.first``)."""
+    tracker = _trackers.get(name)
+    if tracker is None:
+        tracker = _trackers[name] = LatencyTracker()
+    return tracker
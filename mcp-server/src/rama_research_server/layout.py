@@ -0,0 +1,357 @@
+"""Force-directed layout of mindmap graphs.
+
+Positions come from a Fruchterman-Reingold simulation vectorized with NumPy.
+Edges pull their endpoints together like springs, every pair of nodes repels,
+and a weak gravity keeps disconnected parts together. Repulsion is approximated
+with a Barnes-Hut quadtree: nodes are sorted by Morton code, so every level of
+the tree is a set of contiguous runs, and the tree is walked one level at a time
+for all nodes at once. An iteration costs O(n log n) instead of O(n^2).
+
+A layout can be warm-started from earlier positions. Nodes added to a graph that
+was laid out before start next to their already placed neighbours, and the
+simulation starts cooler, so known nodes barely move. Each run stops at the
+iteration limit, the time budget, or once nodes stop moving.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import config
+
+# Ideal edge length in layout units; canvas coordinates are scaled at the end
+EDGE_LENGTH = 1.0
+# Quadtree depth limit; nodes closer than 1/2**depth of the layout share a leaf
+MAX_DEPTH = 12
+# Graphs up to this size compute exact pairwise repulsion, which is faster there
+EXACT_REPULSION_NODES = 128
+# Iterations a quadtree's interaction lists are reused for
+TREE_REBUILD_ITERATIONS = 8
+# Initial step in edge lengths of a warm-started run; cold starts take about sqrt(n) / 10
+WARM_START_STEP = 1.0
+# Fraction of the step that nodes placed by an earlier layout may take in a warm start
+WARM_START_MOBILITY = 0.1
+STEP_DECAY = 0.9
+# Step length, relative to the layout's extent, at which it has converged: under
+# a pixel once scaled to an 800 pixel canvas
+CONVERGED_STEP = 1e-3
+
+Position = Tuple[float, float]
+
+
+@dataclass
+class LayoutResult:
+    positions: np.ndarray  # (n, 2) in layout units
+    iterations: int
+    seconds: float
+    converged: bool
+
+
+@dataclass
+class QuadTree:
+    """Barnes-Hut interaction lists: which quadtree cells act on which nodes.
+
+    Cells of all levels share one index space. Positions move little between
+    iterations, so a tree is reused for a few of them: only the cells' centres
+    of mass are recomputed from the current positions.
+    """
+    cell_of: np.ndarray  # (levels, n) cell of every node on each level
+    cells: int
+    nodes: np.ndarray  # accepted (node, cell) pairs
+    pair_cells: np.ndarray
+    pair_mass: np.ndarray  # mass acting on the node, which excludes itself in its own leaf
+    own: np.ndarray  # pairs of a node with the leaf it shares with coincident nodes
+    own_mass: np.ndarray  # mass of the node in each of those pairs
+
+    def repulsion(self, pos: np.ndarray, mass: np.ndarray) -> np.ndarray:
+        # Coordinates are handled as separate 1-D arrays: gathers of (n, 2) rows are much slower
+        cell_of = self.cell_of.ravel()
+        levels = len(self.cell_of)
+        deltas = []
+        for axis in (0, 1):
+            coord = np.ascontiguousarray(pos[:, axis])
+            weighted = np.bincount(cell_of, weights=np.tile(mass * coord, levels), minlength=self.cells)
+            node_coord = coord[self.nodes]
+            center = weighted[self.pair_cells]
+            center[self.own] -= node_coord[self.own] * self.own_mass
+            deltas.append(node_coord - center / self.pair_mass)
+        dx, dy = deltas
+        scale = EDGE_LENGTH ** 2 * self.pair_mass / np.maximum(dx * dx + dy * dy, 1e-9)
+        force = np.empty_like(pos)
+        force[:, 0] = np.bincount(self.nodes, weights=dx * scale, minlength=len(pos))
+        force[:, 1] = np.bincount(self.nodes, weights=dy * scale, minlength=len(pos))
+        return force
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Interleave zeros between the low 16 bits of each value."""
+    v = values.astype(np.uint64) & np.uint64(0xFFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def tree_depth(n: int) -> int:
+    """Enough levels for about one node per leaf when nodes are spread evenly."""
+    return min(MAX_DEPTH, max(4, math.ceil(math.log2(max(n, 2)) / 2) + 3))
+
+
+def build_quadtree(pos: np.ndarray, mass: np.ndarray, theta: float, depth: Optional[int] = None) -> QuadTree:
+    """Build the quadtree over ``pos`` and walk it for every node at once.
+
+    Nodes sorted by Morton code make each cell a contiguous run, so a level is a
+    handful of array operations. A cell whose side is less than ``theta`` times
+    its distance from a node acts on it as one body at its centre of mass;
+    otherwise the node visits the cell's children on the next level.
+    """
+    n = len(pos)
+    depth = tree_depth(n) if depth is None else depth
+    x, y = np.ascontiguousarray(pos[:, 0]), np.ascontiguousarray(pos[:, 1])
+    low_x, low_y = x.min(), y.min()
+    side = max(x.max() - low_x, y.max() - low_y) or EDGE_LENGTH
+    cells = 1 << depth
+    grid_x = np.clip(((x - low_x) * (cells / side)).astype(np.int64), 0, cells - 1)
+    grid_y = np.clip(((y - low_y) * (cells / side)).astype(np.int64), 0, cells - 1)
+    morton = (_spread_bits(grid_x) | (_spread_bits(grid_y) << np.uint64(1))).astype(np.int64)
+    order = np.argsort(morton, kind="stable")
+    morton = morton[order]
+    sorted_mass = mass[order]
+    weighted_x, weighted_y = x[order] * sorted_mass, y[order] * sorted_mass
+
+    # Per level: cell keys, offset into the shared index, mass, centre, node count
+    levels = []
+    cell_of = []
+    offset = 0
+    for level in range(depth + 1):
+        keys = morton >> (2 * (depth - level))
+        boundary = np.concatenate(([True], keys[1:] != keys[:-1]))
+        starts = np.flatnonzero(boundary)
+        of = np.empty(n, dtype=np.int64)
+        of[order] = np.cumsum(boundary) - 1
+        cell_mass = np.add.reduceat(sorted_mass, starts)
+        count = np.diff(np.append(starts, n))
+        levels.append((keys[starts], offset, cell_mass, np.add.reduceat(weighted_x, starts) / cell_mass,
+                       np.add.reduceat(weighted_y, starts) / cell_mass, count))
+        cell_of.append(of + offset)
+        offset += len(starts)
+        if count.max() == 1:
+            # Every node has a cell of its own: this is the leaf level
+            break
+
+    pairs = []
+    nodes = np.arange(n)
+    local = np.zeros(n, dtype=np.int64)
+    last = len(levels) - 1
+    for level, (keys, level_offset, cell_mass, center_x, center_y, count) in enumerate(levels):
+        own = cell_of[level][nodes] - level_offset == local
+        single = count[local] == 1
+        if level == last:
+            # Leaves may hold nearly coincident nodes: a node feels the others in its own
+            keep = ~(own & single)
+            pairs.append((nodes[keep], local[keep] + level_offset, own[keep]))
+            break
+        dx = x[nodes] - center_x[local]
+        dy = y[nodes] - center_y[local]
+        cell_side = side / (1 << level)
+        far = ~own & (single | (cell_side * cell_side < theta * theta * (dx * dx + dy * dy)))
+        pairs.append((nodes[far], local[far] + level_offset, np.zeros(np.count_nonzero(far), dtype=bool)))
+
+        # Open the remaining cells, except a node's own single-node cell
+        expand = ~far & ~(own & single)
+        nodes, local = nodes[expand], local[expand]
+        if not len(nodes):
+            break
+        child_keys = levels[level + 1][0]
+        first_child = np.searchsorted(child_keys >> 2, keys)
+        children = np.diff(np.append(first_child, len(child_keys)))
+        counts = children[local]
+        nodes = np.repeat(nodes, counts)
+        local = np.repeat(first_child[local], counts) + np.arange(len(nodes)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    pair_nodes = np.concatenate([p[0] for p in pairs])
+    pair_cells = np.concatenate([p[1] for p in pairs])
+    own = np.concatenate([p[2] for p in pairs])
+    all_mass = np.concatenate([level[2] for level in levels])
+    return QuadTree(
+        cell_of=np.stack(cell_of),
+        cells=offset,
+        nodes=pair_nodes,
+        pair_cells=pair_cells,
+        pair_mass=all_mass[pair_cells] - np.where(own, mass[pair_nodes], 0.0),
+        own=np.flatnonzero(own),
+        own_mass=mass[pair_nodes[own]],
+    )
+
+
+def barnes_hut_repulsion(pos: np.ndarray, mass: np.ndarray, theta: float, depth: Optional[int] = None) -> np.ndarray:
+    """Approximate repulsive force on every node in O(n log n)."""
+    return build_quadtree(pos, mass, theta, depth).repulsion(pos, mass)
+
+
+def exact_repulsion(pos: np.ndarray, mass: np.ndarray) -> np.ndarray:
+    delta = pos[:, None, :] - pos[None, :, :]
+    dist2 = (delta * delta).sum(axis=2)
+    np.fill_diagonal(dist2, np.inf)
+    scale = EDGE_LENGTH ** 2 * mass[None, :] / np.maximum(dist2, 1e-9)
+    return (delta * scale[:, :, None]).sum(axis=1)
+
+
+def initial_positions(n: int, edges: np.ndarray, known: Optional[Dict[int, Position]],
+                      rng: np.random.Generator) -> np.ndarray:
+    """Known positions as given; new nodes next to their placed neighbours, else at random."""
+    spread = math.sqrt(max(n, 1)) * EDGE_LENGTH
+    pos = rng.uniform(-spread / 2, spread / 2, size=(n, 2))
+    if not known:
+        return pos
+    placed = np.zeros(n, dtype=bool)
+    for index, xy in known.items():
+        pos[index] = xy
+        placed[index] = True
+    # Breadth-first from the known nodes, so chains of new nodes grow outwards
+    for _ in range(n):
+        frontier = placed[edges[:, 0]] ^ placed[edges[:, 1]] if len(edges) else np.zeros(0, dtype=bool)
+        if not frontier.any():
+            break
+        new = np.where(placed[edges[frontier, 0]], edges[frontier, 1], edges[frontier, 0])
+        anchor = np.where(placed[edges[frontier, 0]], edges[frontier, 0], edges[frontier, 1])
+        total = np.zeros((n, 2))
+        np.add.at(total, new, pos[anchor])
+        hits = np.bincount(new, minlength=n)
+        fresh = hits > 0
+        pos[fresh] = total[fresh] / hits[fresh, None] + rng.normal(scale=EDGE_LENGTH / 2, size=(fresh.sum(), 2))
+        placed |= fresh
+    if placed.any() and not placed.all():
+        # Disconnected newcomers start around the existing layout
+        center = pos[placed].mean(axis=0)
+        pos[~placed] += center
+    return pos
+
+
+def force_layout(n: int, edges: Sequence[Tuple[int, int]], weights: Optional[Sequence[float]] = None,
+                 masses: Optional[Sequence[float]] = None, known: Optional[Dict[int, Position]] = None,
+                 fixed: Optional[Sequence[int]] = None, iterations: Optional[int] = None,
+                 time_budget: Optional[float] = None, theta: Optional[float] = None,
+                 seed: int = 0) -> LayoutResult:
+    """Lay out ``n`` nodes joined by ``edges`` (pairs of node indices).
+
+    ``weights`` scale each edge's spring and ``masses`` each node's repulsion.
+    ``known`` maps node indices to positions from an earlier layout and turns
+    the run into a warm start; ``fixed`` nodes never move.
+    """
+    started = time.perf_counter()
+    iterations = config.LAYOUT_MAX_ITERATIONS if iterations is None else iterations
+    time_budget = config.LAYOUT_TIME_BUDGET if time_budget is None else time_budget
+    theta = config.LAYOUT_THETA if theta is None else theta
+    rng = np.random.default_rng(seed)
+
+    edge_array = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    # Self-loops exert no force; drop them together with their weights
+    keep = edge_array[:, 0] != edge_array[:, 1]
+    edge_array = edge_array[keep]
+    weight = np.ones(len(edge_array)) if weights is None else np.asarray(weights, dtype=float)[keep]
+    mass = np.ones(n) if masses is None else np.asarray(masses, dtype=float)
+    pos = initial_positions(n, edge_array, known, rng)
+    if n < 2:
+        return LayoutResult(pos, 0, time.perf_counter() - started, True)
+
+    warm = bool(known) and len(known) >= n // 2
+    mobility = np.ones(n)
+    if warm:
+        mobility[list(known)] = WARM_START_MOBILITY
+    if fixed is not None:
+        mobility[list(fixed)] = 0
+    # Adaptive step length (Hu, 2005): grows while the energy keeps falling, shrinks
+    # otherwise. Warm starts cool down on every iteration.
+    step = EDGE_LENGTH * (WARM_START_STEP if warm else max(1.0, math.sqrt(n) / 10))
+    energy = math.inf
+    progress = 0
+    src, dst = edge_array[:, 0], edge_array[:, 1]
+    tree: Optional[QuadTree] = None
+
+    done = 0
+    converged = False
+    while done < iterations:
+        if n <= EXACT_REPULSION_NODES:
+            force = exact_repulsion(pos, mass)
+        else:
+            if done % TREE_REBUILD_ITERATIONS == 0:
+                tree = build_quadtree(pos, mass, theta)
+            force = tree.repulsion(pos, mass)
+        if len(edge_array):
+            delta = pos[dst] - pos[src]
+            pull = delta * (np.sqrt((delta * delta).sum(axis=1)) * weight / EDGE_LENGTH)[:, None]
+            for axis in (0, 1):
+                force[:, axis] += (np.bincount(src, weights=pull[:, axis], minlength=n)
+                                   - np.bincount(dst, weights=pull[:, axis], minlength=n))
+        force -= config.LAYOUT_GRAVITY * mass[:, None] * (pos - pos.mean(axis=0))
+
+        length = np.sqrt((force * force).sum(axis=1))
+        pos += force * (mobility * np.minimum(length, step) / np.maximum(length, 1e-12))[:, None]
+        done += 1
+
+        new_energy = float((length * length).sum())
+        if warm or new_energy >= energy:
+            progress = 0
+            step *= STEP_DECAY
+        else:
+            progress += 1
+            if progress >= 5:
+                progress = 0
+                step /= STEP_DECAY
+        energy = new_energy
+
+        if step < CONVERGED_STEP * float((pos.max(axis=0) - pos.min(axis=0)).max()):
+            converged = True
+            break
+        if time.perf_counter() - started > time_budget:
+            break
+    return LayoutResult(pos, done, time.perf_counter() - started, converged)
+
+
+def fit_to_canvas(pos: np.ndarray, width: float, height: float, margin: float = 40) -> np.ndarray:
+    """Scale and centre layout positions into a ``width`` x ``height`` canvas, keeping the aspect ratio."""
+    if not len(pos):
+        return pos
+    low, high = pos.min(axis=0), pos.max(axis=0)
+    span = np.maximum(high - low, 1e-9)
+    scale = min((width - 2 * margin) / span[0], (height - 2 * margin) / span[1])
+    center = (low + high) / 2
+    return (pos - center) * scale + np.array([width / 2, height / 2])
+
+
+def node_key(node: Dict[str, Any]) -> str:
+    """Identity of a mindmap node across layouts of the same topic."""
+    return f"{node.get('type', '')}:{str(node.get('label', '')).lower()}"
+
+
+def layout_mindmap(nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]],
+                   previous: Optional[Dict[str, Position]] = None, width: float = 800,
+                   height: float = 600, **options: Any) -> Tuple[Dict[str, Position], LayoutResult]:
+    """Set ``x``/``y`` of mindmap ``nodes`` in place from a force-directed layout.
+
+    ``previous`` is the return value of an earlier call for the same map; nodes
+    found in it warm-start from where they were. Returns the raw layout
+    positions keyed by :func:`node_key`, to pass as ``previous`` next time.
+    """
+    index = {node["id"]: i for i, node in enumerate(nodes)}
+    keys = [node_key(node) for node in nodes]
+    edges, weights = [], []
+    for connection in connections:
+        a, b = index.get(connection["from"]), index.get(connection["to"])
+        if a is not None and b is not None:
+            edges.append((a, b))
+            weights.append(float(connection.get("strength", 1.0) or 1.0))
+    masses = [max(float(node.get("size") or 20), 1.0) / 20 for node in nodes]
+    known = {i: previous[key] for i, key in enumerate(keys) if previous and key in previous}
+
+    result = force_layout(len(nodes), edges, weights, masses, known or None, **options)
+    canvas = fit_to_canvas(result.positions, width, height)
+    for node, (x, y) in zip(nodes, canvas):
+        node["x"] = round(float(x), 1)
+        node["y"] = round(float(y), 1)
+    return {key: (float(x), float(y)) for key, (x, y) in zip(keys, result.positions)}, result
@@ -10,14 +10,16 @@ This server provides research automation capabilities including:
 - Audio synthesis
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional, Sequence
-import httpx
-import arxiv
-from scholarly import scholarly
-from mcp.server import Server
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 from mcp.types import (
     Resource,
@@ -31,6 +33,17 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime
 
+from . import codec, config
+from .cache import SearchCache
+from .citations import STYLES as CITATION_STYLES, get_citation_engine
+from .concepts import get_concept_graph
+from .index import get_paper_index, relevance_from_score
+from .keyphrases import KeyphraseExtractor
+from .latency import get_latency_tracker
+from .layout import Position, layout_mindmap
+from .sources import SourceReport, get_sources, merge_sources
+from .upstream import close_http_client
+
 # Load environment variables
 load_dotenv()
 
@@ -38,9 +51,30 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("rama-research-server")
 
+# Related concepts of a topic the concept graph doesn't know yet, and the pairs of them a mindmap connects
+GENERIC_CONCEPTS = ("methodology", "applications", "challenges", "future work", "related research", "implementation", "analysis", "results")
+GENERIC_CONCEPT_LINKS = ((0, 2), (1, 3), (4, 6))
+
+
 class RAMAResearchServer:
     def __init__(self):
         self.server = Server("rama-research-server")
+        self.search_cache = SearchCache(
+            config.SEARCH_CACHE_PATH,
+            ttls=config.SEARCH_CACHE_TTLS,
+            default_ttl=config.SEARCH_CACHE_DEFAULT_TTL,
+            stale_seconds=config.SEARCH_CACHE_STALE_SECONDS,
+            memory_entries=config.SEARCH_CACHE_MEMORY_ENTRIES,
+            disk_entries=config.SEARCH_CACHE_DISK_ENTRIES,
+        ) if config.SEARCH_CACHE_ENABLED else None
+        self.paper_index = get_paper_index() if config.PAPER_INDEX_ENABLED else None
+        self.keyphrases = KeyphraseExtractor()
+        self.concept_graph = get_concept_graph() if config.CONCEPT_GRAPH_ENABLED else None
+        self.citations = get_citation_engine()
+        # Background stale-while-revalidate refreshes, keyed by cache key
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Last mindmap layout per topic, to warm-start the next one
+        self._layouts: "OrderedDict[str, Dict[str, Position]]" = OrderedDict()
         self.setup_handlers()
     
     def setup_handlers(self):
@@ -121,6 +155,10 @@ class RAMAResearchServer:
                                 "items": {"type": "string"},
                                 "description": "Data sources to search",
                                 "default": ["arxiv", "scholar"]
+                            },
+                            "latency_budget": {
+                                "type": "number",
+                                "description": "Seconds each source may take; slower sources contribute what they have by then"
                             }
                         },
                         "required": ["query"]
@@ -198,6 +236,11 @@ class RAMAResearchServer:
                                 "type": "boolean",
                                 "description": "Include author nodes in the map",
                                 "default": True
+                            },
+                            "papers": {
+                                "type": "array",
+                                "description": "Papers to map with their authors and keywords",
+                                "items": {"type": "object"}
                             }
                         },
                         "required": ["topic"]
@@ -235,7 +278,8 @@ class RAMAResearchServer:
                             },
                             "format": {
                                 "type": "string",
-                                "description": "Citation format",
+                                "description": "Style of formatted_bibliography",
+                                "enum": list(CITATION_STYLES),
                                 "default": "ieee"
                             }
                         },
@@ -283,33 +327,39 @@ class RAMAResearchServer:
             ]
 
         @self.server.call_tool()
-        async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
+        async def handle_call_tool(name: str, arguments: dict):
             """Handle tool calls."""
             try:
                 if name == "search_papers":
-                    return await self.search_papers(**arguments)
+                    result = await self.search_papers(**arguments)
                 elif name == "generate_workspace":
-                    return await self.generate_workspace(**arguments)
+                    result = await self.generate_workspace(**arguments)
                 elif name == "create_mindmap":
-                    return await self.create_mindmap(**arguments)
+                    result = await self.create_mindmap(**arguments)
                 elif name == "create_interactive_mindmap":
-                    return await self.create_interactive_mindmap(**arguments)
+                    result = await self.create_interactive_mindmap(**arguments)
                 elif name == "generate_comprehensive_summaries":
-                    return await self.generate_comprehensive_summaries(**arguments)
+                    result = await self.generate_comprehensive_summaries(**arguments)
                 elif name == "generate_ieee_citations":
-                    return await self.generate_ieee_citations(**arguments)
+                    result = await self.generate_ieee_citations(**arguments)
                 elif name == "generate_sample_paper":
-                    return await self.generate_sample_paper(**arguments)
+                    result = await self.generate_sample_paper(**arguments)
                 elif name == "synthesize_audio":
-                    return await self.synthesize_audio(**arguments)
+                    result = await self.synthesize_audio(**arguments)
                 else:
                     raise ValueError(f"Unknown tool: {name}")
             except Exception as e:
                 logger.error(f"Error in tool {name}: {e}")
-                return [TextContent(type="text", text=f"Error: {str(e)}")]
+                # Reported to the client as a result with isError set
+                raise
+            return codec.tool_result(result, codec.client_accepts_compact(self.server.request_context.session))
+
+    async def create_interactive_mindmap(self, topic: str, depth: int = 3, include_connections: bool = True, include_authors: bool = True, papers: List[dict] = None) -> Dict[str, Any]:
+        """Create an enhanced interactive mind map with author connections.
 
-    async def create_interactive_mindmap(self, topic: str, depth: int = 3, include_connections: bool = True, include_authors: bool = True) -> list[TextContent]:
-        """Create an enhanced interactive mind map with author connections."""
+        With ``papers``, every paper becomes a node linked to its authors and
+        keywords. Node positions come from the force-directed layout engine.
+        """
         nodes = [
             {
                 "id": 1,
@@ -375,7 +425,9 @@ class RAMAResearchServer:
             {"from": 1, "to": 5, "strength": 0.9, "type": "main_concept", "label": "evolves toward"}
         ]
         
-        if include_authors:
+        if papers:
+            self._add_paper_nodes(nodes, connections, papers, include_authors)
+        elif include_authors:
             # Add author nodes
             nodes.extend([
                 {
@@ -406,6 +458,8 @@ class RAMAResearchServer:
                 {"from": 10, "to": 1, "strength": 0.9, "type": "authored", "label": "researches"},
                 {"from": 11, "to": 1, "strength": 0.9, "type": "authored", "label": "contributes to"}
             ])
+
+        layout_stats = await self._layout(f"interactive:{topic}", nodes, connections)
         
         mindmap = {
             "id": f"interactive_mm_{int(datetime.now().timestamp())}",
@@ -417,6 +471,7 @@ class RAMAResearchServer:
                 "complexity_level": "intermediate",
                 "node_count": len(nodes),
                 "connection_count": len(connections),
+                "layout": layout_stats,
                 "interactive_features": {
                     "zoom": True,
                     "pan": True,
@@ -427,9 +482,75 @@ class RAMAResearchServer:
             }
         }
         
-        return [TextContent(type="text", text=json.dumps(mindmap, indent=2))]
+        return mindmap
+
+    def _add_paper_nodes(self, nodes: List[dict], connections: List[dict], papers: List[dict], include_authors: bool):
+        """Add a node per paper, linked to the central topic, its authors and its keywords."""
+        next_id = max(node["id"] for node in nodes) + 1
+        authors: Dict[str, dict] = {}
+        keywords: Dict[str, dict] = {}
+
+        def add_node(**node) -> dict:
+            nonlocal next_id
+            node = {"id": next_id, "x": 0, "y": 0, "connections_count": 0, **node}
+            nodes.append(node)
+            next_id += 1
+            return node
 
-    async def generate_comprehensive_summaries(self, topic: str, papers: List[dict] = None) -> list[TextContent]:
+        def connect(a: dict, b: dict, strength: float, kind: str, label: str):
+            connections.append({"from": a["id"], "to": b["id"], "strength": strength, "type": kind, "label": label})
+            a["connections_count"] += 1
+            b["connections_count"] += 1
+
+        central = nodes[0]
+        for paper in papers:
+            title = paper.get("title") or "Untitled"
+            relevance = max(0, min(100, paper.get("relevance_score") or 50))
+            paper_node = add_node(
+                label=title if len(title) <= 60 else title[:57] + "...",
+                type="paper",
+                size=12 + relevance // 10,
+                color="#F1948A",
+                description=f"{paper.get('journal') or 'Unknown venue'}, {paper.get('year') or 'n.d.'}",
+            )
+            connect(central, paper_node, round(relevance / 100, 2), "related", "includes")
+            if include_authors:
+                for name in (paper.get("authors") or [])[:6]:
+                    author = authors.get(name.lower())
+                    if author is None:
+                        author = authors[name.lower()] = add_node(
+                            label=name, type="author", size=15, color="#82E0AA", references=[],
+                        )
+                    author["references"].append(title)
+                    connect(author, paper_node, 0.9, "authored", "wrote")
+            for keyword in (paper.get("keywords") or [])[:5]:
+                concept = keywords.get(keyword.lower())
+                if concept is None:
+                    concept = keywords[keyword.lower()] = add_node(label=keyword, type="concept", size=14, color="#DDA0DD")
+                connect(paper_node, concept, 0.5, "related", "discusses")
+
+    async def _layout(self, key: str, nodes: List[dict], connections: List[dict]) -> Dict[str, Any]:
+        """Position mindmap ``nodes``, warm-starting from the last layout for ``key``."""
+        key = key.lower().strip()
+        previous = self._layouts.get(key)
+        # Large maps take a noticeable fraction of a second; keep the event loop free
+        positions, result = await asyncio.to_thread(layout_mindmap, nodes, connections, previous)
+        self._layouts[key] = positions
+        self._layouts.move_to_end(key)
+        while len(self._layouts) > config.LAYOUT_CACHE_ENTRIES:
+            self._layouts.popitem(last=False)
+        logger.info(
+            f"Laid out {len(nodes)} nodes in {result.seconds * 1000:.0f}ms "
+            f"({result.iterations} iterations, warm={previous is not None})"
+        )
+        return {
+            "iterations": result.iterations,
+            "milliseconds": round(result.seconds * 1000, 1),
+            "converged": result.converged,
+            "warm_start": previous is not None,
+        }
+
+    async def generate_comprehensive_summaries(self, topic: str, papers: List[dict] = None) -> Dict[str, Any]:
         """Generate comprehensive summaries for research topic and papers."""
         if papers is None:
             papers = []
@@ -492,59 +613,53 @@ class RAMAResearchServer:
             ]
         }
         
-        return [TextContent(type="text", text=json.dumps(summaries, indent=2))]
+        return summaries
+
+    async def generate_ieee_citations(self, papers: List[dict], format: str = "ieee") -> Dict[str, Any]:
+        """Generate automated IEEE citations and a bibliography in every style.
 
-    async def generate_ieee_citations(self, papers: List[dict], format: str = "ieee") -> list[TextContent]:
-        """Generate automated IEEE citations and bibliography."""
+        ``formatted_bibliography`` is rendered in ``format`` (ieee, apa, mla, bibtex or ris).
+        """
+        style = format if format in CITATION_STYLES else "ieee"
+        ieee = self.citations.writer("ieee")
+        bibtex = self.citations.writer("bibtex")
         ieee_citations = []
         bibliography_entries = []
         
         for i, paper in enumerate(papers):
             citation_num = i + 1
-            title = paper.get("title", "Unknown Title")
-            authors = paper.get("authors", ["Unknown Author"])
-            journal = paper.get("journal", "Unknown Journal")
-            year = paper.get("year", 2024)
-            
-            # IEEE Citation
-            authors_str = authors[0] if authors else "Unknown Author"
-            if len(authors) > 1:
-                authors_str += " et al."
-                
-            ieee_format = f'[{citation_num}] {authors_str}, "{title}," {journal}, vol. XX, no. X, pp. XX-XX, {year}.'
-            
+            ieee_format = ieee.render(paper)
             ieee_citations.append({
                 "id": citation_num,
-                "paper_id": paper.get("id", i+1),
+                "paper_id": paper.get("id", citation_num),
                 "citation_text": ieee_format,
                 "citation_number": citation_num,
                 "in_text_format": f"[{citation_num}]"
             })
-            
-            # Bibliography Entry
-            authors_formatted = ", ".join(authors[:3])
-            if len(authors) > 3:
-                authors_formatted += " et al."
-                
             bibliography_entries.append({
                 "id": citation_num,
-                "paper_id": paper.get("id", i+1),
+                "paper_id": paper.get("id", citation_num),
                 "ieee_format": ieee_format,
-                "bibtex_format": f'@article{{{authors[0].split()[-1].lower()}{year} if authors else f"unknown{year}",\n  title={{{title}}},\n  author={{{" and ".join(authors)}}},\n  journal={{{journal}}},\n  year={{{year}}}\n}}',
-                "apa_format": f'{authors_formatted} ({year}). {title}. {journal}.',
-                "mla_format": f'{authors_formatted}. "{title}." {journal}, {year}.'
+                "bibtex_format": bibtex.render(paper),
+                "apa_format": self.citations.format(paper, "apa"),
+                "mla_format": self.citations.format(paper, "mla")
             })
         
-        citations = {
+        if style == "ieee":
+            formatted = "REFERENCES\n\n" + "\n\n".join(entry["ieee_format"] for entry in bibliography_entries)
+        elif style == "bibtex":
+            formatted = "\n\n".join(entry["bibtex_format"] for entry in bibliography_entries)
+        else:
+            formatted = "".join(self.citations.writer(style).stream(papers)).rstrip("\n")
+        
+        return {
             "ieee_citations": ieee_citations,
             "bibliography": bibliography_entries,
             "citation_count": len(papers),
-            "formatted_bibliography": "REFERENCES\n\n" + "\n\n".join([entry["ieee_format"] for entry in bibliography_entries])
+            "formatted_bibliography": formatted
         }
-        
-        return [TextContent(type="text", text=json.dumps(citations, indent=2))]
 
-    async def generate_sample_paper(self, topic: str, papers: List[dict] = None) -> list[TextContent]:
+    async def generate_sample_paper(self, topic: str, papers: List[dict] = None) -> Dict[str, Any]:
         """Generate a comprehensive sample research paper."""
         if papers is None:
             papers = []
@@ -606,78 +721,160 @@ class RAMAResearchServer:
             "generated_at": current_time
         }
         
-        return [TextContent(type="text", text=json.dumps(paper, indent=2))]
+        return paper
 
-    async def search_papers(self, query: str, max_results: int = 10, sources: List[str] = None) -> list[TextContent]:
-        """Search for research papers."""
+    async def search_papers(self, query: str, max_results: int = 10, sources: List[str] = None,
+                            latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Search for research papers, serving repeated queries from the search cache.
+
+        With ``latency_budget`` (seconds) every source is cut off at the budget and
+        listed in ``sources_truncated`` if it was still running.
+        """
         if sources is None:
             sources = ["arxiv", "scholar"]
+        on_paper = self._progress_reporter(max_results)
         
-        papers = []
+        if self.search_cache is None:
+            return await self._search_sources(query, max_results, sources, on_paper, latency_budget)
+        return await self._cached_search(query, max_results, sources, on_paper, latency_budget)
+
+    def _progress_reporter(self, total: int):
+        """Return a callback that streams papers to the client as MCP progress notifications.
+
+        Returns None unless the current request carries a progress token. Each paper
+        is sent as the JSON ``message`` of a ``notifications/progress``.
+        """
+        try:
+            ctx = self.server.request_context
+        except LookupError:
+            return None
+        token = ctx.meta.progressToken if ctx.meta else None
+        if token is None:
+            return None
+        
+        async def report(count: int, paper: Dict[str, Any]):
+            await ctx.session.send_progress_notification(
+                token, count, total=total, message=codec.dumps(paper), related_request_id=ctx.request_id
+            )
+        
+        return report
+
+    async def _cached_search(self, query: str, max_results: int, sources: List[str], on_paper=None,
+                             latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Stale-while-revalidate lookup in front of the upstream sources."""
+        key = self.search_cache.make_key(query, sources, max_results)
+        # The disk tier is a SQLite file; keep its reads and writes off the event loop
+        entry = await asyncio.to_thread(self.search_cache.get, key)
+        if entry is not None:
+            if not entry.is_fresh() and key not in self._refreshing:
+                task = asyncio.create_task(self._refresh_search(key, query, max_results, sources))
+                self._refreshing[key] = task
+                task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+            if on_paper is not None:
+                for count, paper in enumerate(entry.value["papers"], 1):
+                    await on_paper(count, paper)
+            return {**entry.value, "query": query, "cache": "hit" if entry.is_fresh() else "stale"}
         
+        result = await self._search_sources(query, max_results, sources, on_paper, latency_budget)
+        if result["sources_truncated"]:
+            # Not cached as is: the next request gets every source's full results
+            if key not in self._refreshing:
+                task = asyncio.create_task(self._refresh_search(key, query, max_results, sources))
+                self._refreshing[key] = task
+                task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        elif result["papers"]:
+            await asyncio.to_thread(self.search_cache.put, key, result, sources)
+        return {**result, "cache": "miss"}
+
+    async def _refresh_search(self, key: str, query: str, max_results: int, sources: List[str]):
         try:
-            # Search ArXiv
-            if "arxiv" in sources:
-                arxiv_client = arxiv.Client()
-                search = arxiv.Search(
-                    query=query,
-                    max_results=max_results // 2,
-                    sort_by=arxiv.SortCriterion.Relevance
-                )
-                
-                for result in arxiv_client.results(search):
-                    papers.append({
-                        "id": f"arxiv_{result.entry_id.split('/')[-1]}",
-                        "title": result.title,
-                        "authors": [str(author) for author in result.authors],
-                        "abstract": result.summary,
-                        "year": result.published.year,
-                        "journal": "ArXiv",
-                        "citations": 0,  # ArXiv doesn't provide citation count
-                        "relevance_score": 85,
-                        "keywords": self.extract_keywords(result.title + " " + result.summary),
-                        "url": result.entry_id
-                    })
-            
-            # Search Google Scholar (simplified)
-            if "scholar" in sources and len(papers) < max_results:
-                try:
-                    search_query = scholarly.search_pubs(query)
-                    remaining = max_results - len(papers)
-                    
-                    for i, pub in enumerate(search_query):
-                        if i >= remaining:
-                            break
-                        
-                        papers.append({
-                            "id": f"scholar_{i}",
-                            "title": pub.get('title', 'Unknown Title'),
-                            "authors": [author['name'] for author in pub.get('author', [])],
-                            "abstract": pub.get('abstract', 'No abstract available'),
-                            "year": pub.get('year', 2024),
-                            "journal": pub.get('venue', 'Unknown Journal'),
-                            "citations": pub.get('num_citations', 0),
-                            "relevance_score": max(70, 100 - i * 5),
-                            "keywords": self.extract_keywords(pub.get('title', '') + " " + pub.get('abstract', '')),
-                            "url": pub.get('url', '')
-                        })
-                except Exception as e:
-                    logger.warning(f"Scholar search failed: {e}")
-            
+            result = await self._search_sources(query, max_results, sources)
+            if result["papers"]:
+                await asyncio.to_thread(self.search_cache.put, key, result, sources)
         except Exception as e:
-            logger.error(f"Paper search error: {e}")
-            return [TextContent(type="text", text=f"Error searching papers: {str(e)}")]
+            logger.warning(f"Background refresh of cached search {query!r} failed: {e}")
+
+    def _annotate_streamed(self, paper: Dict[str, Any], bm25) -> None:
+        """Give a single streamed paper its keywords and, with a scorer, its relevance."""
+        paper["keywords"] = self.keyphrases.extract([paper])[0]
+        if bm25 is not None:
+            paper["relevance_score"] = relevance_from_score(bm25([paper])[0])
+
+    async def _search_sources(self, query: str, max_results: int, sources: List[str], on_paper=None,
+                              latency_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Search the upstream paper sources concurrently, merging results as they arrive.
+
+        Papers are numbered in arrival order; the upstream identifier is kept in
+        ``external_id``. ``on_paper`` is awaited with each paper as it arrives.
+        Relevance is the BM25 score against the local paper index. Once all sources
+        are done, duplicates across sources are collapsed by :func:`merge_papers`
+        and its batch TF-IDF similarity is averaged into the relevance; the
+        deduplicated papers are added to the index and sorted by relevance.
+        """
+        adapters = get_sources(sources)
+        report = SourceReport()
+        papers = []
+        # Corpus statistics are read once per search; scoring itself needs no database access
+        bm25 = await asyncio.to_thread(self.paper_index.scorer, query) if self.paper_index is not None else None
+        
+        async for source_name, paper in merge_sources(adapters, query, max_results, report, latency_budget):
+            paper["external_id"] = paper["id"]
+            paper["id"] = len(papers) + 1
+            if on_paper is not None:
+                # Streamed papers need keywords and a score now; the batch below redoes both.
+                # Extraction takes the extractor's lock, so it stays off the event loop.
+                await asyncio.to_thread(self._annotate_streamed, paper, bm25)
+            papers.append(paper)
+            if on_paper is not None:
+                await on_paper(len(papers), paper)
+        
+        if adapters and len(report.failed) == len(adapters):
+            logger.error(f"Paper search error: all sources failed: {report.failed}")
+            raise RuntimeError(f"All paper sources failed: {report.failed}")
         
-        result = {
+        found = len(papers)
+        if papers:
+            # numpy/scipy are only imported once a search actually needs them
+            from .merge import merge_papers
+
+            papers, similarity = await asyncio.to_thread(merge_papers, query, papers)
+            keywords = await asyncio.to_thread(self.keyphrases.extract, papers)
+            for paper, paper_keywords in zip(papers, keywords):
+                paper["keywords"] = paper_keywords
+            scores = await asyncio.to_thread(bm25, papers) if bm25 is not None else None
+            for i, (paper, cosine) in enumerate(zip(papers, similarity.tolist())):
+                batch_score = 100 * cosine
+                if scores is not None:
+                    batch_score = (batch_score + relevance_from_score(scores[i])) / 2
+                paper["relevance_score"] = int(round(batch_score))
+            papers.sort(key=lambda paper: paper["relevance_score"], reverse=True)
+        
+        if self.paper_index is not None and papers:
+            try:
+                await asyncio.to_thread(self.paper_index.add_papers, papers)
+            except Exception as e:
+                logger.warning(f"Indexing search results failed: {e}")
+        if self.concept_graph is not None and papers:
+            try:
+                await asyncio.to_thread(self.concept_graph.add_papers, papers)
+            except Exception as e:
+                logger.warning(f"Adding search results to the concept graph failed: {e}")
+        
+        return {
             "papers": papers,
-            "total_found": len(papers),
+            "total_found": found,
+            "duplicates_removed": found - len(papers),
             "query": query,
-            "sources_used": sources
+            "sources_used": sources,
+            "source_timings": report.timings,
+            "sources_failed": sorted(report.failed),
+            "sources_timed_out": report.timed_out,
+            "sources_truncated": report.truncated,
+            "sources_hedged": report.hedged,
+            "source_latency": {name: get_latency_tracker(name).summary() for name in report.timings},
         }
-        
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-    async def generate_workspace(self, topic: str, include_tools: bool = True, include_files: bool = True) -> list[TextContent]:
+    async def generate_workspace(self, topic: str, include_tools: bool = True, include_files: bool = True) -> Dict[str, Any]:
         """Generate a research workspace."""
         tools = []
         files = []
@@ -710,27 +907,22 @@ class RAMAResearchServer:
             "last_activity": "2024-10-03T10:00:00Z"
         }
         
-        return [TextContent(type="text", text=json.dumps(workspace, indent=2))]
+        return workspace
 
-    async def create_mindmap(self, topic: str, depth: int = 3, include_connections: bool = True) -> list[TextContent]:
+    async def create_mindmap(self, topic: str, depth: int = 3, include_connections: bool = True) -> Dict[str, Any]:
         """Create a research mind map."""
         # Generate nodes based on topic
         nodes = [
-            {"id": 1, "label": topic.title(), "x": 400, "y": 300, "type": "central"},
+            {"id": 1, "label": topic.title(), "x": 0, "y": 0, "type": "central"},
         ]
         
-        # Add related concepts (simplified generation)
-        concepts = self.generate_related_concepts(topic)
-        for i, concept in enumerate(concepts[:8]):
-            angle = (i / len(concepts)) * 2 * 3.14159
-            x = 400 + 150 * (1 if i % 2 == 0 else 1.5) * (1 if angle < 3.14159 else -1)
-            y = 300 + 100 * (1 if i < 4 else -1)
-            
+        concepts, links = await asyncio.to_thread(self._mindmap_concepts, topic)
+        for i, concept in enumerate(concepts):
             nodes.append({
                 "id": i + 2,
                 "label": concept,
-                "x": x,
-                "y": y,
+                "x": 0,
+                "y": 0,
                 "type": "concept"
             })
         
@@ -740,13 +932,10 @@ class RAMAResearchServer:
             for i in range(2, len(nodes) + 1):
                 connections.append({"from": 1, "to": i})
             
-            # Add some inter-concept connections
-            if len(nodes) > 4:
-                connections.extend([
-                    {"from": 2, "to": 4},
-                    {"from": 3, "to": 5},
-                    {"from": 6, "to": 8},
-                ])
+            # Concept nodes are numbered from 2 in list order
+            connections.extend({"from": i + 2, "to": j + 2} for i, j in links)
+
+        await self._layout(f"mindmap:{topic}", nodes, connections)
         
         mindmap = {
             "id": f"mm_{hash(topic) % 10000}",
@@ -755,9 +944,9 @@ class RAMAResearchServer:
             "connections": connections
         }
         
-        return [TextContent(type="text", text=json.dumps(mindmap, indent=2))]
+        return mindmap
 
-    async def synthesize_audio(self, text: str, voice: str = "neutral") -> list[TextContent]:
+    async def synthesize_audio(self, text: str, voice: str = "neutral") -> Dict[str, Any]:
         """Synthesize audio from text."""
         # For now, return a mock audio URL
         # In a real implementation, you'd integrate with a TTS service
@@ -768,56 +957,81 @@ class RAMAResearchServer:
             "text": text[:100] + "..." if len(text) > 100 else text
         }
         
-        return [TextContent(type="text", text=json.dumps(audio_data, indent=2))]
-
-    def extract_keywords(self, text: str) -> List[str]:
-        """Extract keywords from text (simplified)."""
-        # This is a very basic keyword extraction
-        words = text.lower().split()
-        # Filter out common words and keep significant terms
-        stop_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by", "is", "are", "was", "were", "be", "been", "have", "has", "had", "do", "does", "did", "will", "would", "could", "should"}
-        keywords = [word for word in words if len(word) > 3 and word not in stop_words]
-        return keywords[:10]  # Return top 10 keywords
+        return audio_data
 
     def generate_related_concepts(self, topic: str) -> List[str]:
-        """Generate related concepts for a topic (simplified)."""
-        # This is a basic concept generator - in reality you'd use NLP
-        concept_map = {
-            "quantum": ["superposition", "entanglement", "decoherence", "qubits", "quantum gates", "measurement", "interference", "tunneling"],
-            "neural": ["neurons", "synapses", "plasticity", "learning", "memory", "networks", "activation", "backpropagation"],
-            "machine learning": ["algorithms", "training", "validation", "features", "models", "optimization", "classification", "regression"],
-            "ai": ["artificial intelligence", "deep learning", "natural language", "computer vision", "robotics", "expert systems", "reasoning", "knowledge"],
-            "computing": ["algorithms", "data structures", "programming", "software", "hardware", "systems", "networks", "security"],
-        }
-        
-        topic_lower = topic.lower()
-        for key, concepts in concept_map.items():
-            if key in topic_lower:
-                return concepts
-        
-        # Default concepts if no match
-        return ["methodology", "applications", "challenges", "future work", "related research", "implementation", "analysis", "results"]
+        """Concepts that co-occur with the topic in fetched papers, most related first.
+
+        Falls back to generic research facets until the concept graph knows the topic.
+        """
+        if self.concept_graph is not None:
+            try:
+                related = self.concept_graph.related(topic, limit=8)
+            except Exception as e:
+                logger.warning(f"Concept graph lookup failed: {e}")
+                related = []
+            if related:
+                return [label for label, _ in related]
+        return list(GENERIC_CONCEPTS)
+
+    def _mindmap_concepts(self, topic: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """Up to 8 related concepts, and the pairs of them (list indices) to connect."""
+        concepts = self.generate_related_concepts(topic)[:8]
+        if concepts == list(GENERIC_CONCEPTS):
+            # The generic facets are not graph concepts
+            return concepts, list(GENERIC_CONCEPT_LINKS)
+        try:
+            links = self.concept_graph.links(concepts)
+        except Exception as e:
+            logger.warning(f"Concept graph link lookup failed: {e}")
+            links = []
+        # The strongest pairs only, so a small graph's clique doesn't turn into a hairball
+        links = sorted(links, key=lambda link: link[2], reverse=True)[:len(concepts)]
+        return concepts, sorted((i, j) for i, j, _ in links)
+
+def preload_libraries():
+    """Import the heavy search dependencies so the first search doesn't pay for them."""
+    started = time.perf_counter()
+    for module in ("scholarly", "rama_research_server.merge"):
+        try:
+            __import__(module)
+        except Exception as e:
+            logger.warning(f"Preloading {module} failed: {e}")
+    logger.info(f"Preloaded search libraries in {(time.perf_counter() - started) * 1000:.0f}ms")
+
 
 async def main():
     """Main server entry point."""
+    imported = time.perf_counter()
     server = RAMAResearchServer()
+    constructed = time.perf_counter()
+    logger.info(
+        f"Server ready: imports {(imported - _IMPORT_STARTED) * 1000:.0f}ms, "
+        f"setup {(constructed - imported) * 1000:.0f}ms"
+    )
+    if config.PRELOAD_LIBRARIES:
+        # Runs while the client performs the initialize handshake; never delays it
+        asyncio.get_running_loop().run_in_executor(None, preload_libraries)
     
     # Run the server
     from mcp.server.stdio import stdio_server
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server.server.run(
-            read_stream, 
-            write_stream,
-            InitializationOptions(
-                server_name="rama-research-server",
-                server_version="0.1.0",
-                capabilities=server.server.get_capabilities(
-                    notification_options=None,
-                    experimental_capabilities=None,
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.server.run(
+                read_stream, 
+                write_stream,
+                InitializationOptions(
+                    server_name="rama-research-server",
+                    server_version="0.1.0",
+                    capabilities=server.server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={codec.COMPACT_PAYLOAD_CAPABILITY: {"version": 1}},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await close_http_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,437 @@
+"""Paper source adapters.
+
+Each upstream (arXiv, Google Scholar) is wrapped in a :class:`PaperSource` that
+yields normalized paper dicts. arXiv is queried through the shared
+:mod:`.upstream` HTTP client. The Scholar client library is synchronous, so its
+iterator runs on a bounded thread pool shared by blocking sources (the
+concurrency budget) and results are handed back to the event loop one paper at
+a time. :func:`merge_sources` runs several sources in parallel, each under its
+own timeout and circuit breaker, and yields papers in arrival order, so a slow
+source only costs its own time and a failing one is skipped outright.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from . import config
+from .latency import get_latency_tracker
+from .upstream import get_breaker, get_http_client
+
+logger = logging.getLogger("rama-research-server.sources")
+
+_DONE = object()
+
+SCHOLAR_HOST = "scholar.google.com"
+# Results per page of a Scholar search; each page is one request
+SCHOLAR_PAGE_SIZE = 10
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all blocking source adapters."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.SOURCE_MAX_WORKERS, thread_name_prefix="paper-source")
+    return _executor
+
+
+class PaperSource:
+    """Base class for an upstream paper database."""
+
+    name: str = ""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout or config.SOURCE_TIMEOUTS.get(self.name, config.SOURCE_DEFAULT_TIMEOUT)
+
+    def fetch(self, query: str, limit: int, cancelled: threading.Event) -> Iterator[Dict[str, Any]]:
+        """Blocking iterator over normalized papers; runs on the source thread pool."""
+        raise NotImplementedError
+
+    async def stream(self, query: str, limit: int) -> AsyncIterator[Dict[str, Any]]:
+        """Yield papers as the blocking ``fetch`` iterator produces them."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def pump():
+            try:
+                for count, paper in enumerate(self.fetch(query, limit, cancelled)):
+                    if cancelled.is_set() or count >= limit:
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, paper)
+                loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+            except BaseException as e:  # forwarded to the consumer below
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+
+        future = loop.run_in_executor(get_executor(), pump)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Tell the worker thread to stop after its current item
+            cancelled.set()
+            if not future.done():
+                future.add_done_callback(lambda f: f.exception())
+
+
+class ArxivSource(PaperSource):
+    """arXiv's Atom API, queried through the shared upstream HTTP client."""
+
+    name = "arxiv"
+
+    async def stream(self, query: str, limit: int) -> AsyncIterator[Dict[str, Any]]:
+        response = await get_http_client().get(config.ARXIV_API_URL, params={
+            "search_query": query,
+            "start": 0,
+            "max_results": limit,
+            "sortBy": "relevance",
+        })
+        response.raise_for_status()
+        for paper in parse_arxiv_feed(response.content)[:limit]:
+            yield paper
+
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+
+
+def parse_arxiv_feed(content: bytes) -> List[Dict[str, Any]]:
+    """Normalized papers of an arXiv API Atom feed."""
+    papers = []
+    for entry in ElementTree.fromstring(content).iter(f"{_ATOM}entry"):
+        entry_id = (entry.findtext(f"{_ATOM}id") or "").strip()
+        if not entry_id:
+            continue
+        papers.append({
+            "id": f"arxiv_{entry_id.split('/')[-1]}",
+            "title": " ".join((entry.findtext(f"{_ATOM}title") or "").split()),
+            "authors": [
+                (author.findtext(f"{_ATOM}name") or "").strip() for author in entry.iter(f"{_ATOM}author")
+            ],
+            "abstract": " ".join((entry.findtext(f"{_ATOM}summary") or "").split()),
+            "year": _as_year(entry.findtext(f"{_ATOM}published")),
+            "journal": "ArXiv",
+            "citations": 0,  # ArXiv doesn't provide citation count
+            "relevance_score": 85,
+            "url": entry_id,
+            "doi": (entry.findtext(f"{_ARXIV}doi") or "").strip() or None,
+        })
+    return papers
+
+
+class ScholarSource(PaperSource):
+    """Google Scholar through the ``scholarly`` library.
+
+    scholarly sends its own requests, one per page of results. Each page takes a
+    token from Scholar's shared rate-limit bucket first. The requests are not
+    retried by the upstream client; a failing search counts against the
+    source's circuit breaker.
+    """
+
+    name = "scholar"
+
+    def _wait_for_token(self, cancelled: threading.Event) -> bool:
+        """Take a token for one page request; False if the search was cancelled meanwhile."""
+        wait = get_http_client().bucket(SCHOLAR_HOST).reserve()
+        return not cancelled.wait(wait) if wait > 0 else not cancelled.is_set()
+
+    def fetch(self, query: str, limit: int, cancelled: threading.Event) -> Iterator[Dict[str, Any]]:
+        from scholarly import scholarly
+
+        if not self._wait_for_token(cancelled):
+            return
+        pubs = scholarly.search_pubs(query)  # fetches the first page
+        for i in range(limit):
+            # The iterator requests the next page once the current one is used up
+            if i and i % SCHOLAR_PAGE_SIZE == 0 and not self._wait_for_token(cancelled):
+                return
+            pub = next(pubs, None)
+            if pub is None or cancelled.is_set():
+                return
+            # scholarly >= 1.5 nests bibliographic fields under "bib"
+            bib = pub.get("bib", pub)
+            authors = bib.get("author", [])
+            if isinstance(authors, str):
+                authors = [name.strip() for name in authors.split(" and ") if name.strip()]
+            authors = [author["name"] if isinstance(author, dict) else str(author) for author in authors]
+            yield {
+                "id": f"scholar_{i}",
+                "title": bib.get("title", "Unknown Title"),
+                "authors": authors,
+                "abstract": bib.get("abstract", "No abstract available"),
+                "year": _as_year(bib.get("pub_year", bib.get("year"))),
+                "journal": bib.get("venue", "Unknown Journal"),
+                "citations": pub.get("num_citations", 0),
+                "relevance_score": max(70, 100 - i * 5),
+                "url": pub.get("pub_url", pub.get("url", "")),
+            }
+
+
+def _as_year(value: Any) -> int:
+    try:
+        return int(str(value)[:4])
+    except (TypeError, ValueError):
+        return datetime.now().year
+
+
+class FixtureSource(PaperSource):
+    """Replays recorded papers for one source, optionally after a simulated latency.
+
+    Enabled by pointing ``RAMA_SOURCE_FIXTURES`` at a JSON file of the form
+    ``{"arxiv": {"latency": 0.2, "papers": [...]}, ...}``.
+    """
+
+    def __init__(self, name: str, papers: List[Dict[str, Any]], latency: float = 0.0):
+        self.name = name
+        super().__init__()
+        self.papers = papers
+        self.latency = latency
+
+    def fetch(self, query: str, limit: int, cancelled: threading.Event) -> Iterator[Dict[str, Any]]:
+        if self.latency:
+            cancelled.wait(self.latency)
+        for paper in self.papers[:limit]:
+            if cancelled.is_set():
+                return
+            yield dict(paper)
+
+
+SOURCES = {source.name: source for source in (ArxivSource, ScholarSource)}
+
+_fixtures: Optional[Dict[str, Any]] = None
+
+
+def _load_fixtures() -> Dict[str, Any]:
+    global _fixtures
+    if _fixtures is None:
+        with open(config.SOURCE_FIXTURES, encoding="utf-8") as f:
+            _fixtures = json.load(f)
+        logger.info(f"Serving paper sources from fixtures in {config.SOURCE_FIXTURES}")
+    return _fixtures
+
+
+def get_sources(names: List[str]) -> List[PaperSource]:
+    """Instantiate adapters for the requested source names, skipping unknown ones."""
+    if config.SOURCE_FIXTURES:
+        fixtures = _load_fixtures()
+        return [
+            FixtureSource(name, fixtures[name].get("papers", []), fixtures[name].get("latency", 0.0))
+            for name in names if name in fixtures
+        ]
+    adapters = []
+    for name in names:
+        source_cls = SOURCES.get(name)
+        if source_cls is None:
+            logger.warning(f"Unknown paper source: {name}")
+            continue
+        adapters.append(source_cls())
+    return adapters
+
+
+def split_quota(total: int, count: int) -> List[int]:
+    """Split ``total`` results as evenly as possible across ``count`` sources."""
+    if count <= 0:
+        return []
+    base, extra = divmod(max(total, 0), count)
+    return [base + (1 if i < extra else 0) for i in range(count)]
+
+
+@dataclass
+class SourceReport:
+    """Per-source outcome of a :func:`merge_sources` run."""
+
+    timings: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
+    # Stopped by the source's own timeout
+    timed_out: List[str] = field(default_factory=list)
+    # Stopped early by the caller's latency budget
+    truncated: List[str] = field(default_factory=list)
+    # Answered by a hedged duplicate request
+    hedged: List[str] = field(default_factory=list)
+
+
+# Hedges each source may still issue; refilled by HEDGE_BUDGET per search
+_hedge_credit: Dict[str, float] = {}
+# Most hedges a source can save up while its latency is well behaved
+MAX_HEDGE_CREDIT = 3.0
+
+
+def _earn_hedge(name: str):
+    _hedge_credit[name] = min(MAX_HEDGE_CREDIT, _hedge_credit.get(name, 1.0) + config.HEDGE_BUDGET)
+
+
+def _take_hedge(name: str) -> bool:
+    if _hedge_credit.get(name, 1.0) >= 1:
+        _hedge_credit[name] = _hedge_credit.get(name, 1.0) - 1
+        return True
+    return False
+
+
+async def hedged_stream(
+    source: PaperSource, query: str, limit: int, hedge_after: Optional[float], report: SourceReport
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream ``source``, duplicating the request if it has not produced a paper after ``hedge_after`` seconds.
+
+    Whichever attempt produces a paper (or finishes) first is streamed; the other
+    is cancelled, so its late results are dropped. An attempt that fails only
+    loses if the other one fails too. Each attempt's time to first paper is
+    observed into the source's ``.first`` latency tracker; a cancelled attempt
+    contributes how long it had been waiting, a lower bound.
+    """
+    tracker = get_latency_tracker(f"{source.name}.first")
+    attempts: List[Tuple[AsyncIterator[Dict[str, Any]], asyncio.Future, float]] = []
+
+    def start():
+        stream = source.stream(query, limit).__aiter__()
+        attempts.append((stream, asyncio.ensure_future(stream.__anext__()), time.perf_counter()))
+
+    async def discard(attempt):
+        stream, pending, started = attempt
+        if not pending.done():
+            tracker.observe(time.perf_counter() - started)
+            pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+        await stream.aclose()
+
+    start()
+    try:
+        done, _ = await asyncio.wait([attempts[0][1]], timeout=hedge_after)
+        if not done and _take_hedge(source.name):
+            logger.info(f"{source.name} has no results after {hedge_after:.2f}s (p95); hedging")
+            start()
+        while True:
+            # An attempt wins with its first paper, or by finishing without any
+            winner = next((
+                attempt for attempt in attempts
+                if attempt[1].done() and isinstance(attempt[1].exception(), (type(None), StopAsyncIteration))
+            ), None)
+            if winner is not None:
+                break
+            running = [future for _, future, _ in attempts if not future.done()]
+            if not running:
+                # Every attempt failed: the first one's error is the source's
+                raise attempts[0][1].exception()
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for attempt in attempts:
+            if attempt is not winner:
+                await discard(attempt)
+        stream, first, started = winner
+        tracker.observe(time.perf_counter() - started)
+        if len(attempts) > 1 and winner is not attempts[0]:
+            report.hedged.append(source.name)
+        if first.exception() is not None:
+            return  # StopAsyncIteration: the source had no results
+        yield first.result()
+        async for paper in stream:
+            yield paper
+    finally:
+        for attempt in attempts:
+            await discard(attempt)
+
+
+async def merge_sources(
+    sources: List[PaperSource], query: str, max_results: int, report: Optional[SourceReport] = None,
+    latency_budget: Optional[float] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run ``sources`` concurrently and yield ``(source_name, paper)`` as papers arrive.
+
+    Each source runs until its own timeout or ``latency_budget`` seconds,
+    whichever is shorter, and is hedged once it passes its p95 time to first
+    paper (see :func:`hedged_stream`).
+    """
+    report = report if report is not None else SourceReport()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run(source: PaperSource, limit: int):
+        breaker = get_breaker(source.name)
+        if not breaker.allow():
+            report.failed[source.name] = "circuit open"
+            report.timings[source.name] = 0.0
+            report.counts[source.name] = 0
+            return
+        deadline = source.timeout if latency_budget is None else min(source.timeout, latency_budget)
+        _earn_hedge(source.name)
+        hedge_after = get_latency_tracker(f"{source.name}.first").quantile(config.HEDGE_QUANTILE)
+        if not config.HEDGE_ENABLED or hedge_after is None or hedge_after >= deadline:
+            hedge_after = None
+        started = time.perf_counter()
+        count = 0
+
+        async def consume():
+            nonlocal count
+            if hedge_after is not None:
+                async for paper in hedged_stream(source, query, limit, hedge_after, report):
+                    count += 1
+                    await queue.put((source.name, paper))
+                return
+            first = get_latency_tracker(f"{source.name}.first")
+            try:
+                async for paper in source.stream(query, limit):
+                    if not count:
+                        first.observe(time.perf_counter() - started)
+                    count += 1
+                    await queue.put((source.name, paper))
+            finally:
+                if not count:
+                    # Finished, failed or cut off without results: at least this long
+                    first.observe(time.perf_counter() - started)
+
+        try:
+            await asyncio.wait_for(consume(), deadline)
+            breaker.record_success()
+            get_latency_tracker(source.name).observe(time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            if deadline < source.timeout:
+                logger.info(f"{source.name} search cut at the {deadline}s latency budget with {count} results")
+                report.truncated.append(source.name)
+            else:
+                logger.warning(f"{source.name} search timed out after {deadline}s with {count} results")
+                report.timed_out.append(source.name)
+            # The deadline is a lower bound on this search's latency
+            get_latency_tracker(source.name).observe(deadline)
+            # A slow source that still returned papers is degraded, not down
+            if count or deadline < source.timeout:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        except Exception as e:
+            logger.warning(f"{source.name} search failed: {e}")
+            report.failed[source.name] = str(e)
+            breaker.record_failure()
+        finally:
+            report.timings[source.name] = time.perf_counter() - started
+            report.counts[source.name] = count
+
+    tasks = [
+        asyncio.create_task(run(source, limit))
+        for source, limit in zip(sources, split_quota(max_results, len(sources)))
+    ]
+    remaining = len(tasks)
+    for task in tasks:
+        task.add_done_callback(lambda _: queue.put_nowait(_DONE))
+
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
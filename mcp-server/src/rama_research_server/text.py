@@ -0,0 +1,25 @@
+"""Tokenization shared by keyword extraction and the paper index."""
+
+import re
+from typing import List
+
+# Words joined by inner hyphens or apostrophes stay one token ("state-of-the-art")
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how however i if in into is it its itself just may me
+might more most must my myself no nor not now of off on once only or other our ours ourselves out over
+own same she should so some such than that the their theirs them themselves then there these they this
+those through thus to too under until up upon us very was we were what when where which while who whom
+why will with within without would you your yours yourself yourselves
+""".split())
+
+
+def tokenize(text: str, min_length: int = 2) -> List[str]:
+    """Lowercase word tokens with punctuation and stop words removed."""
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) >= min_length and token not in STOP_WORDS
+    ]
@@ -0,0 +1,337 @@
+"""Shared HTTP client for upstream paper APIs.
+
+All upstream HTTP traffic goes through one :class:`UpstreamClient`, which wraps
+a pooled ``httpx.AsyncClient``:
+- keep-alive connections are reused across searches, over HTTP/2 when the
+  optional ``h2`` package is installed;
+- every request first takes a token from its host's :class:`TokenBucket`. The
+  buckets live in a SQLite file under ``DATA_DIR`` (:class:`SharedTokenBucket`),
+  so every server process of the backend's pool, hedged requests included,
+  draws on one budget per host and together they stay within each API's
+  published rate. If the file can't be opened, each process falls back to its
+  own in-memory bucket;
+- connection errors, timeouts, 429 and 5xx responses are retried with
+  full-jitter exponential backoff, honouring ``Retry-After``.
+
+Each source also has a :class:`CircuitBreaker`. After
+``BREAKER_FAILURE_THRESHOLD`` consecutive failed searches it opens and the
+source is skipped without waiting on it. After ``BREAKER_RESET_SECONDS`` one
+trial search is let through, and its outcome closes the breaker or opens it
+again.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import httpx
+
+from . import config
+
+logger = logging.getLogger("rama-research-server.upstream")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamError(Exception):
+    """An upstream answered with a retryable status on every attempt."""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"{response.request.url.host} answered {response.status_code}")
+        self.response = response
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average and bursts of up to ``burst``.
+
+    An acquisition reserves the next token even if it has not been earned yet
+    and then waits for it, so waiters are served in arrival order. Thread-safe.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.time()
+            self._tokens = _refill(self._tokens, self._updated, now, self.rate, self.burst) - 1
+            self._updated = now
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def drain(self):
+        """Spend every token, e.g. after the host answered 429."""
+        with self._lock:
+            now = time.time()
+            self._tokens = min(0.0, _refill(self._tokens, self._updated, now, self.rate, self.burst))
+            self._updated = now
+
+
+class RateLimitStore:
+    """SQLite file holding the state of token buckets shared between processes."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+            """
+        )
+
+    def update(self, name: str, rate: float, burst: float, take: bool) -> float:
+        """Refill bucket ``name``, then take a token or (``take=False``) empty it.
+
+        Returns the token balance afterwards; negative once tokens are reserved ahead.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM token_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                tokens = burst if row is None else _refill(row[0], row[1], now, rate, burst)
+                tokens = tokens - 1 if take else min(0.0, tokens)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (name, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return tokens
+
+
+class SharedTokenBucket(TokenBucket):
+    """A :class:`TokenBucket` whose state is a row of a :class:`RateLimitStore`."""
+
+    def __init__(self, rate: float, burst: float, store: RateLimitStore, name: str):
+        super().__init__(rate, burst)
+        self.store = store
+        self.name = name
+
+    def reserve(self) -> float:
+        return max(0.0, -self.store.update(self.name, self.rate, self.burst, take=True) / self.rate)
+
+    async def acquire(self):
+        # A short SQLite transaction; kept off the event loop
+        wait = await asyncio.to_thread(self.reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def drain(self):
+        self.store.update(self.name, self.rate, self.burst, take=False)
+
+
+class CircuitBreaker:
+    """Closed, open or half-open; see the module docstring."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.reset_seconds = config.BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; in half-open state only one trial call per reset period may."""
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self._opened_at < self.reset_seconds:
+            return False
+        if self.state == self.OPEN:
+            logger.info(f"Circuit for {self.name} half-open; letting one trial call through")
+        # A trial that never reports back (cancelled) is replaced after another period
+        self.state = self.HALF_OPEN
+        self._opened_at = time.monotonic()
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} open after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(source: str) -> CircuitBreaker:
+    """Process-wide circuit breaker of a paper source."""
+    breaker = _breakers.get(source)
+    if breaker is None:
+        breaker = _breakers[source] = CircuitBreaker(source)
+    return breaker
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class UpstreamClient:
+    """Pooled, rate-limited, retrying HTTP client; see the module docstring."""
+
+    def __init__(self, retries: Optional[int] = None, backoff: Optional[float] = None,
+                 max_backoff: Optional[float] = None, rate_limit_path: Optional[Union[str, Path]] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.retries = config.HTTP_RETRIES if retries is None else retries
+        self.backoff = config.HTTP_RETRY_BACKOFF if backoff is None else backoff
+        self.max_backoff = config.HTTP_RETRY_MAX_BACKOFF if max_backoff is None else max_backoff
+        self.http2 = importlib.util.find_spec("h2") is not None
+        # Replaces the network, e.g. with an httpx.MockTransport
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._store: Optional[RateLimitStore] = None
+        if rate_limit_path is not None:
+            try:
+                self._store = RateLimitStore(rate_limit_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Shared rate limits disabled ({rate_limit_path}); limiting per process: {e}")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+                headers={"User-Agent": config.HTTP_USER_AGENT},
+                follow_redirects=True,
+            )
+        return self._client
+
+    def bucket(self, host: str) -> TokenBucket:
+        """The token bucket limiting requests to ``host``."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = config.HTTP_RATE_LIMITS.get(host, config.HTTP_DEFAULT_RATE_LIMIT)
+            if self._store is not None:
+                bucket = SharedTokenBucket(rate, burst, self._store, host)
+            else:
+                bucket = TokenBucket(rate, burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def _delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter: uniform in [0, exponential cap], spreading out clients that failed together
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures.
+
+        Returns the first non-retryable response, whatever its status. Raises the
+        last ``httpx.TransportError`` or an :class:`UpstreamError` once the
+        retries are spent.
+        """
+        host = httpx.URL(url).host
+        bucket = self.bucket(host)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            retry_after = None
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                error: Exception = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                await response.aclose()
+                error = UpstreamError(response)
+                retry_after = _retry_after(response)
+                if response.status_code == 429:
+                    await asyncio.to_thread(bucket.drain)
+            attempt += 1
+            if attempt > self.retries:
+                raise error
+            delay = self._delay(attempt, retry_after)
+            logger.info(f"{method} {host} attempt {attempt} failed ({error!r}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_shared: Optional[UpstreamClient] = None
+
+
+def get_http_client() -> UpstreamClient:
+    """The process-wide :class:`UpstreamClient`."""
+    global _shared
+    if _shared is None:
+        _shared = UpstreamClient(rate_limit_path=config.HTTP_RATE_LIMIT_PATH)
+    return _shared
+
+
+async def close_http_client():
+    global _shared
+    if _shared is not None:
+        await _shared.aclose()
+        _shared = None
@@ -0,0 +1,189 @@
+"""Rate limiting, retries and circuit breaking of the shared upstream HTTP client.
+
+Upstream APIs are replaced by an ``httpx.MockTransport``, so nothing leaves the
+process.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from rama_research_server.upstream import (
+    CircuitBreaker,
+    RateLimitStore,
+    SharedTokenBucket,
+    TokenBucket,
+    UpstreamClient,
+    UpstreamError,
+)
+
+URL = "https://api.test/search"
+
+
+def make_client(responses, **kwargs):
+    """A client whose requests are answered by ``responses`` in turn; returns it and the request log."""
+    requests = []
+    queue = list(responses)
+
+    def handler(request):
+        requests.append(request)
+        answer = queue.pop(0) if len(queue) > 1 else queue[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    kwargs.setdefault("backoff", 0.01)
+    kwargs.setdefault("max_backoff", 0.05)
+    return UpstreamClient(transport=httpx.MockTransport(handler), **kwargs), requests
+
+
+def request(client, method="GET"):
+    async def run():
+        try:
+            return await client.request(method, URL)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+# --- TokenBucket ------------------------------------------------------------------------
+
+
+def test_token_bucket_allows_burst_then_waits_for_rate():
+    bucket = TokenBucket(rate=20, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Reservations beyond the burst queue up one token interval apart
+    assert bucket.reserve() == pytest.approx(1 / 20, abs=0.01)
+    assert bucket.reserve() == pytest.approx(2 / 20, abs=0.01)
+
+
+def test_token_bucket_acquire_paces_callers():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        return time.perf_counter() - started
+
+    # One immediate token, then five more at 50 per second
+    assert asyncio.run(run()) >= 5 / 50 - 0.01
+
+
+def test_token_bucket_drain_spends_the_burst():
+    bucket = TokenBucket(rate=20, burst=5)
+    bucket.drain()
+    assert bucket.reserve() == pytest.approx(1 / 20, abs=0.01)
+
+
+def test_shared_token_buckets_draw_on_one_budget(tmp_path):
+    # Two stores on one file stand in for two server processes
+    first = SharedTokenBucket(20, 1, RateLimitStore(tmp_path / "rate_limits.sqlite3"), "api.test")
+    second = SharedTokenBucket(20, 1, RateLimitStore(tmp_path / "rate_limits.sqlite3"), "api.test")
+    other_host = SharedTokenBucket(20, 1, RateLimitStore(tmp_path / "rate_limits.sqlite3"), "other.test")
+    assert first.reserve() == 0.0
+    assert second.reserve() == pytest.approx(1 / 20, abs=0.01)
+    assert other_host.reserve() == 0.0
+    second.drain()
+    assert first.reserve() > 1 / 20
+
+
+# --- CircuitBreaker ---------------------------------------------------------------------
+
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one trial call per reset period
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+# --- Retries ----------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retries_transient_statuses(status):
+    client, requests = make_client([httpx.Response(status), httpx.Response(status), httpx.Response(200, text="ok")])
+    response = request(client)
+    assert response.status_code == 200 and response.text == "ok"
+    assert len(requests) == 3
+
+
+def test_retries_connection_errors():
+    client, requests = make_client([httpx.ConnectError("refused"), httpx.Response(200)])
+    assert request(client).status_code == 200
+    assert len(requests) == 2
+
+
+def test_does_not_retry_other_statuses():
+    client, requests = make_client([httpx.Response(404), httpx.Response(200)])
+    assert request(client).status_code == 404
+    assert len(requests) == 1
+
+
+def test_gives_up_after_retries():
+    client, requests = make_client([httpx.Response(503)], retries=2)
+    with pytest.raises(UpstreamError) as raised:
+        request(client)
+    assert raised.value.response.status_code == 503
+    assert len(requests) == 3
+
+
+def test_gives_up_on_connection_errors_after_retries():
+    client, requests = make_client([httpx.ConnectError("refused")], retries=1)
+    with pytest.raises(httpx.ConnectError):
+        request(client)
+    assert len(requests) == 2
+
+
+def test_honours_retry_after():
+    client, requests = make_client(
+        [httpx.Response(429, headers={"Retry-After": "0.2"}), httpx.Response(200)], max_backoff=1
+    )
+    started = time.perf_counter()
+    assert request(client).status_code == 200
+    assert time.perf_counter() - started >= 0.2
+    assert len(requests) == 2
+
+
+def test_backoff_is_capped():
+    client = UpstreamClient(backoff=0.5, max_backoff=2)
+    for attempt in range(1, 12):
+        assert 0 <= client._delay(attempt, None) <= min(2, 0.5 * 2 ** (attempt - 1))
+    # Retry-After raises the delay to at least its value, but never beyond the cap
+    assert client._delay(1, 1.5) >= 1.5
+    assert client._delay(1, 3600) == 2